@@ -1,5 +1,8 @@
 -- Script SQL para el sistema de control de acceso y asignación de equipos
 
+-- Los índices y cambios posteriores se aplican al iniciar el programa
+-- (src/modules/migraciones.py, registrados en la tabla schema_migraciones)
+
 CREATE DATABASE IF NOT EXISTS control_acceso;
 USE control_acceso;
 
@@ -10,7 +13,9 @@ CREATE TABLE IF NOT EXISTS Docentes (
     apellidos VARCHAR(100) NOT NULL,
     celular VARCHAR(20),
     es_admin BOOLEAN DEFAULT FALSE,
-    foto_rostro LONGBLOB
+    foto_rostro LONGBLOB,
+    encoding_rostro BLOB,
+    version_encoding VARCHAR(20)
 );
 
 -- Tabla Usuarios (para login)
@@ -30,7 +35,12 @@ CREATE TABLE IF NOT EXISTS Estudiantes (
     apellidos VARCHAR(100) NOT NULL,
     grado VARCHAR(5),
     estado ENUM('Estudiante', 'Ex-Alumno') DEFAULT 'Estudiante',
-    foto_rostro LONGBLOB
+    foto_rostro LONGBLOB,
+    encoding_rostro BLOB,
+    version_encoding VARCHAR(20),
+    -- Matrícula vigente (la mantiene registrar_matricula)
+    id_matricula_actual VARCHAR(50),
+    INDEX idx_estudiantes_matricula_actual (id_matricula_actual)
 );
 
 -- Tabla Equipos (con características técnicas)
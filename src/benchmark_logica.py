@@ -0,0 +1,145 @@
+# Prueba de rendimiento de los módulos de lógica sin servidor MySQL.
+# Crea una base SQLite en memoria desde data/database.sql, la llena con datos
+# sintéticos (siempre los mismos para la misma semilla) y mide las funciones
+# de ingreso, salida, asistencia e historial tal como las usa el programa.
+# Uso (desde la carpeta src):
+#   python benchmark_logica.py [--estudiantes 400] [--grados 10] [--equipos 40] [--semilla 1] [--bd archivo.db]
+
+# Lectura de argumentos de la línea de comandos
+import argparse
+
+# Salida con código de error
+import sys
+
+# Datos sintéticos reproducibles
+import random
+
+# Medición de tiempos
+import time
+
+# Fecha de hoy en formato de la pantalla de historial
+from datetime import datetime
+
+# Base SQLite con el esquema y las migraciones
+from modules.motor_sqlite import preparar_base_sqlite
+
+# Conexión (ya apuntando a SQLite)
+from modules.conexion import crear_conexion, cerrar_conexion
+
+# Sesión del docente (asignar_equipo toma la cédula de aquí)
+from modules.sesion import Sesion
+
+# Funciones que se miden
+from modules.ingreso_logic import asignar_equipo
+from modules.salida_logic import registrar_salida, registrar_asistencia
+from modules.historial_logic import buscar_historial
+from modules.estudiantes import buscar_estudiantes
+from modules.indice_estudiantes import IndiceEstudiantes
+
+
+NOMBRES = ["Ana", "Luis", "María", "Juan", "Sofía", "Carlos", "Valentina", "Andrés", "Camila", "Diego"]
+APELLIDOS = ["Gómez", "Pérez", "Rodríguez", "López", "Martínez", "García", "Torres", "Ramírez", "Díaz", "Vargas"]
+
+CEDULA_DOCENTE = "1000"
+
+
+
+def poblar(rng, estudiantes, grados, equipos, anio):
+    """Inserta docente, equipos y estudiantes con su matrícula. Retorna {grado: [ids]}."""
+    lista_grados = [f"{6 + i // 2}-{i % 2 + 1}" for i in range(grados)]
+    por_grado = {grado: [] for grado in lista_grados}
+
+    filas_est, filas_mat = [], []
+    for i in range(estudiantes):
+        grado = lista_grados[i % grados]
+        id_est = anio * 10000 + i
+        id_mat = f"{id_est}-01"
+        filas_est.append((id_est, rng.choice(NOMBRES), f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}", id_mat))
+        filas_mat.append((id_mat, id_est, grado, anio))
+        por_grado[grado].append(id_est)
+
+    conexion = crear_conexion()
+    cursor = conexion.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO docentes (cedula, nombres, apellidos, es_admin) VALUES (%s, %s, %s, %s)",
+            (CEDULA_DOCENTE, "Docente", "Prueba", 1)
+        )
+        cursor.executemany(
+            "INSERT INTO equipos (id_equipo, estado) VALUES (%s, 'disponible')",
+            [(f"E-{n:02d}",) for n in range(1, equipos + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO estudiantes (id_estudiante, nombres, apellidos, id_matricula_actual) VALUES (%s, %s, %s, %s)",
+            filas_est
+        )
+        cursor.executemany(
+            "INSERT INTO matriculas (id_matricula, id_estudiante, grado, anio, estado) VALUES (%s, %s, %s, %s, 'Estudiante')",
+            filas_mat
+        )
+        conexion.commit()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
+
+    return por_grado
+
+
+
+def medir(nombre, funcion, llamadas):
+    """Ejecuta funcion(*args) para cada args de llamadas e imprime media, p95 y total."""
+    tiempos = []
+    for args in llamadas:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+
+    if not tiempos:
+        return
+    tiempos.sort()
+    media = sum(tiempos) / len(tiempos) * 1000
+    p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000
+    print(f"  {nombre:<22} {len(tiempos):>5} llamadas   media {media:8.2f} ms   p95 {p95:8.2f} ms   total {sum(tiempos):7.2f} s")
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide los módulos de lógica sobre una base SQLite sintética.")
+    parser.add_argument("--estudiantes", type=int, default=400, help="Estudiantes a crear")
+    parser.add_argument("--grados", type=int, default=10, help="Grados entre los que se reparten")
+    parser.add_argument("--equipos", type=int, default=40, help="Equipos de la sala")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de los datos sintéticos")
+    parser.add_argument("--bd", default=":memory:", help="Archivo SQLite (por defecto en memoria)")
+    args = parser.parse_args()
+
+    anio = datetime.now().year
+    rng = random.Random(args.semilla)
+
+    preparar_base_sqlite(args.bd)
+    por_grado = poblar(rng, args.estudiantes, args.grados, args.equipos, anio)
+    Sesion.iniciar_sesion({"cedula": CEDULA_DOCENTE, "nombres": "Docente", "apellidos": "Prueba"})
+
+    print(f"ℹ {args.estudiantes} estudiantes en {args.grados} grados, {args.equipos} equipos (semilla {args.semilla})")
+
+    # Una clase por grado: ingreso de todo el grado, salida y asistencia
+    for grado, ids in por_grado.items():
+        print(f"Grado {grado}:")
+        presentes = ids[:args.equipos]
+        medir("asignar_equipo", asignar_equipo, [(i,) for i in presentes])
+        medir("registrar_salida", registrar_salida, [(i,) for i in presentes])
+        medir("registrar_asistencia", registrar_asistencia, [(grado,)])
+
+    # Consultas de las pantallas de historial y estudiantes
+    hoy = datetime.now().strftime("%d/%m/%Y")
+    print("Consultas:")
+    medir("buscar_historial", buscar_historial, [("", grado, hoy) for grado in por_grado])
+    busquedas = [(rng.choice(APELLIDOS)[:3],) for _ in range(20)]
+    medir("buscar_estudiantes", buscar_estudiantes, busquedas)
+    medir("cargar indice", IndiceEstudiantes.cargar, [()])
+    medir("indice_estudiantes", IndiceEstudiantes.buscar, busquedas)
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,11 +19,17 @@ import cv2
 
 # Importación de funciones desde la lógica de negocio
 from modules.estudiantes import (
-    buscar_estudiantes,
     actualizar_datos,
     actualizar_rostro,
 )
 from modules.sesion import Sesion   # 👈 Importamos la sesión
+from modules.camara import ServicioCamara
+from modules.consultas_fondo import EjecutorConsultas
+from modules.indice_estudiantes import IndiceEstudiantes
+
+
+# Milisegundos sin escribir antes de filtrar (evita buscar en cada tecla)
+RETARDO_BUSQUEDA_MS = 250
 
 
 
@@ -51,6 +57,12 @@ def clave_grado_apellido(est):
 
 
 
+def buscar_estudiantes_ordenados(nombre, grado, estado):
+    # Filtra en el índice en memoria (la primera vez lo carga con una consulta)
+    return sorted(IndiceEstudiantes.buscar(nombre, grado, estado), key=clave_grado_apellido)
+
+
+
 # ==========================================================
 #   CLASE: VentanaCapturaRostro
 # ==========================================================
@@ -89,8 +101,11 @@ class VentanaCapturaRostro(QDialog):
 
 
         # cámara
-        # Inicializa la cámara principal
-        self.cap = cv2.VideoCapture(0)
+        # Inicializa la cámara principal; la cámara se comparte entre ventanas y se abre una sola vez
+        self.cap = ServicioCamara.suscribir(0)
+
+        # Secuencia del último frame mostrado (para no repetir frames)
+        self.ultimo_seq = 0
 
         # Crea temporizador para refrescar la vista de cámara
         self.timer = QTimer(self)
@@ -208,10 +223,11 @@ class VentanaCapturaRostro(QDialog):
 
 
     def mostrar_frame(self):
-        # Lee un frame de la cámara
-        ret, frame = self.cap.read()
-        if not ret:
+        # Toma el frame más reciente sin bloquear; si ya se mostró, no hace nada
+        dato = self.cap.leer_nuevo(self.ultimo_seq)
+        if dato is None:
             return
+        self.ultimo_seq, _, frame = dato
 
         # Invierte el frame horizontalmente para efecto espejo
         frame = cv2.flip(frame, 1)
@@ -373,16 +389,25 @@ class VentanaCapturaRostro(QDialog):
 
 
 
-    def closeEvent(self, event):
-        try:
-            # Detiene el timer si existe
+    def liberar_camara(self):
+        # Detiene el timer si existe
+        if hasattr(self, "timer"):
             self.timer.stop()
-        except Exception:
-            pass
 
-        # Libera la cámara si está abierta
-        if hasattr(self, "cap") and self.cap.isOpened():
+        # Suelta la suscripción a la cámara compartida siempre (aunque ya no esté
+        # abierta); release() se puede llamar varias veces y solo descuenta una
+        if hasattr(self, "cap"):
             self.cap.release()
+
+
+    def done(self, resultado):
+        # accept(), reject() y la tecla Esc cierran el diálogo sin pasar por closeEvent
+        self.liberar_camara()
+        super().done(resultado)
+
+
+    def closeEvent(self, event):
+        self.liberar_camara()
         super().closeEvent(event)
 
 
@@ -395,6 +420,11 @@ class EditarEstudiantes(QWidget):
         # Inicializa la ventana base
         super().__init__()
 
+        # Las búsquedas corren en segundo plano; una nueva cancela la anterior
+        self.consultas = EjecutorConsultas(self)
+        self.consultas.resultado.connect(self.mostrar_estudiantes)
+        self.consultas.error.connect(self.mostrar_error_busqueda)
+
 
         # 👇 Verificamos sesión
         if not Sesion.esta_autenticado():
@@ -403,6 +433,10 @@ class EditarEstudiantes(QWidget):
             self.close()
             return
         
+        # El índice se vuelve a cargar al abrir la ventana para ver los cambios
+        # hechos desde otras estaciones; luego se refresca por estudiante
+        IndiceEstudiantes.invalidar()
+
         # Configura título, tamaño y posición de la ventana
         self.setWindowTitle("Editar Estudiantes - Institución Educativa del Sur")
         self.resize(1250, 670)
@@ -571,6 +605,17 @@ class EditarEstudiantes(QWidget):
         btn_buscar.clicked.connect(self.buscar_estudiantes_ui)
 
 
+        # Búsqueda mientras se escribe: cada cambio reinicia el temporizador
+        # y se filtra cuando el usuario deja de escribir
+        self.temporizador_busqueda = QTimer(self)
+        self.temporizador_busqueda.setSingleShot(True)
+        self.temporizador_busqueda.setInterval(RETARDO_BUSQUEDA_MS)
+        self.temporizador_busqueda.timeout.connect(self.buscar_estudiantes_ui)
+        self.txt_nombre.textChanged.connect(self.temporizador_busqueda.start)
+        self.cmb_grado.currentTextChanged.connect(self.temporizador_busqueda.start)
+        self.cmb_estado.currentTextChanged.connect(self.temporizador_busqueda.start)
+
+
         # Layout horizontal de filtros
         filtros_layout = QHBoxLayout()
         filtros_layout.addWidget(lbl_nombre)
@@ -648,13 +693,32 @@ class EditarEstudiantes(QWidget):
         estado = self.cmb_estado.currentText()
 
 
-        # Consulta estudiantes según filtros
-        resultados = buscar_estudiantes(nombre, grado, estado)
+        # Si la búsqueda viene del botón, no repetirla al vencer el temporizador
+        self.temporizador_busqueda.stop()
+
+
+        # Resultados ordenados primero por grado (numérico) y luego por apellido
+        if IndiceEstudiantes.cargado():
+            # Índice en memoria: se filtra al instante (y se descarta la carga pendiente)
+            self.consultas.cancelar()
+            try:
+                resultados = buscar_estudiantes_ordenados(nombre, grado, estado)
+            except ConnectionError as e:
+                # Se invalidó justo antes y no hay conexión para volver a cargarlo
+                self.mostrar_error_busqueda(str(e))
+                return
+            self.mostrar_estudiantes(resultados)
+        else:
+            # Primera búsqueda: el índice se carga en segundo plano
+            self.consultas.ejecutar(buscar_estudiantes_ordenados, nombre, grado, estado)
+
 
-        # --- Ordenar: primero por grado (numérico), luego por apellido ---
-        resultados = sorted(resultados, key=clave_grado_apellido)
+    def mostrar_error_busqueda(self, mensaje):
+        # La búsqueda no pudo completarse (p. ej. sin conexión para cargar el índice)
+        QMessageBox.warning(self, "Error en la búsqueda", f"No se pudo buscar estudiantes:\n{mensaje}")
 
 
+    def mostrar_estudiantes(self, resultados):
         # Ajusta el número de filas de la tabla al número de resultados
         self.tabla.setRowCount(len(resultados))
 
@@ -753,6 +817,12 @@ class EditarEstudiantes(QWidget):
         ventana.exec()
 
 
+    def closeEvent(self, event):
+        # Descarta la búsqueda pendiente para que no llegue a una ventana cerrada
+        self.consultas.cancelar()
+        super().closeEvent(event)
+
+
     def volver_menu(self):
         # Regresa al menú principal
         from menu import InterfazAdministrativa
@@ -4,7 +4,7 @@ import sys
 # Importa widgets y layouts necesarios de PyQt6
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout,
-    QFrame, QComboBox, QTableWidget, QTableWidgetItem,
+    QFrame, QComboBox, QTableView,
     QAbstractItemView, QHeaderView, QDialog, QMessageBox, QStackedLayout, QGraphicsDropShadowEffect
 )
 
@@ -14,8 +14,14 @@ from PyQt6.QtGui import QPixmap, QColor
 # Importa utilidades base de Qt
 from PyQt6.QtCore import Qt
 
-# Importa la función de búsqueda del historial desde la lógica
-from modules.historial_logic import buscar_historial
+# Importa la función de búsqueda del historial (por páginas) desde la lógica
+from modules.historial_logic import buscar_historial_pagina
+
+# Modelo de tabla que carga las páginas siguientes al hacer scroll
+from modules.tabla_paginada import ModeloPaginado
+
+# Consultas en segundo plano (la ventana no se congela mientras busca)
+from modules.consultas_fondo import EjecutorConsultas
 
 # Si usas Sesion como en EditarEstudiantes, mantenlo
 from modules.sesion import Sesion
@@ -27,6 +33,14 @@ class HistorialAccesos(QWidget):
         # Inicializa la clase base QWidget
         super().__init__()
 
+        # La primera página de cada búsqueda se consulta en segundo plano;
+        # una búsqueda nueva cancela la anterior
+        self.consultas = EjecutorConsultas(self)
+        self.consultas.resultado.connect(self.mostrar_historial)
+
+        # Función que trae páginas con los filtros de la última búsqueda
+        self.buscar_pagina = None
+
 
         # Mantengo la verificación de sesión igual que en EditarEstudiantes
         if not Sesion.esta_autenticado():
@@ -96,7 +110,7 @@ class HistorialAccesos(QWidget):
         background-color: #2A2A2A;
         color: white;
     }
-    QTableWidget {
+    QTableView {
         border: none;
         border-radius: 10px;
         background-color: #1E293B;
@@ -115,11 +129,11 @@ class HistorialAccesos(QWidget):
         padding: 10px;
         border-radius: 6px;
     }
-    QTableWidget::item {
+    QTableView::item {
         padding: 8px;
         border-bottom: 1px solid rgba(255,255,255,0.05);
     }
-    QTableWidget::item:hover {
+    QTableView::item:hover {
         background-color: rgba(25,118,210,0.3);
         color: #E3F2FD;
     }
@@ -320,18 +334,18 @@ class HistorialAccesos(QWidget):
         titulo_tabla.setStyleSheet("font-size:16px; font-weight:bold; color:#E3F2FD; margin-top:6px;")
 
 
-        # Tabla con columnas EXACTAS de la maqueta
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(7)
-        self.tabla.setHorizontalHeaderLabels([
+        # Tabla con columnas EXACTAS de la maqueta (modelo con carga por páginas)
+        self.modelo = ModeloPaginado([
             "Estudiante", "Grado", "Equipo", "Fecha", "Hora-Inicio", "Hora - Fin", "Incidente"
-        ])
+        ], self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
         self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.tabla.setAlternatingRowColors(True)
         self.tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.tabla.setShowGrid(False)
         self.tabla.verticalHeader().setVisible(False)
-        self.tabla.setStyleSheet("QTableWidget { background-color: #1E293B; }")
+        self.tabla.setStyleSheet("QTableView { background-color: #1E293B; }")
 
 
         # Mensaje inicial antes de buscar
@@ -379,28 +393,33 @@ class HistorialAccesos(QWidget):
         estado = self.cmb_estado.currentText().strip()
 
 
-        # Ejecuta la búsqueda en la capa lógica
-        resultados = buscar_historial(nombre, grado, fecha, equipo, estado)
+        # Ejecuta la búsqueda en la capa lógica: solo la primera página y en
+        # segundo plano; las siguientes se piden al hacer scroll
+        self.buscar_pagina = lambda despues_de: buscar_historial_pagina(
+            nombre, grado, fecha, equipo, estado, despues_de=despues_de
+        )
+        self.consultas.ejecutar(self.buscar_pagina, None)
+
+
+    def mostrar_historial(self, primera_pagina):
+        # Carga en la tabla la primera página que llegó del hilo de consultas
+        cargadas = self.modelo.iniciar(self.buscar_pagina, primera_pagina)
 
 
-        if not resultados:
+        if not cargadas:
             # Si no hay resultados, muestra la vista de "sin resultados"
             self.stack.setCurrentIndex(2)
-            self.tabla.setRowCount(0)
             return
 
 
         # Si hay resultados, muestra la tabla
         self.stack.setCurrentIndex(1)
-        self.tabla.setRowCount(0)
 
 
-        # Inserta cada fila encontrada en la tabla
-        for fila in resultados:
-            row = self.tabla.rowCount()
-            self.tabla.insertRow(row)
-            for col, valor in enumerate(fila):
-                self.tabla.setItem(row, col, QTableWidgetItem(str(valor)))
+    def closeEvent(self, event):
+        # Descarta la búsqueda pendiente para que no llegue a una ventana cerrada
+        self.consultas.cancelar()
+        super().closeEvent(event)
 
 
     def volver_menu(self):
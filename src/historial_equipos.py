@@ -4,13 +4,15 @@
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout,
-    QFrame, QComboBox, QTableWidget, QTableWidgetItem,
+    QFrame, QComboBox, QTableView,
     QAbstractItemView, QHeaderView, QStackedLayout, QMessageBox
 )
 from PyQt6.QtGui import QPixmap, QColor
 from PyQt6.QtCore import Qt
 
-from modules.historial_equipos_logic import buscar_historial_equipos
+from modules.historial_equipos_logic import buscar_historial_equipos_pagina
+from modules.tabla_paginada import ModeloPaginado
+from modules.consultas_fondo import EjecutorConsultas
 from modules.equipos import obtener_todos_equipos, obtener_estados
 from modules.sesion import Sesion
 
@@ -19,6 +21,11 @@ class HistorialEquipos(QWidget):
     def __init__(self):
         super().__init__()
 
+        # Primera página en segundo plano; una búsqueda nueva cancela la anterior
+        self.consultas = EjecutorConsultas(self)
+        self.consultas.resultado.connect(self.mostrar_historial)
+        self.buscar_pagina = None
+
         if not Sesion.esta_autenticado():
             QMessageBox.critical(self, "Acceso denegado", "❌ Debes iniciar sesión para acceder a esta ventana.")
             self.close()
@@ -75,7 +82,7 @@ class HistorialEquipos(QWidget):
         background-color: #2A2A2A;
         color: white;
     }
-    QTableWidget {
+    QTableView {
         border: none;
         border-radius: 10px;
         background-color: #1E293B;
@@ -94,11 +101,11 @@ class HistorialEquipos(QWidget):
         padding: 10px;
         border-radius: 6px;
     }
-    QTableWidget::item {
+    QTableView::item {
         padding: 8px;
         border-bottom: 1px solid rgba(255,255,255,0.05);
     }
-    QTableWidget::item:hover {
+    QTableView::item:hover {
         background-color: rgba(25,118,210,0.3);
         color: #E3F2FD;
     }
@@ -233,17 +240,17 @@ class HistorialEquipos(QWidget):
         titulo_tabla.setAlignment(Qt.AlignmentFlag.AlignCenter)
         titulo_tabla.setStyleSheet("font-size:16px; font-weight:bold; color:#E3F2FD; margin-top:6px;")
 
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(8)
-        self.tabla.setHorizontalHeaderLabels([
+        self.modelo = ModeloPaginado([
             "Equipo", "Tipo Acción", "Estado Anterior", "Estado Nuevo", "Descripción", "Fecha", "Hora", "Docente"
-        ])
+        ], self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
         self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.tabla.setAlternatingRowColors(True)
         self.tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.tabla.setShowGrid(False)
         self.tabla.verticalHeader().setVisible(False)
-        self.tabla.setStyleSheet("QTableWidget { background-color: #1E293B; }")
+        self.tabla.setStyleSheet("QTableView { background-color: #1E293B; }")
 
         # Mensajes
         lbl_inicial = QLabel("Realiza una búsqueda para mostrar resultados")
@@ -278,21 +285,23 @@ class HistorialEquipos(QWidget):
         tipo = self.cmb_tipo.currentText().strip()
         fecha = self.txt_fecha.text().strip()
 
-        resultados = buscar_historial_equipos(equipo, tipo, fecha)
+        # Primera página en segundo plano; las siguientes se cargan al hacer scroll
+        self.buscar_pagina = lambda despues_de: buscar_historial_equipos_pagina(equipo, tipo, fecha, despues_de=despues_de)
+        self.consultas.ejecutar(self.buscar_pagina, None)
+
+    def mostrar_historial(self, primera_pagina):
+        cargadas = self.modelo.iniciar(self.buscar_pagina, primera_pagina)
 
-        if not resultados:
+        if not cargadas:
             self.stack.setCurrentIndex(2)
-            self.tabla.setRowCount(0)
             return
 
         self.stack.setCurrentIndex(1)
-        self.tabla.setRowCount(0)
 
-        for fila in resultados:
-            row = self.tabla.rowCount()
-            self.tabla.insertRow(row)
-            for col, valor in enumerate(fila):
-                self.tabla.setItem(row, col, QTableWidgetItem(str(valor)))
+    def closeEvent(self, event):
+        # La búsqueda pendiente no debe llegar a una ventana cerrada
+        self.consultas.cancelar()
+        super().closeEvent(event)
 
     def volver_menu(self):
         if not Sesion.esta_autenticado():
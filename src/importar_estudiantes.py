@@ -0,0 +1,55 @@
+# Comando para importar estudiantes en bloque desde un CSV y una carpeta de fotos.
+# Uso (desde la carpeta src):
+#   python importar_estudiantes.py estudiantes.csv carpeta_fotos [--anio 2026] [--lote 200]
+
+# Lectura de argumentos de la línea de comandos
+import argparse
+
+# Salida con código de error
+import sys
+
+# Importación masiva
+from modules.importacion_estudiantes import importar_estudiantes, TAMANO_LOTE
+
+# Migraciones del esquema (columnas que usa la importación)
+from modules.migraciones import aplicar_migraciones
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa estudiantes desde un CSV y una carpeta de fotos.")
+    parser.add_argument("csv", help="CSV con columnas nombres,apellidos,grado,foto")
+    parser.add_argument("fotos", help="Carpeta con las fotos indicadas en la columna foto")
+    parser.add_argument("--anio", type=int, default=None, help="Año de la matrícula (por defecto el actual)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por cada INSERT en bloque")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos para calcular los encodings")
+    args = parser.parse_args()
+
+    # Se asegura de que el esquema esté al día antes de insertar
+    aplicar_migraciones()
+
+    try:
+        reporte = importar_estudiantes(args.csv, args.fotos, args.anio, args.lote, args.procesos)
+    except (OSError, ValueError) as e:
+        print(f"❌ No se pudo leer el CSV: {e}")
+        return 1
+
+    # Resumen
+    print(f"✅ Estudiantes importados: {len(reporte['insertadas'])}")
+
+    for linea, motivo in reporte["advertencias"]:
+        print(f"⚠ Línea {linea}: {motivo}")
+
+    for linea, motivo in reporte["fallidas"]:
+        print(f"❌ Línea {linea}: {motivo}")
+
+    return 1 if reporte["fallidas"] else 0
+
+
+
+if __name__ == "__main__":
+    # Necesario en el ejecutable (PyInstaller) para el pool de procesos que codifica rostros
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    sys.exit(main())
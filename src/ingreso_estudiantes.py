@@ -25,7 +25,14 @@ import face_recognition
 from modules.ingreso_logic import cargar_estudiantes, asignar_equipo, contar_equipos_ocupados
 from PyQt6.QtWidgets import QListWidget, QListWidgetItem
 from modules.sesion import Sesion
-from modules.hardware_checker import obtener_info_hardware
+from modules.matcher import GaleriaRostros
+from modules.seguimiento import SeguidorRostros, identificar_con_seguimiento
+from modules.movimiento import DetectorMovimiento
+from modules.planificador import PlanificadorDeteccion
+from modules.reconocimiento_worker import TrabajadorReconocimiento
+from modules.escritor_bd import EscritorBD
+from modules.camara import ServicioCamara
+from modules.hardware_checker import obtener_info_hardware_rapida
 
 
 
@@ -45,19 +52,17 @@ class IngresoEstudiantes(QWidget):
 
 
         # Estado cámara
-        # Inicializa la cámara principal del sistema
-        self.cap = cv2.VideoCapture(0)
+        # Inicializa la cámara principal del sistema; la cámara se comparte entre ventanas y se abre una sola vez
+        self.cap = ServicioCamara.suscribir(0)
+
+        # Secuencia del último frame mostrado (para no repetir frames)
+        self.ultimo_seq = 0
 
         # Crea un temporizador para actualizar continuamente los frames de video
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
 
 
-        # Contador de frames para optimizar reconocimiento
-        # Permite ejecutar el reconocimiento facial cada cierto número de frames
-        self.frame_count = 0
-
-
         # Guía de silueta
         # Carga la guía visual superpuesta sobre el área de cámara
         self.guia_pix = QPixmap("") \
@@ -81,23 +86,49 @@ class IngresoEstudiantes(QWidget):
             return
 
 
+        # Galería vectorizada con los encodings de todos los estudiantes del grado
+        self.galeria = GaleriaRostros(self.estudiantes_conocidos)
+
+        # Seguimiento de rostros entre análisis (evita recodificar a quien ya se reconoció)
+        self.seguidor = SeguidorRostros()
+
+
         # Estado persistente
         # Diccionario reservado para almacenar información persistente por estudiante
         self.last_seen = {}
 
 
         # --- Info de hardware y capacidad de rostros ---
-        # Obtiene info del hardware desde la sesión (configurada en login) o directamente
-        from modules.sesion import Sesion
-        self.hardware_info = Sesion.get_hardware_info()
-        if self.hardware_info is None:
-            self.hardware_info = obtener_info_hardware()
+        # Obtiene info del hardware desde la sesión (configurada en login), del chequeo
+        # guardado o, si aún no existe, una estimación que se corrige en segundo plano
+        self.hardware_info = obtener_info_hardware_rapida(self.on_hardware_detectado)
         self.max_faces = self.hardware_info["max_faces"]
 
 
         # Construye la interfaz gráfica
         self.init_ui()
 
+        # Filtro de movimiento: solo se analizan frames en los que algo cambió
+        self.detector_movimiento = DetectorMovimiento()
+
+        # Cadencia de análisis adaptativa (compartida por todas las ventanas de cámara)
+        self.planificador = PlanificadorDeteccion.compartido()
+
+        # Hilo de reconocimiento: analiza frames sin congelar el video
+        self.worker = TrabajadorReconocimiento(self.procesar_frame)
+        self.worker.resultado_listo.connect(self.on_reconocidos)
+        self.worker.start()
+
+        # Escritor en segundo plano: la asignación de equipos no bloquea el video
+        self.escritor = EscritorBD({"ingreso": asignar_equipo})
+        self.escritor.completado.connect(self.on_equipo_asignado)
+        self.escritor.fallido.connect(self.on_error_asignacion)
+        self.escritor.en_diario.connect(self.on_asignacion_en_diario)
+        self.escritor.start()
+
+        # { id_estudiante: nombre } de las asignaciones enviadas al escritor
+        self.asignaciones_en_curso = {}
+
         # Inicia el temporizador de actualización de cámara
         self.timer.start(30)
 
@@ -322,7 +353,9 @@ class IngresoEstudiantes(QWidget):
         # Importa el menú principal en el momento de volver
         from menu import InterfazAdministrativa
 
-        # Libera la cámara antes de cambiar de ventana
+        # Detiene el reconocimiento y libera la cámara antes de cambiar de ventana
+        self.timer.stop()
+        self.detener_reconocimiento()
         self.cap.release()
 
         # Abre la ventana del menú principal
@@ -387,10 +420,11 @@ class IngresoEstudiantes(QWidget):
     # Actualización de cámara y reconocimiento facial
     # ---------------------------------------------------
     def update_frame(self):
-        # Captura un frame de la cámara
-        ret, frame = self.cap.read()
-        if not ret:
+        # Toma el frame más reciente sin bloquear; si ya se mostró, no hace nada
+        dato = self.cap.leer_nuevo(self.ultimo_seq)
+        if dato is None:
             return
+        self.ultimo_seq, _, frame = dato
 
         # Voltea el frame horizontalmente para efecto espejo
         frame = cv2.flip(frame, 1)
@@ -409,59 +443,140 @@ class IngresoEstudiantes(QWidget):
         self.lbl_guia.move(0, 0)
 
 
-        # --- Reconocimiento facial cada 5 frames ---
-        self.frame_count += 1
-        if self.frame_count % 5 == 0:
-            # Lista temporal de nombres reconocidos en el frame actual
-            nombres_en_frame = []
+        # --- Reconocimiento facial en el hilo de trabajo ---
+        # El planificador decide la cadencia; en una escena quieta no se vuelve a detectar
+        if not self.planificador.toca_detectar():
+            return
+        if not self.detector_movimiento.hay_movimiento(frame):
+            return
+
+        # Si el hilo sigue ocupado, el frame reemplaza al que esperaba (gana el más reciente)
+        self.worker.enviar_frame(frame)
+        self.planificador.marcar_envio()
+
 
-            # Reduce el tamaño del frame para acelerar el reconocimiento
-            small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
-            rgb_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+    def on_hardware_detectado(self, info):
+        """Aplica el chequeo de hardware terminado en segundo plano (se llama desde ese hilo)."""
+        self.hardware_info = info
+        self.max_faces = info["max_faces"]
 
 
-            # Detecta rostros y limita el número al máximo soportado por el hardware
-            locations = face_recognition.face_locations(rgb_small, model="hog")[:self.max_faces]
+    def procesar_frame(self, frame):
+        """
+        Detecta y reconoce rostros (se ejecuta en el hilo de trabajo).
+        Retorna (nombres reconocidos, rostros detectados).
+        """
+        # Lista temporal de nombres reconocidos en el frame actual
+        nombres_en_frame = []
 
-            # Genera los encodings de los rostros detectados
-            encodings_frame = face_recognition.face_encodings(rgb_small, locations)
+        # Reduce el tamaño del frame para acelerar el reconocimiento
+        small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
+        rgb_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
 
 
-            for encoding in encodings_frame:
-                match_found = False
-                for est in self.estudiantes_conocidos:
-                    for est_enc in est["encodings"]:  # usamos todas las variantes
-                        # Compara el rostro actual con los encodings del estudiante
-                        if face_recognition.compare_faces([est_enc], encoding, tolerance=0.40)[0]:
-                            nombre = est["nombre"]
-                            id_est = est["id"]
+        # Detecta rostros y limita el número al máximo soportado por el hardware
+        locations = face_recognition.face_locations(rgb_small, model="hog")[:self.max_faces]
+        if not locations:
+            return nombres_en_frame, 0
 
-                            # Evita agregar nombres duplicados en el mismo frame
-                            if nombre not in [n for n, _ in nombres_en_frame]:
-                                nombres_en_frame.append((nombre, id_est))
-                            match_found = True
-                            break
-                    if match_found:
-                        break
+        # Solo se codifican los rostros nuevos; los que ya se siguen conservan su identidad
+        reconocidos = identificar_con_seguimiento(
+            self.seguidor, self.galeria, rgb_small, locations, tolerancia=0.40
+        )
+        for est, _ in reconocidos:
+            nombres_en_frame.append((est["nombre"], est["id"]))
 
+        return nombres_en_frame, len(locations)
 
-            # Conjunto de nombres actualmente presentes en cámara
-            # --- Agregar estudiantes reconocidos a la lista ---
-            for nombre, id_est in nombres_en_frame:
-                if nombre in self.nombres_asignados:
-                    continue
-                self.nombres_asignados.add(nombre)
-                equipo = asignar_equipo(id_est)
-                self.lista_asignados.addItem(f"{nombre} - Equipo: {equipo}")
 
-            # --- Actualizar contador ---
-            self.lbl_contador.setText(f"Asignados: {len(self.nombres_asignados)}")
+    def on_reconocidos(self, resultado, duracion):
+        """Recibe en el hilo de la interfaz los estudiantes reconocidos."""
+        nombres_en_frame, rostros = resultado
+
+        # Alimenta al planificador con la duración real del análisis y los rostros
+        # detectados (también los desconocidos: hay gente nueva frente a la cámara)
+        self.planificador.registrar(duracion, rostros)
+
+        # --- Agregar estudiantes reconocidos a la lista ---
+        for nombre, id_est in nombres_en_frame:
+            if nombre in self.nombres_asignados:
+                continue
+            self.nombres_asignados.add(nombre)
+
+            # La asignación se escribe en segundo plano; on_equipo_asignado completa la fila
+            self.asignaciones_en_curso[id_est] = nombre
+            self.lista_asignados.addItem(f"{nombre} - Equipo: asignando...")
+            self.escritor.encolar("ingreso", id_est)
+
+        # --- Actualizar contador ---
+        self.lbl_contador.setText(f"Asignados: {len(self.nombres_asignados)}")
+
+
+    def _item_de(self, nombre):
+        # Busca la fila de la lista que corresponde al estudiante
+        for i in range(self.lista_asignados.count()):
+            item = self.lista_asignados.item(i)
+            if item and item.text().startswith(f"{nombre} - "):
+                return item
+        return None
+
+
+    def on_equipo_asignado(self, tipo, id_est, equipo):
+        """El escritor confirmó la asignación en la BD."""
+        nombre = self.asignaciones_en_curso.pop(id_est, None)
+        if nombre is None:
+            return
+        item = self._item_de(nombre)
+        if item:
+            item.setText(f"{nombre} - Equipo: {equipo}")
+
+
+    def on_asignacion_en_diario(self, tipo, id_est):
+        """Sin conexión: el ingreso quedó en el diario local y el equipo se asigna al reconectar."""
+        nombre = self.asignaciones_en_curso.pop(id_est, None)
+        if nombre is None:
+            return
+        item = self._item_de(nombre)
+        if item:
+            item.setText(f"{nombre} - Equipo: pendiente (sin conexión)")
+
+
+    def on_error_asignacion(self, tipo, id_est, mensaje):
+        """La asignación falló tras los reintentos: se quita de la lista para reintentar al reconocerlo."""
+        nombre = self.asignaciones_en_curso.pop(id_est, None)
+        if nombre is None:
+            return
+        item = self._item_de(nombre)
+        if item:
+            self.lista_asignados.takeItem(self.lista_asignados.row(item))
+        self.nombres_asignados.discard(nombre)
+        self.lbl_contador.setText(f"Asignados: {len(self.nombres_asignados)}")
+        print(f"❌ No se pudo asignar equipo a {nombre}: {mensaje}")
+
+
+    def detener_reconocimiento(self):
+        # Detiene el hilo de reconocimiento si fue creado
+        worker = getattr(self, "worker", None)
+        if worker is not None:
+            worker.detener()
+            self.worker = None
+            print(f"ℹ Ingreso - {self.detector_movimiento.texto_estadisticas()}")
+            print(f"ℹ Ingreso - {self.planificador.texto_estadisticas()}")
+
+        # Termina de escribir las asignaciones pendientes antes de salir
+        escritor = getattr(self, "escritor", None)
+        if escritor is not None:
+            escritor.detener()
+            self.escritor = None
 
 
     def closeEvent(self, event):
         # Detiene el temporizador de actualización
         self.timer.stop()
 
+        # Detiene el hilo de reconocimiento
+        self.detener_reconocimiento()
+
         # Libera la cámara
         self.cap.release()
 
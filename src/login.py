@@ -44,7 +44,25 @@ from PyQt6.QtCore import Qt, QTimer
 
 
 # Función personalizada para cargar los docentes registrados
-from modules.doc_login import cargar_docentes
+from modules.doc_login import cargar_docentes, foto_docente
+
+# Galería vectorizada para comparar rostros contra los docentes registrados
+from modules.matcher import GaleriaRostros
+
+# Cámara compartida por todas las ventanas (siempre entrega el frame más reciente)
+from modules.camara import ServicioCamara
+
+# Hilo de trabajo que ejecuta el reconocimiento fuera de la interfaz
+from modules.reconocimiento_worker import TrabajadorReconocimiento
+
+# Filtro de movimiento antes de la detección de rostros
+from modules.movimiento import DetectorMovimiento
+
+# Cadencia adaptativa del reconocimiento
+from modules.planificador import PlanificadorDeteccion
+
+# Chequeo de hardware (cacheado y en segundo plano)
+from modules.hardware_checker import iniciar_chequeo_en_segundo_plano
 
 # Interfaz del menú principal que se abrirá después del login exitoso
 from menu import InterfazAdministrativa 
@@ -59,6 +77,10 @@ from registro_docente import RegistroDocente
 from modules.validaciones import existe_docente_admin
 
 
+# Resolución con la que el login analiza los frames (la de la cámara antes de compartirla)
+RESOLUCION_ANALISIS = (640, 480)
+
+
 
 
 # -------------------------------
@@ -127,6 +149,9 @@ class InicioSesionDocente(QWidget):
         # Carga la lista de docentes desde la base de datos
         self.docentes = cargar_docentes()
 
+        # Galería vectorizada con los encodings de los docentes
+        self.galeria_docentes = GaleriaRostros(self.docentes)
+
         # Almacena el docente detectado actualmente
         self.docente_detectado = None
 
@@ -143,20 +168,22 @@ class InicioSesionDocente(QWidget):
         self.parpadeo_confirmado = False  # Nuevo estado
 
 
-        # --- Inicializar cámara en 640x480 ---
-        # Abre la cámara principal del dispositivo
-        self.cap = cv2.VideoCapture(0)
+        # --- Cámara compartida ---
+        # Se suscribe a la cámara del proceso (se abre una sola vez para todas las ventanas)
+        self.cap = ServicioCamara.suscribir(0)
 
-        # Configura el ancho de captura
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        # Secuencia del último frame mostrado (para no repetir frames)
+        self.ultimo_seq = 0
 
-        # Configura el alto de captura
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
 
+        # --- Chequeo de hardware en segundo plano ---
+        # Usa el resultado guardado en config.json si el equipo no cambió;
+        # así las ventanas de ingreso/salida abren sin esperar a la cámara
+        iniciar_chequeo_en_segundo_plano()
 
-        # Control de frames
-        # Contador usado para procesar reconocimiento solo cada cierto número de frames
-        self.frame_count = 0
+
+        # Hilo de reconocimiento (se crea cuando el detector dlib ya está cargado)
+        self.worker = None
 
 
         # Temporizador que actualiza continuamente la imagen de la cámara
@@ -196,6 +223,20 @@ class InicioSesionDocente(QWidget):
         self.init_ui()
 
 
+        # Filtro de movimiento: sin nadie frente a la cámara solo se analizan frames con cambios
+        self.detector_movimiento = DetectorMovimiento()
+        self.hay_rostros = False
+
+        # Cadencia de análisis adaptativa (compartida por todas las ventanas de cámara)
+        self.planificador = PlanificadorDeteccion.compartido()
+
+
+        # Hilo de reconocimiento: analiza frames sin congelar el video
+        self.worker = TrabajadorReconocimiento(self.procesar_frame)
+        self.worker.resultado_listo.connect(self.on_analisis)
+        self.worker.start()
+
+
     def centrar_ventana(self, ancho, alto):
         # Obtiene la geometría de la pantalla principal
         screen = QApplication.primaryScreen().geometry()
@@ -392,8 +433,9 @@ class InicioSesionDocente(QWidget):
             # Obtiene el rol o usa "docente" por defecto
             "rol": d.get("rol") or "docente",
 
-            # Normaliza la foto antes de guardarla en sesión
-            "foto": normalizar_foto(d.get("foto_rostro") or d.get("foto"))
+            # Normaliza la foto antes de guardarla en sesión (si la carga no la
+            # trajo porque el encoding estaba guardado, se pide solo la de este docente)
+            "foto": normalizar_foto(d.get("foto_rostro") or d.get("foto") or foto_docente(d.get("cedula")))
         }
 
 
@@ -450,12 +492,11 @@ class InicioSesionDocente(QWidget):
 
 
     def update_frame(self):
-        # Captura un frame de la cámara
-        ret, frame = self.cap.read()
-
-        # Si no se pudo capturar el frame, sale del método
-        if not ret:
+        # Toma el frame más reciente sin bloquear; si ya se mostró, no hace nada
+        dato = self.cap.leer_nuevo(self.ultimo_seq)
+        if dato is None:
             return
+        self.ultimo_seq, _, frame = dato
 
 
         # Flip horizontal para efecto espejo
@@ -476,11 +517,35 @@ class InicioSesionDocente(QWidget):
         self.lbl_guia.move(0, 0)
 
 
-        # Procesar detección SOLO cada 12 frames
-        self.frame_count += 1
-        if self.frame_count % 12 != 0:
+        # El planificador decide la cadencia según lo que tarda el análisis
+        if not self.planificador.toca_detectar():
+            return
+
+        # Con un rostro en pantalla se analizan todos los frames programados (el
+        # parpadeo es un cambio mínimo); sin rostro, solo los frames con movimiento
+        movimiento = self.detector_movimiento.hay_movimiento(rgb_frame)
+        if not self.hay_rostros and not movimiento:
             return
 
+        # Envía el frame al hilo de reconocimiento (si está ocupado, gana el más reciente)
+        if self.worker is not None:
+            self.worker.enviar_frame(rgb_frame)
+            self.planificador.marcar_envio()
+
+
+    def procesar_frame(self, rgb_frame):
+        """
+        Reconoce al docente y mide el parpadeo (se ejecuta en el hilo de trabajo).
+        No toca la interfaz: retorna un diccionario que aplica on_analisis().
+        """
+        resultado = {"hay_rostros": False, "docente": None, "encoding": None, "parpadeo": False}
+
+
+        # La cámara compartida captura en RESOLUCION_CAPTURA; el login analiza a
+        # 640x480 como antes para no duplicar el costo de la detección
+        alto, ancho = rgb_frame.shape[:2]
+        if ancho > RESOLUCION_ANALISIS[0]:
+            rgb_frame = cv2.resize(rgb_frame, RESOLUCION_ANALISIS, interpolation=cv2.INTER_AREA)
 
         # Reducir resolución para procesar más rápido
         small_frame = cv2.resize(rgb_frame, (0, 0), fx=0.25, fy=0.25)
@@ -496,33 +561,20 @@ class InicioSesionDocente(QWidget):
         face_encodings = face_recognition.face_encodings(small_frame, face_locations)
 
 
-        # Reinicia el docente detectado en cada ciclo de análisis
-        self.docente_detectado = None
-
         if face_encodings:
-            for face_encoding in face_encodings:
-                # Compara el rostro actual con los encodings registrados de los docentes
-                matches = face_recognition.compare_faces(
-                    [d["encoding"] for d in self.docentes],
-                    face_encoding,
-                    tolerance=0.5
-                )
+            resultado["hay_rostros"] = True
 
-                # Si hay coincidencia con algún docente registrado
-                if True in matches:
-                    idx = matches.index(True)
-                    docente = self.docentes[idx]
-                    self.docente_detectado = docente
-                    self.lbl_docente.setText(f"Docente: {docente['nombres']} {docente['apellidos']}")
-                    self.verificar_movimiento(face_encoding)
-                    break
-
-            # Si se detectó rostro, pero no coincide con ningún docente
-            if not self.docente_detectado:
-                self.lbl_docente.setText("Docente: No reconocido")
-        else:
-            # Si no se detecta ningún rostro en pantalla
-            self.lbl_docente.setText("Docente: [ninguno]")
+            # Compara todos los rostros contra todos los docentes en una sola operación
+            resultados = self.galeria_docentes.buscar(face_encodings, tolerancia=0.5)
+
+            # Toma el rostro con la coincidencia más cercana
+            candidatos = [
+                (r[1], i, r[0]) for i, r in enumerate(resultados) if r is not None
+            ]
+            if candidatos:
+                _, idx, docente = min(candidatos, key=lambda c: c[0])
+                resultado["docente"] = docente
+                resultado["encoding"] = face_encodings[idx]
 
 
         # ----------------------------
@@ -550,8 +602,42 @@ class InicioSesionDocente(QWidget):
 
 
             if ear < 0.20:  # ojo cerrado
-                # Guarda el instante en que se detectó un parpadeo
-                self.ultimo_parpadeo = time.time()
+                resultado["parpadeo"] = True
+
+        return resultado
+
+
+    def on_analisis(self, resultado, duracion):
+        """Aplica en el hilo de la interfaz el resultado del análisis del frame."""
+        # Alimenta al planificador con la duración real del análisis
+        self.planificador.registrar(duracion, 1 if resultado["hay_rostros"] else 0)
+
+        # Si la sesión ya fue confirmada, ignora resultados atrasados
+        if self.parpadeo_confirmado:
+            return
+
+
+        # Reinicia el docente detectado en cada ciclo de análisis
+        self.docente_detectado = resultado["docente"]
+        self.hay_rostros = resultado["hay_rostros"]
+
+        if resultado["hay_rostros"]:
+            # Si hay coincidencia con algún docente registrado
+            if self.docente_detectado:
+                docente = self.docente_detectado
+                self.lbl_docente.setText(f"Docente: {docente['nombres']} {docente['apellidos']}")
+                self.verificar_movimiento(resultado["encoding"])
+            else:
+                # Si se detectó rostro, pero no coincide con ningún docente
+                self.lbl_docente.setText("Docente: No reconocido")
+        else:
+            # Si no se detecta ningún rostro en pantalla
+            self.lbl_docente.setText("Docente: [ninguno]")
+
+
+        if resultado["parpadeo"]:
+            # Guarda el instante en que se detectó un parpadeo
+            self.ultimo_parpadeo = time.time()
 
 
         # ----------------------------
@@ -566,15 +652,24 @@ class InicioSesionDocente(QWidget):
             elif time.time() - self.ultimo_parpadeo > 6:
                 self.lbl_docente.setText("❌ Parpadea porfa")
             else:
-                if not self.parpadeo_confirmado:
-                    # Marca la validación como exitosa para no repetir el inicio de sesión
-                    self.parpadeo_confirmado = True
-                    self.lbl_docente.setText(
-                        f"✅ Bienvenido {self.docente_detectado['nombres']} {self.docente_detectado['apellidos']}, redirigiendo..."
-                    )
+                # Marca la validación como exitosa para no repetir el inicio de sesión
+                self.parpadeo_confirmado = True
+                self.lbl_docente.setText(
+                    f"✅ Bienvenido {self.docente_detectado['nombres']} {self.docente_detectado['apellidos']}, redirigiendo..."
+                )
 
-                    # esperar 3s y luego iniciar sesión y abrir menú
-                    QTimer.singleShot(3000, self.confirmar_e_iniciar_sesion)
+                # esperar 3s y luego iniciar sesión y abrir menú
+                QTimer.singleShot(3000, self.confirmar_e_iniciar_sesion)
+
+
+    def detener_reconocimiento(self):
+        # Detiene el hilo de reconocimiento si fue creado
+        worker = getattr(self, "worker", None)
+        if worker is not None:
+            worker.detener()
+            self.worker = None
+            print(f"ℹ Login - {self.detector_movimiento.texto_estadisticas()}")
+            print(f"ℹ Login - {self.planificador.texto_estadisticas()}")
 
 
     def verificar_movimiento(self, encoding_actual):
@@ -591,7 +686,9 @@ class InicioSesionDocente(QWidget):
 
 
     def abrir_menu(self):
-        # Libera la cámara antes de cambiar de ventana
+        # Detiene el video y el reconocimiento, y libera la cámara antes de cambiar de ventana
+        self.timer.stop()
+        self.detener_reconocimiento()
         self.cap.release()
 
 
@@ -615,6 +712,9 @@ class InicioSesionDocente(QWidget):
 
 
     def closeEvent(self, event):
+        # Detiene el hilo de reconocimiento si está corriendo
+        self.detener_reconocimiento()
+
         # Verifica que el atributo cap exista y no sea nulo
         if hasattr(self, "cap") and self.cap is not None:
             try:
@@ -630,6 +730,18 @@ class InicioSesionDocente(QWidget):
 
 
 if __name__ == "__main__":
+    # Necesario en el ejecutable (PyInstaller) para el pool de procesos que codifica rostros
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # Aplica las migraciones pendientes del esquema (índices, columnas nuevas)
+    from modules.migraciones import aplicar_migraciones
+    aplicar_migraciones()
+
+    # Envía a la BD lo que haya quedado en el diario local (registros sin conexión)
+    from modules.diario_local import DiarioLocal
+    DiarioLocal.iniciar_reproductor()
+
     # Crea la aplicación principal de PyQt
     app = QApplication(sys.argv)
 
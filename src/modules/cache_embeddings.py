@@ -0,0 +1,300 @@
+# modules/cache_embeddings.py
+# Cache persistente de encodings faciales (vectores de 128 valores).
+# Cada entrada se identifica por una clave (ej. "est:202506101") y guarda
+# el hash de los bytes de la foto con la que se calculó; si la foto cambia,
+# el hash deja de coincidir y el encoding se recalcula.
+
+# Utilidades para manejo de archivos y rutas
+import os
+
+# Permite calcular el hash de los bytes de la foto
+import hashlib
+
+# Lock para proteger el cache si se usa desde varios hilos
+import threading
+
+# Librería para operaciones numéricas y manejo de arreglos
+import numpy as np
+
+# Librería OpenCV para decodificar las fotos
+import cv2
+
+# Librería para reconocimiento facial
+import face_recognition
+
+
+# Ruta del archivo del cache (se guarda en el mismo directorio que config.json)
+CACHE_PATH = "embeddings_cache.npz"
+
+# Dimensión de los vectores generados por face_recognition
+DIMENSION_ENCODING = 128
+
+# Versión del codificador guardada junto al encoding en la base de datos.
+# Si cambia el modelo o el formato, los encodings con otra versión se recalculan.
+VERSION_ENCODER = "fr-1.3.0-f32"
+
+# Máximo de ids por consulta al traer las fotos que faltan
+LOTE_FOTOS = 500
+
+
+# Estado en memoria: { clave: (hash_foto, [np.ndarray, ...]) }
+_entradas = None
+
+# Indica si hay cambios pendientes por guardar en disco
+_modificado = False
+
+# Lock que protege _entradas y _modificado
+_lock = threading.Lock()
+
+
+
+# ----------------------------------------------------
+# Hash de la foto (identifica si la imagen cambió)
+# ----------------------------------------------------
+def hash_foto(foto_bytes):
+    """Retorna el hash SHA-1 (hex) de los bytes de la foto."""
+    return hashlib.sha1(bytes(foto_bytes)).hexdigest()
+
+
+
+# ----------------------------------------------------
+# Calcular encodings a partir de los bytes de una foto
+# ----------------------------------------------------
+def codificar_foto(foto_bytes):
+    """
+    Decodifica la foto (JPG/PNG en bytes) y calcula sus encodings faciales.
+    Retorna una lista de np.ndarray (vacía si no se detectó rostro)
+    o None si la imagen no se pudo decodificar.
+    """
+    # Convierte los bytes a un arreglo NumPy y decodifica la imagen
+    np_arr = np.frombuffer(foto_bytes, np.uint8)
+    img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+
+    # Convierte de BGR a RGB para face_recognition
+    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return face_recognition.face_encodings(rgb)
+
+
+
+# ----------------------------------------------------
+# Formato binario de la columna encoding_rostro
+# (vectores float32 concatenados: 512 bytes por encoding)
+# ----------------------------------------------------
+def serializar_encodings(encodings):
+    """Convierte una lista de encodings a bytes para guardarlos en la BD."""
+    if not encodings:
+        return b""
+    return np.asarray(encodings, dtype="<f4").reshape(-1, DIMENSION_ENCODING).tobytes()
+
+
+def deserializar_encodings(blob):
+    """Convierte los bytes de la columna encoding_rostro en lista de encodings."""
+    matriz = np.frombuffer(bytes(blob), dtype="<f4").reshape(-1, DIMENSION_ENCODING)
+    return [fila.astype(np.float64) for fila in matriz]
+
+
+def encodings_desde_fila(clave, foto_bytes, encoding_blob, version):
+    """
+    Obtiene los encodings de una fila de la BD.
+    Usa la columna encoding_rostro si existe y su versión es la actual;
+    si falta o está desactualizada, codifica la foto (a través del cache).
+
+    Retorna (encodings, recalculado). encodings es None si no hay foto válida;
+    recalculado indica que conviene guardar el resultado de vuelta en la BD.
+    """
+    # Encoding guardado al momento de la inscripción
+    if encoding_blob is not None and version == VERSION_ENCODER:
+        return deserializar_encodings(encoding_blob), False
+
+    # Respaldo: codificar la foto
+    if foto_bytes is None:
+        return None, False
+    return obtener_encodings(clave, foto_bytes), True
+
+
+
+def cargar_fotos_faltantes(conexion, tabla, campo_id, filas):
+    """
+    Las cargas consultan las filas sin foto_rostro (el LONGBLOB es lo más
+    pesado). Aquí se trae la foto, con una segunda consulta, solo de las filas
+    cuyo encoding_rostro falta o es de otra versión; las demás quedan con
+    foto_rostro None.
+    """
+    faltan = {}
+    for row in filas:
+        row["foto_rostro"] = None
+        if row.get("encoding_rostro") is None or row.get("version_encoding") != VERSION_ENCODER:
+            faltan[row[campo_id]] = row
+    if not faltan:
+        return
+
+    ids = list(faltan)
+    cursor = conexion.cursor()
+    try:
+        for inicio in range(0, len(ids), LOTE_FOTOS):
+            lote = ids[inicio:inicio + LOTE_FOTOS]
+            marcas = ", ".join(["%s"] * len(lote))
+            # tabla y campo_id son constantes del código, no datos del usuario
+            cursor.execute(f"SELECT {campo_id}, foto_rostro FROM {tabla} WHERE {campo_id} IN ({marcas})", lote)
+            for fila in cursor.fetchall():
+                faltan[fila[campo_id]]["foto_rostro"] = fila["foto_rostro"]
+    finally:
+        cursor.close()
+
+
+
+def guardar_encodings_en_bd(conexion, tabla, campo_id, pendientes):
+    """
+    Guarda de vuelta en la BD los encodings que tuvieron que recalcularse,
+    para que la próxima carga los lea directamente de la columna.
+    pendientes: lista de (id, encodings).
+    """
+    if not pendientes:
+        return
+
+    filas = [(serializar_encodings(encs), VERSION_ENCODER, id_) for id_, encs in pendientes]
+    cursor = conexion.cursor()
+    try:
+        # tabla y campo_id son constantes del código, no datos del usuario
+        cursor.executemany(
+            f"UPDATE {tabla} SET encoding_rostro = %s, version_encoding = %s WHERE {campo_id} = %s",
+            filas
+        )
+        conexion.commit()
+    except Exception as e:
+        # No es crítico: la próxima carga volverá a usar la foto
+        print(f"⚠ No se pudieron guardar los encodings en {tabla}: {e}")
+        conexion.rollback()
+    finally:
+        cursor.close()
+
+
+
+# ----------------------------------------------------
+# Lectura y escritura del archivo de cache
+# ----------------------------------------------------
+def _cargar_desde_disco():
+    """Lee el archivo .npz del cache; si no existe o está corrupto retorna {}."""
+    if not os.path.exists(CACHE_PATH):
+        return {}
+
+    try:
+        with np.load(CACHE_PATH, allow_pickle=False) as data:
+            claves = data["claves"]
+            hashes = data["hashes"]
+            conteos = data["conteos"]
+            vectores = data["vectores"]
+    except Exception as e:
+        print(f"⚠ No se pudo leer el cache de encodings: {e}")
+        return {}
+
+    # Reconstruye el diccionario separando los vectores de cada entrada
+    entradas = {}
+    inicio = 0
+    for clave, h, n in zip(claves, hashes, conteos):
+        n = int(n)
+        entradas[str(clave)] = (str(h), [vectores[i] for i in range(inicio, inicio + n)])
+        inicio += n
+    return entradas
+
+
+def _entradas_cargadas():
+    """Retorna el diccionario en memoria, leyéndolo de disco la primera vez."""
+    global _entradas
+    if _entradas is None:
+        _entradas = _cargar_desde_disco()
+    return _entradas
+
+
+def guardar_cache():
+    """Guarda el cache en disco solo si hubo cambios desde la última escritura."""
+    global _modificado
+    with _lock:
+        if not _modificado or _entradas is None:
+            return
+
+        claves, hashes, conteos, vectores = [], [], [], []
+        for clave, (h, encodings) in _entradas.items():
+            claves.append(clave)
+            hashes.append(h)
+            conteos.append(len(encodings))
+            vectores.extend(encodings)
+
+        # Todos los vectores se guardan en una sola matriz contigua
+        if vectores:
+            matriz = np.asarray(vectores, dtype=np.float64)
+        else:
+            matriz = np.empty((0, DIMENSION_ENCODING), dtype=np.float64)
+
+        try:
+            # Escribe primero a un archivo temporal para no dejar el cache a medias
+            tmp_path = CACHE_PATH + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    claves=np.array(claves, dtype=str),
+                    hashes=np.array(hashes, dtype=str),
+                    conteos=np.array(conteos, dtype=np.int32),
+                    vectores=matriz
+                )
+            os.replace(tmp_path, CACHE_PATH)
+            _modificado = False
+        except OSError as e:
+            print(f"⚠ No se pudo guardar el cache de encodings: {e}")
+
+
+
+# ----------------------------------------------------
+# Consulta y actualización de entradas
+# ----------------------------------------------------
+def buscar_encodings(clave, foto_hash):
+    """
+    Retorna la lista de encodings guardada para la clave si el hash coincide,
+    o None si no hay entrada o la foto cambió.
+    """
+    with _lock:
+        entrada = _entradas_cargadas().get(clave)
+    if entrada and entrada[0] == foto_hash:
+        return entrada[1]
+    return None
+
+
+def registrar_encodings(clave, foto_hash, encodings):
+    """Guarda (o reemplaza) en memoria los encodings de una clave."""
+    global _modificado
+    with _lock:
+        _entradas_cargadas()[clave] = (foto_hash, [np.asarray(e, dtype=np.float64) for e in encodings])
+        _modificado = True
+
+
+def obtener_encodings(clave, foto_bytes):
+    """
+    Retorna los encodings de la foto usando el cache.
+    Solo se vuelve a codificar si la clave no existe o el hash de la foto cambió.
+    Retorna None si la foto no se pudo decodificar.
+    """
+    foto_hash = hash_foto(foto_bytes)
+
+    # Si ya existe un encoding para esta misma foto, se reutiliza
+    encodings = buscar_encodings(clave, foto_hash)
+    if encodings is not None:
+        return encodings
+
+    # Si no existe o la foto cambió, se calcula y se guarda
+    encodings = codificar_foto(foto_bytes)
+    if encodings is None:
+        return None
+    registrar_encodings(clave, foto_hash, encodings)
+    return encodings
+
+
+def clave_estudiante(id_estudiante):
+    """Clave del cache para la foto de un estudiante."""
+    return f"est:{id_estudiante}"
+
+
+def clave_docente(cedula):
+    """Clave del cache para la foto de un docente."""
+    return f"doc:{cedula}"
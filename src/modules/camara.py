@@ -0,0 +1,469 @@
+# modules/camara.py
+# Lectura de la cámara en un hilo de fondo.
+# cv2.VideoCapture.read() bloquea hasta que el driver entrega un frame; si se
+# llama desde el QTimer congela la interfaz y, cuando el procesamiento se
+# atrasa, el buffer del driver entrega frames viejos. LectorCamara lee de forma
+# continua en su propio hilo y guarda solo el frame más reciente, con su
+# número de secuencia y el instante en que se capturó.
+# ServicioCamara comparte un único LectorCamara entre todas las ventanas del
+# programa, para no pagar la apertura del dispositivo en cada pantalla.
+
+# Manejo de tiempos (marca de tiempo de cada frame)
+import time
+
+# Hilo de lectura y lock del último frame
+import threading
+
+# Permite cerrar la cámara compartida al terminar el programa
+import atexit
+
+# Permite elegir el backend de cámara según el sistema operativo
+import sys
+
+# Nombre del dispositivo que informa el sistema (Linux)
+import os
+
+# OpenCV para acceder a la cámara
+import cv2
+
+
+# Resoluciones típicas (de mayor a menor calidad) que se prueban una sola vez
+RESOLUCIONES_COMUNES = [
+    (3840, 2160),  # 4K
+    (2560, 1440),  # 2K
+    (1920, 1080),  # Full HD
+    (1280, 720),   # HD
+    (1024, 576),
+    (800, 600),
+    (640, 480)
+]
+
+# Resolución de captura usada por las ventanas (si la cámara la soporta)
+RESOLUCION_CAPTURA = (1280, 720)
+
+# Segundos que la cámara sigue abierta después de la última suscripción,
+# para que al cambiar de ventana no haya que volver a abrirla
+TIEMPO_GRACIA = 15
+
+# En Windows DirectShow abre la cámara mucho más rápido que el backend por defecto
+API_POR_DEFECTO = cv2.CAP_DSHOW if sys.platform.startswith("win") else None
+
+
+
+# ============================================================
+# 🔹 FUNCIÓN: probar_resolucion_maxima
+# ------------------------------------------------------------
+# Prueba las resoluciones comunes sobre una cámara ya abierta y
+# devuelve la más alta que el dispositivo acepta.
+# ============================================================
+def probar_resolucion_maxima(cap):
+    # Resolución mínima garantizada en caso de no encontrar una mejor
+    max_res = (640, 480)
+
+    for w, h in RESOLUCIONES_COMUNES:
+        # Intenta configurar la cámara con esa resolución
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+
+        # Obtiene la resolución real establecida por la cámara
+        real_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        real_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        # Guarda la mayor resolución alcanzada correctamente
+        if real_w >= max_res[0] and real_h >= max_res[1]:
+            max_res = (real_w, real_h)
+
+    return max_res
+
+
+
+# ============================================================
+# 🔹 FUNCIÓN: nombre_dispositivo
+# ------------------------------------------------------------
+# Identidad de la cámara según el sistema operativo, sin abrirla.
+# En Windows se consulta WMI (nombre e id PnP, que incluye el
+# fabricante y el producto USB); en Linux se lee de /sys (nombre
+# y, si es USB, fabricante, producto y serie). Si no se puede
+# averiguar retorna None.
+# ============================================================
+def nombre_dispositivo(indice=0):
+    if sys.platform.startswith("win"):
+        return _camaras_windows()
+
+    base = f"/sys/class/video4linux/video{indice}"
+    if not os.path.isdir(base):
+        return None
+
+    partes = []
+    # El nombre está en el nodo de video; los ids USB, en el dispositivo padre
+    for ruta in ("name", "device/../idVendor", "device/../idProduct", "device/../serial"):
+        try:
+            with open(os.path.join(base, ruta), encoding="utf-8") as f:
+                partes.append(f.read().strip())
+        except OSError:
+            continue
+    return ":".join(partes) or None
+
+
+def _camaras_windows():
+    # pywin32 solo existe en Windows (está en requirements.txt)
+    try:
+        import pythoncom
+        import win32com.client
+    except ImportError:
+        return None
+
+    # Se llama desde el hilo del chequeo de hardware: COM se inicializa por hilo
+    pythoncom.CoInitialize()
+    try:
+        wmi = win32com.client.GetObject("winmgmts:")
+        dispositivos = wmi.ExecQuery(
+            "SELECT Name, PNPDeviceID FROM Win32_PnPEntity WHERE PNPClass = 'Camera' OR PNPClass = 'Image'"
+        )
+        # WMI no enumera en el mismo orden que los índices de DirectShow: se usa
+        # el conjunto de cámaras conectadas (cambiar cualquiera cambia la huella)
+        camaras = sorted(f"{d.Name}:{d.PNPDeviceID}" for d in dispositivos)
+    except Exception as e:
+        print(f"⚠ No se pudo consultar las cámaras en WMI: {e}")
+        return None
+    finally:
+        pythoncom.CoUninitialize()
+    return "|".join(camaras) or None
+
+
+
+# ============================================================
+# 🔹 CLASE: LectorCamara
+# ------------------------------------------------------------
+# Mantiene compatibilidad con la parte de cv2.VideoCapture que
+# usan las ventanas (read, isOpened, release) y agrega
+# leer_nuevo() para obtener solo frames que aún no se vieron.
+# ============================================================
+class LectorCamara:
+    def __init__(self, indice=0, api=None, ancho=None, alto=None, probar_resolucion=False):
+        # Índice del dispositivo y backend de OpenCV (ej. cv2.CAP_DSHOW)
+        self.indice = indice
+        self.api = api
+
+        # Resolución solicitada (opcional)
+        self.ancho = ancho
+        self.alto = alto
+
+        # Si es True, al abrir se prueba la resolución máxima soportada
+        self.probar_resolucion = probar_resolucion
+        self.resolucion_maxima = None
+
+        # Prueba pedida con la cámara ya abierta (la hace el hilo de lectura, dueño de cap)
+        self._prueba_pedida = threading.Event()
+        self._prueba_lista = threading.Event()
+
+        # Objeto de captura de OpenCV (solo lo usa el hilo de lectura)
+        self.cap = None
+
+        # Último frame leído con su secuencia y marca de tiempo
+        self._frame = None
+        self._seq = 0
+        self._ts = None
+
+        # Lock que protege el último frame
+        self._lock = threading.Lock()
+
+        # Control del hilo de lectura
+        self._hilo = None
+        self._activo = False
+
+
+    # ---------------------------
+    # Ciclo de vida
+    # ---------------------------
+    def iniciar(self):
+        """Abre la cámara y arranca el hilo de lectura. Retorna self."""
+        if self._activo:
+            return self
+
+        # Abre el dispositivo con el backend indicado (si hay)
+        if self.api is None:
+            self.cap = cv2.VideoCapture(self.indice)
+        else:
+            self.cap = cv2.VideoCapture(self.indice, self.api)
+
+        # Prueba una sola vez la resolución máxima soportada por la cámara
+        if self.probar_resolucion and self.cap.isOpened():
+            self.resolucion_maxima = probar_resolucion_maxima(self.cap)
+
+        # Ajusta la resolución si se solicitó
+        if self.ancho and self.alto:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.ancho)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.alto)
+
+        # Buffer mínimo en el driver: interesa el frame más nuevo, no la cola
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        if not self.cap.isOpened():
+            print(f"⚠ No se pudo abrir la cámara {self.indice}")
+            return self
+
+        self._activo = True
+        self._hilo = threading.Thread(target=self._ciclo_lectura, name="LectorCamara", daemon=True)
+        self._hilo.start()
+        return self
+
+
+    def release(self):
+        """Detiene el hilo de lectura y libera la cámara."""
+        self._activo = False
+        if self._hilo is not None:
+            self._hilo.join(timeout=2)
+            self._hilo = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+    def isOpened(self):
+        # La cámara está disponible si el hilo de lectura está corriendo
+        return self._activo
+
+
+    def probar(self, espera=10):
+        """
+        Prueba la resolución máxima con la cámara ya abierta (si no se probó al
+        abrirla). Retorna la resolución o None si la cámara no está disponible.
+        """
+        if self.resolucion_maxima is not None or not self._activo:
+            return self.resolucion_maxima
+        self._prueba_lista.clear()
+        self._prueba_pedida.set()
+        self._prueba_lista.wait(espera)
+        return self.resolucion_maxima
+
+
+    def _ciclo_lectura(self):
+        # Lee frames de forma continua y conserva solo el más reciente
+        fallos = 0
+        while self._activo:
+            # Prueba pedida desde otro hilo: se hace entre lecturas y se vuelve a la resolución de captura
+            if self._prueba_pedida.is_set():
+                self._prueba_pedida.clear()
+                self.resolucion_maxima = probar_resolucion_maxima(self.cap)
+                if self.ancho and self.alto:
+                    self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.ancho)
+                    self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.alto)
+                self._prueba_lista.set()
+
+            ret, frame = self.cap.read()
+            if not ret:
+                # Evita un ciclo ocupado si la cámara deja de responder
+                fallos += 1
+                time.sleep(min(0.5, 0.01 * fallos))
+                continue
+            fallos = 0
+
+            with self._lock:
+                self._frame = frame
+                self._seq += 1
+                self._ts = time.monotonic()
+
+
+    # ---------------------------
+    # Lectura del último frame
+    # ---------------------------
+    def read(self):
+        """
+        Igual que cv2.VideoCapture.read() pero sin bloquear:
+        retorna (True, frame) con el frame más reciente o (False, None).
+        """
+        with self._lock:
+            frame = self._frame
+        return (frame is not None), frame
+
+
+    def leer_nuevo(self, ultimo_seq=0):
+        """
+        Retorna (seq, timestamp, frame) si hay un frame más nuevo que ultimo_seq,
+        o None si el consumidor ya vio el frame más reciente.
+        """
+        with self._lock:
+            if self._frame is None or self._seq <= ultimo_seq:
+                return None
+            return self._seq, self._ts, self._frame
+
+
+
+# ============================================================
+# 🔹 CLASE: SuscripcionCamara
+# ------------------------------------------------------------
+# Lo que recibe cada ventana del ServicioCamara. Expone la misma
+# interfaz que LectorCamara; release() solo descuenta la
+# suscripción, la cámara la cierra el servicio.
+# ============================================================
+class SuscripcionCamara:
+    def __init__(self, lector):
+        # Lector compartido por todas las suscripciones
+        self._lector = lector
+        self._liberada = False
+
+
+    def read(self):
+        return self._lector.read()
+
+
+    def leer_nuevo(self, ultimo_seq=0):
+        return self._lector.leer_nuevo(ultimo_seq)
+
+
+    def isOpened(self):
+        return not self._liberada and self._lector.isOpened()
+
+
+    def release(self):
+        # Se puede llamar varias veces (volver_menu y closeEvent); solo descuenta una
+        if self._liberada:
+            return
+        self._liberada = True
+        ServicioCamara._liberar(self._lector.indice)
+
+
+
+# ============================================================
+# 🔹 CLASE: ServicioCamara
+# ------------------------------------------------------------
+# Cámara compartida por todo el proceso. Se abre una sola vez,
+# negocia la resolución una sola vez y entrega suscripciones con
+# conteo de referencias a cada ventana.
+# ============================================================
+class ServicioCamara:
+    # { indice: LectorCamara }
+    _lectores = {}
+
+    # { indice: cantidad de suscripciones activas }
+    _referencias = {}
+
+    # { indice: threading.Timer que cierra la cámara tras el tiempo de gracia }
+    _cierres = {}
+
+    # { indice: threading.Event } aperturas en curso (las demás suscripciones esperan esa)
+    _aperturas = {}
+
+    # Lock que protege el estado compartido
+    _lock = threading.Lock()
+
+
+    @classmethod
+    def suscribir(cls, indice=0, probar_resolucion=False):
+        """
+        Retorna una SuscripcionCamara sobre la cámara indicada.
+        La primera suscripción abre el dispositivo; las siguientes lo reutilizan.
+        probar_resolucion: prueba la resolución máxima (solo lo pide el chequeo
+        de hardware cuando no hay uno guardado; la prueba tarda varios segundos).
+        """
+        with cls._lock:
+            # Si había un cierre programado, se cancela
+            cierre = cls._cierres.pop(indice, None)
+            if cierre is not None:
+                cierre.cancel()
+            cls._referencias[indice] = cls._referencias.get(indice, 0) + 1
+
+        while True:
+            with cls._lock:
+                lector = cls._lectores.get(indice)
+                if lector is not None and lector.isOpened():
+                    break
+
+                # Solo una suscripción abre el dispositivo; las demás esperan a que termine
+                apertura = cls._aperturas.get(indice)
+                abrir = apertura is None
+                if abrir:
+                    apertura = threading.Event()
+                    cls._aperturas[indice] = apertura
+
+            if not abrir:
+                apertura.wait()
+                with cls._lock:
+                    lector = cls._lectores.get(indice)
+                if lector is not None:
+                    break
+                # Se cerró mientras esperaba: se vuelve a intentar
+                continue
+
+            # Abrir la cámara tarda (0.5-2 s): se hace fuera del lock
+            # para no bloquear las suscripciones y liberaciones de otras ventanas
+            ancho, alto = RESOLUCION_CAPTURA
+            lector = LectorCamara(indice, API_POR_DEFECTO, ancho, alto, probar_resolucion=probar_resolucion)
+            try:
+                lector.iniciar()
+            finally:
+                with cls._lock:
+                    cls._lectores[indice] = lector
+                    cls._aperturas.pop(indice, None)
+                apertura.set()
+            break
+
+        # Ya estaba abierta sin probar: la prueba la hace su hilo de lectura
+        if probar_resolucion:
+            lector.probar()
+        return SuscripcionCamara(lector)
+
+
+    @classmethod
+    def resolucion_maxima(cls, indice=0):
+        """Resolución máxima soportada por la cámara (se prueba una sola vez por apertura)."""
+        suscripcion = cls.suscribir(indice, probar_resolucion=True)
+        try:
+            return cls._lectores[indice].resolucion_maxima or (640, 480)
+        finally:
+            suscripcion.release()
+
+
+    @classmethod
+    def identidad(cls, indice=0):
+        """
+        Nombre del dispositivo según el sistema, sin abrir la cámara (así el
+        chequeo guardado evita la prueba de resoluciones). None si no se conoce.
+        """
+        return nombre_dispositivo(indice)
+
+
+    @classmethod
+    def _liberar(cls, indice):
+        with cls._lock:
+            restantes = cls._referencias.get(indice, 0) - 1
+            cls._referencias[indice] = max(0, restantes)
+            if restantes > 0:
+                return
+
+            # Sin suscripciones: se cierra después del tiempo de gracia
+            cierre = threading.Timer(TIEMPO_GRACIA, cls._cerrar_si_libre, args=(indice,))
+            cierre.daemon = True
+            cls._cierres[indice] = cierre
+            cierre.start()
+
+
+    @classmethod
+    def _cerrar_si_libre(cls, indice):
+        with cls._lock:
+            cls._cierres.pop(indice, None)
+            if cls._referencias.get(indice, 0) > 0:
+                return
+            lector = cls._lectores.pop(indice, None)
+        if lector is not None:
+            lector.release()
+
+
+    @classmethod
+    def cerrar_todo(cls):
+        """Cierra todas las cámaras abiertas (al terminar el programa)."""
+        with cls._lock:
+            for cierre in cls._cierres.values():
+                cierre.cancel()
+            cls._cierres.clear()
+            cls._referencias.clear()
+            lectores = list(cls._lectores.values())
+            cls._lectores.clear()
+        for lector in lectores:
+            lector.release()
+
+
+
+# Libera la cámara al salir del programa
+atexit.register(ServicioCamara.cerrar_todo)
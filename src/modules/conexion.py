@@ -4,34 +4,274 @@ import pymysql
 # Importa la clase de excepción específica para capturar errores de MySQL
 from pymysql import MySQLError
 
+# Manejo de tiempos (inactividad de las conexiones)
+import time
+
+# Lock y condición para usar el pool desde varios hilos
+import threading
+
+# Cierra las conexiones del pool al terminar el programa
+import atexit
+
+# Recupera el lugar de las conexiones prestadas que nunca se devolvieron
+import weakref
+import gc
+
+# Variables de entorno para elegir el motor
+import os
+
+
+# Datos de acceso a la base de datos
+CONFIG_BD = {
+    "host": "localhost",  # Servidor donde está alojada la base de datos
+    "user": "root",  # Usuario de acceso a MySQL
+    "password": "1234",  # Contraseña del usuario de MySQL
+    "database": "control_acceso",  # Nombre de la base de datos a utilizar
+    "charset": None,  # Configuración de caracteres, se deja tal como está en el código original
+    "cursorclass": pymysql.cursors.DictCursor,  # Hace que los resultados se devuelvan como diccionarios
+    "connect_timeout": 5  # Segundos máximos para abrir la conexión (si la BD está lenta se usa el diario local)
+}
+
+# Motor de base de datos: "mysql" (producción) o "sqlite" (pruebas de rendimiento
+# sin servidor, ver modules/motor_sqlite.py). Se puede elegir con variables de entorno
+MOTOR = os.environ.get("CONTROL_ACCESO_MOTOR", "mysql")
+
+# Archivo de la base SQLite (":memory:" = base en memoria dentro del proceso)
+RUTA_SQLITE = os.environ.get("CONTROL_ACCESO_SQLITE", ":memory:")
+
+# Máximo de conexiones abiertas al mismo tiempo
+MAX_CONEXIONES = 5
+
+# Segundos que se espera una conexión libre antes de rendirse
+ESPERA_MAXIMA = 10
+
+# Una conexión libre que lleva más de estos segundos sin usarse se cierra
+TIEMPO_INACTIVIDAD = 300
+
+# Si la conexión estuvo libre más de estos segundos, se verifica con ping antes de entregarla
+VERIFICAR_DESPUES = 30
+
+
 
 # ==========================================================
-#   FUNCIÓN: crear_conexion
+#   Motores disponibles
 # ==========================================================
-def crear_conexion():
-    try:
-        # Intenta establecer una conexión con la base de datos MySQL local
-        conexion = pymysql.connect(
-            host="localhost",  # Servidor donde está alojada la base de datos
-            user="root",  # Usuario de acceso a MySQL
-            password="1234",  # Contraseña del usuario de MySQL
-            database="control_acceso",  # Nombre de la base de datos a utilizar
-            charset=None,  # Configuración de caracteres, se deja tal como está en el código original
-            cursorclass=pymysql.cursors.DictCursor  # Hace que los resultados se devuelvan como diccionarios
-        )
-
-        # Muestra en consola un mensaje indicando que la conexión fue exitosa
-        print("✅ Conexión exitosa a la base de datos")
-
-        # Retorna el objeto conexión para ser usado en otras operaciones
+def _abrir_mysql():
+    # Conexión real con el servidor MySQL
+    return pymysql.connect(**CONFIG_BD)
+
+
+def _abrir_sqlite():
+    # Se importa solo si se usa (la app normal no lo necesita)
+    from modules.motor_sqlite import BaseSQLite
+    return BaseSQLite.abrir(RUTA_SQLITE)
+
+
+# { nombre del motor: función que abre una conexión física }
+MOTORES = {
+    "mysql": _abrir_mysql,
+    "sqlite": _abrir_sqlite,
+}
+
+
+def motor_actual():
+    """Nombre del motor en uso ("mysql" o "sqlite")."""
+    return MOTOR
+
+
+def usar_motor(motor, ruta_sqlite=None):
+    """
+    Cambia el motor de base de datos. Las conexiones libres del pool se
+    cierran; las siguientes llamadas a crear_conexion() usan el motor nuevo.
+    """
+    global MOTOR, RUTA_SQLITE
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de base de datos desconocido: {motor}")
+    PoolConexiones.cerrar_todo()
+    MOTOR = motor
+    if ruta_sqlite is not None:
+        RUTA_SQLITE = ruta_sqlite
+
+
+
+# ==========================================================
+#   FUNCIÓN: _abrir_conexion_fisica
+# ==========================================================
+def _abrir_conexion_fisica():
+    # Intenta establecer una conexión real con el motor configurado
+    conexion = MOTORES[MOTOR]()
+
+    # Muestra en consola un mensaje indicando que la conexión fue exitosa
+    print("✅ Conexión exitosa a la base de datos")
+    return conexion
+
+
+
+# ==========================================================
+#   CLASE: PoolConexiones
+# ----------------------------------------------------------
+# Pool acotado de conexiones reutilizables. crear_conexion()
+# presta una conexión y cerrar_conexion() la devuelve, así que
+# los llamadores no cambian. Si una conexión prestada se pierde
+# sin devolverse (una excepción antes de cerrar_conexion), al
+# recolectarla se libera su lugar en el pool.
+# ==========================================================
+class PoolConexiones:
+    # Conexiones libres: lista de (conexion, instante en que se devolvió)
+    _libres = []
+
+    # Conexiones prestadas en este momento: { id: weakref.finalize que libera el lugar }
+    _prestadas = {}
+
+    # Condición que protege el estado y despierta a quien espera una conexión
+    _cond = threading.Condition()
+
+
+    @classmethod
+    def obtener(cls):
+        """Presta una conexión sana o retorna None si no se pudo conseguir."""
+        limite = time.monotonic() + ESPERA_MAXIMA
+        recolectado = False
+
+        with cls._cond:
+            while True:
+                cls._cerrar_inactivas()
+
+                # Reutiliza la conexión libre más reciente
+                if cls._libres:
+                    conexion, devuelta = cls._libres.pop()
+                    break
+
+                # Hay lugar para abrir una conexión nueva
+                if len(cls._prestadas) < MAX_CONEXIONES:
+                    conexion, devuelta = None, None
+                    break
+
+                # Pool lleno: primero se recolectan las conexiones perdidas sin devolver
+                if not recolectado:
+                    recolectado = True
+                    gc.collect()
+                    continue
+
+                # Sigue lleno: espera a que alguien devuelva una
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    print("❌ Error al conectar: no hay conexiones libres en el pool")
+                    return None
+                cls._cond.wait(restante)
+
+            # Se reserva el lugar antes de soltar el lock
+            marcador = object()
+            cls._prestadas[id(marcador)] = None
+
+        try:
+            try:
+                if conexion is None:
+                    conexion = _abrir_conexion_fisica()
+                elif time.monotonic() - devuelta > VERIFICAR_DESPUES:
+                    # Chequeo de salud: reconecta si el servidor cerró la conexión
+                    conexion.ping(reconnect=True)
+            except MySQLError:
+                # La conexión libre estaba rota: se intenta con una nueva
+                try:
+                    conexion = _abrir_conexion_fisica()
+                except MySQLError as e:
+                    print(f"❌ Error al conectar: {e}")
+                    conexion = None
+        except BaseException:
+            # Cualquier otro error (OSError, sqlite3.Error...) se propaga, pero
+            # antes se libera el lugar reservado para no dejar el pool sin cupo
+            with cls._cond:
+                del cls._prestadas[id(marcador)]
+                cls._cond.notify()
+            raise
+
+        with cls._cond:
+            del cls._prestadas[id(marcador)]
+            if conexion is not None:
+                cls._prestadas[id(conexion)] = weakref.finalize(conexion, cls._reclamar, id(conexion))
+            else:
+                cls._cond.notify()
         return conexion
 
-    except MySQLError as e:
-        # Si ocurre un error al conectar, lo muestra en consola
-        print(f"❌ Error al conectar: {e}")
 
-        # Retorna None para indicar que no se pudo establecer la conexión
-        return None
+    @classmethod
+    def devolver(cls, conexion):
+        """Devuelve una conexión prestada; si quedó en mal estado, se descarta."""
+        with cls._cond:
+            if id(conexion) not in cls._prestadas:
+                # No es del pool o ya se devolvió (cerrar_conexion llamado dos veces)
+                return
+            cls._prestadas.pop(id(conexion)).detach()
+
+        try:
+            # Descarta cualquier transacción sin confirmar, igual que al cerrar
+            conexion.rollback()
+            sana = conexion.open
+        except Exception:
+            sana = False
+
+        with cls._cond:
+            if sana:
+                cls._libres.append((conexion, time.monotonic()))
+            cls._cond.notify()
+
+        if not sana:
+            cls._cerrar_fisica(conexion)
+
+
+    @classmethod
+    def _reclamar(cls, clave):
+        # La conexión prestada se recolectó sin pasar por devolver(): se libera su lugar
+        with cls._cond:
+            if cls._prestadas.pop(clave, None) is None:
+                return
+            cls._cond.notify()
+        print("⚠ Una conexión no se devolvió al pool; se liberó su lugar")
+
+
+    @classmethod
+    def _cerrar_inactivas(cls):
+        # Se llama con el lock tomado: cierra las conexiones libres que llevan mucho sin usarse
+        ahora = time.monotonic()
+        vencidas = [c for c, t in cls._libres if ahora - t > TIEMPO_INACTIVIDAD]
+        if vencidas:
+            cls._libres = [(c, t) for c, t in cls._libres if ahora - t <= TIEMPO_INACTIVIDAD]
+            for conexion in vencidas:
+                cls._cerrar_fisica(conexion)
+
+
+    @staticmethod
+    def _cerrar_fisica(conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+
+    @classmethod
+    def cerrar_todo(cls):
+        """Cierra todas las conexiones libres (al terminar el programa)."""
+        with cls._cond:
+            libres = cls._libres
+            cls._libres = []
+        for conexion, _ in libres:
+            cls._cerrar_fisica(conexion)
+
+
+
+# Cierra las conexiones del pool al salir del programa
+atexit.register(PoolConexiones.cerrar_todo)
+
+
+
+# ==========================================================
+#   FUNCIÓN: crear_conexion
+# ==========================================================
+def crear_conexion():
+    # Presta una conexión del pool (se abre una nueva solo si no hay libres).
+    # Retorna None para indicar que no se pudo obtener una conexión
+    return PoolConexiones.obtener()
 
 
 
@@ -39,14 +279,11 @@ def crear_conexion():
 #   FUNCIÓN: cerrar_conexion
 # ==========================================================
 def cerrar_conexion(conexion):
-    # Verifica que el objeto conexión exista antes de intentar cerrarlo
+    # Verifica que el objeto conexión exista antes de devolverlo
     if conexion:
         try:
-            # Cierra la conexión activa con la base de datos
-            conexion.close()
-
-            # Muestra en consola que la conexión fue cerrada correctamente
-            print("🔒 Conexión cerrada")
+            # Devuelve la conexión al pool para que otra llamada la reutilice
+            PoolConexiones.devolver(conexion)
         except:
-            # Si ocurre algún error al cerrar, simplemente lo ignora
+            # Si ocurre algún error al devolverla, simplemente lo ignora
             pass
@@ -0,0 +1,144 @@
+# modules/consultas_fondo.py
+# Ejecución de consultas a la base de datos fuera del hilo de la interfaz.
+# Los botones de búsqueda llaman a las funciones de lógica (buscar_historial,
+# buscar_estudiantes...) a través de un EjecutorConsultas: la función corre en
+# un QThreadPool compartido y el resultado vuelve por señal al hilo de la
+# interfaz. Si se lanza una búsqueda nueva desde la misma pantalla, la anterior
+# se cancela: si no empezó, se quita de la cola; si ya está corriendo, su
+# resultado se descarta al llegar.
+
+# Tareas y pool de hilos de Qt
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Tamaño del pool de conexiones (no tiene sentido tener más hilos que conexiones)
+from modules.conexion import MAX_CONEXIONES
+
+
+
+# ============================================================
+# 🔹 CLASE: _SenalesTarea
+# ------------------------------------------------------------
+# QRunnable no es QObject: las señales van en un objeto aparte.
+# ============================================================
+class _SenalesTarea(QObject):
+    # (número de consulta, resultado)
+    terminada = pyqtSignal(int, object)
+
+    # (número de consulta, mensaje de error)
+    fallida = pyqtSignal(int, str)
+
+
+
+# ============================================================
+# 🔹 CLASE: _TareaConsulta
+# ============================================================
+class _TareaConsulta(QRunnable):
+    def __init__(self, ejecutor, numero, funcion, args, kwargs):
+        super().__init__()
+        self.ejecutor = ejecutor
+        self.numero = numero
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.senales = _SenalesTarea()
+        # La referencia la conserva el ejecutor hasta que termina
+        self.setAutoDelete(False)
+
+
+    def run(self):
+        # Cancelada mientras esperaba en la cola: no se consulta la BD
+        # (se avisa igual para que el ejecutor la olvide; el resultado se descarta)
+        if not self.ejecutor.vigente(self.numero):
+            self.senales.terminada.emit(self.numero, None)
+            return
+        try:
+            resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            self.senales.fallida.emit(self.numero, str(e))
+            return
+        self.senales.terminada.emit(self.numero, resultado)
+
+
+
+# ============================================================
+# 🔹 CLASE: EjecutorConsultas
+# ------------------------------------------------------------
+# Uno por pantalla. Solo entrega el resultado de la última
+# consulta lanzada; las anteriores quedan canceladas.
+# ============================================================
+class EjecutorConsultas(QObject):
+    # Resultado de la última consulta (en el hilo de la interfaz)
+    resultado = pyqtSignal(object)
+
+    # Error de la última consulta
+    error = pyqtSignal(str)
+
+    # Pool compartido por todas las pantallas
+    _pool = None
+
+
+    @classmethod
+    def pool(cls):
+        """Pool de hilos para consultas (se crea al primer uso)."""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(MAX_CONEXIONES)
+        return cls._pool
+
+
+    def __init__(self, parent=None):
+        # Inicializa la clase base QObject (normalmente la ventana es el padre)
+        super().__init__(parent)
+
+        # Número de la última consulta lanzada
+        self._ultima = 0
+
+        # Tareas lanzadas que aún no terminaron { número: tarea }
+        self._tareas = {}
+
+
+    def vigente(self, numero):
+        """True si la consulta número sigue siendo la última (no fue cancelada)."""
+        return numero == self._ultima
+
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en segundo plano y cancela la consulta
+        anterior de este ejecutor. El resultado llega por la señal resultado.
+        """
+        self.cancelar()
+        self._ultima += 1
+        tarea = _TareaConsulta(self, self._ultima, funcion, args, kwargs)
+        tarea.senales.terminada.connect(self._on_terminada)
+        tarea.senales.fallida.connect(self._on_fallida)
+        self._tareas[self._ultima] = tarea
+        self.pool().start(tarea)
+        return self._ultima
+
+
+    def cancelar(self):
+        """Cancela la consulta en curso: se quita de la cola o se descarta su resultado."""
+        tarea = self._tareas.get(self._ultima)
+        if tarea is not None and self.pool().tryTake(tarea):
+            # No había empezado: no llega ninguna señal
+            del self._tareas[self._ultima]
+        self._ultima += 1
+
+
+    def ocupado(self):
+        """True si la última consulta aún no terminó."""
+        return self._ultima in self._tareas
+
+
+    def _on_terminada(self, numero, resultado):
+        self._tareas.pop(numero, None)
+        if self.vigente(numero):
+            self.resultado.emit(resultado)
+
+
+    def _on_fallida(self, numero, mensaje):
+        self._tareas.pop(numero, None)
+        if self.vigente(numero):
+            print(f"❌ Error en la consulta: {mensaje}")
+            self.error.emit(mensaje)
@@ -0,0 +1,224 @@
+# modules/dialecto.py
+# Capa de dialecto SQL para ejecutar el mismo código de lógica sobre SQLite.
+# Los módulos de lógica escriben SQL de MySQL (CURDATE(), CONCAT(),
+# SUBSTRING_INDEX(), STR_TO_DATE(), FOR UPDATE, ON DUPLICATE KEY UPDATE...).
+# En lugar de duplicar cada consulta, aquí se registran esas funciones en la
+# conexión SQLite y se traduce la poca sintaxis que SQLite no entiende.
+# Lo usa modules/motor_sqlite.py; con MySQL no interviene.
+
+# Expresiones regulares para traducir las sentencias
+import re
+
+# Fechas y horas de las funciones de MySQL
+from datetime import datetime
+
+
+
+# ----------------------------------------------------
+# Formatos de fecha: MySQL (%d/%m/%Y, %H:%i) -> Python (strftime)
+# ----------------------------------------------------
+_FORMATOS = {
+    "Y": "%Y", "y": "%y", "m": "%m", "c": "%m", "d": "%d", "e": "%d",
+    "H": "%H", "k": "%H", "h": "%I", "I": "%I", "l": "%I", "i": "%M",
+    "s": "%S", "S": "%S", "p": "%p", "M": "%B", "b": "%b", "W": "%A",
+    "a": "%a", "j": "%j", "T": "%H:%M:%S", "r": "%I:%M:%S %p", "%": "%%",
+}
+
+# Formatos en que SQLite guarda fechas y horas (ver motor_sqlite)
+_FORMATOS_GUARDADOS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%H:%M:%S", "%H:%M")
+
+
+def formato_python(formato_mysql):
+    """Convierte un formato de DATE_FORMAT/STR_TO_DATE de MySQL al de strftime."""
+    partes = []
+    i = 0
+    while i < len(formato_mysql):
+        letra = formato_mysql[i]
+        if letra == "%" and i + 1 < len(formato_mysql):
+            siguiente = formato_mysql[i + 1]
+            partes.append(_FORMATOS.get(siguiente, siguiente))
+            i += 2
+        else:
+            partes.append(letra.replace("%", "%%"))
+            i += 1
+    return "".join(partes)
+
+
+def _a_datetime(valor):
+    # Interpreta el texto guardado por SQLite (fecha, fecha y hora, u hora)
+    if valor is None:
+        return None
+    texto = str(valor).split(".")[0]
+    for formato in _FORMATOS_GUARDADOS:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+
+# ----------------------------------------------------
+# Funciones de MySQL implementadas para SQLite
+# ----------------------------------------------------
+def _curdate():
+    return datetime.now().date().isoformat()
+
+
+def _curtime():
+    return datetime.now().strftime("%H:%M:%S")
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _concat(*valores):
+    # Igual que MySQL: si algún valor es NULL, el resultado es NULL
+    if any(v is None for v in valores):
+        return None
+    return "".join(str(v) for v in valores)
+
+
+def _substring_index(texto, separador, cantidad):
+    if texto is None or separador is None or cantidad is None:
+        return None
+    partes = str(texto).split(separador)
+    cantidad = int(cantidad)
+    if cantidad >= 0:
+        return separador.join(partes[:cantidad])
+    return separador.join(partes[cantidad:])
+
+
+def _date_format(valor, formato):
+    fecha = _a_datetime(valor)
+    if fecha is None or formato is None:
+        return None
+    return fecha.strftime(formato_python(formato))
+
+
+def _str_to_date(texto, formato):
+    if texto is None or formato is None:
+        return None
+    try:
+        fecha = datetime.strptime(str(texto), formato_python(formato))
+    except ValueError:
+        # MySQL retorna NULL si el texto no coincide con el formato
+        return None
+    # Sin partes de hora en el formato, el resultado es una fecha
+    if not any(f"%{letra}" in formato for letra in "HkhIlisSTrp"):
+        return fecha.date().isoformat()
+    return fecha.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _if(condicion, si, no):
+    return si if condicion else no
+
+
+def _lower(texto):
+    # El LOWER de SQLite solo cambia letras ASCII; el de MySQL también "Á" -> "á"
+    return None if texto is None else str(texto).lower()
+
+
+# nombre: (cantidad de argumentos, función); -1 = cantidad variable
+FUNCIONES_MYSQL = {
+    "CURDATE": (0, _curdate),
+    "CURTIME": (0, _curtime),
+    "NOW": (0, _now),
+    "CONCAT": (-1, _concat),
+    "SUBSTRING_INDEX": (3, _substring_index),
+    "DATE_FORMAT": (2, _date_format),
+    "TIME_FORMAT": (2, _date_format),
+    "STR_TO_DATE": (2, _str_to_date),
+    "IF": (3, _if),
+    "LOWER": (1, _lower),
+    "DATABASE": (0, lambda: "main"),
+}
+
+
+def registrar_funciones_mysql(conexion_sqlite):
+    """Registra en una conexión sqlite3 las funciones de MySQL que usa el código."""
+    for nombre, (argumentos, funcion) in FUNCIONES_MYSQL.items():
+        # CURDATE/CURTIME/NOW cambian en cada llamada: no son deterministas
+        determinista = argumentos != 0
+        conexion_sqlite.create_function(nombre, argumentos, funcion, deterministic=determinista)
+
+
+
+# ----------------------------------------------------
+# Traducción de sentencias
+# ----------------------------------------------------
+_PARAMETRO = re.compile(r"%(%|s)")
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_COLUMNA = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+_COLACION_BINARIA = re.compile(r"\bCOLLATE\s+utf8mb4_bin\b", re.IGNORECASE)
+
+
+def traducir_sql(sql, con_parametros):
+    """
+    Traduce una sentencia escrita para PyMySQL a SQLite.
+    Retorna (sql, bloquea): bloquea es True si la sentencia tenía FOR UPDATE
+    (quien la ejecuta debe abrir la transacción con BEGIN IMMEDIATE).
+    """
+    # PyMySQL formatea con %: %s es un parámetro y %% un % literal (solo si hay parámetros)
+    if con_parametros:
+        sql = _PARAMETRO.sub(lambda m: "%" if m.group(1) == "%" else "?", sql)
+
+    # Comparación binaria (por código de carácter)
+    sql = _COLACION_BINARIA.sub("COLLATE BINARY", sql)
+
+    # SQLite no tiene bloqueo por filas: se bloquea la base para escritura
+    sql, cambios = _FOR_UPDATE.subn("", sql)
+
+    # INSERT ... ON DUPLICATE KEY UPDATE col = VALUES(col) -> ON CONFLICT DO UPDATE SET col = excluded.col
+    if _ON_DUPLICATE.search(sql):
+        insercion, actualizacion = _ON_DUPLICATE.split(sql, maxsplit=1)
+        actualizacion = _VALUES_COLUMNA.sub(r"excluded.\1", actualizacion)
+        sql = f"{insercion}ON CONFLICT DO UPDATE SET{actualizacion}"
+
+    return sql, cambios > 0
+
+
+
+# ----------------------------------------------------
+# Traducción del esquema (data/database.sql)
+# ----------------------------------------------------
+_CREAR_TABLA = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+_INDICE_EN_TABLA = re.compile(r",\s*(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*\(([^)]*)\)", re.IGNORECASE)
+_AUTO_INCREMENTO = re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE)
+_ENUM = re.compile(r"\bENUM\s*\([^)]*\)", re.IGNORECASE)
+_TIPO_YEAR = re.compile(r"(\w\s+)YEAR\b", re.IGNORECASE)
+_OPCIONES_TABLA = re.compile(r"\)\s*(ENGINE|DEFAULT\s+CHARSET|AUTO_INCREMENT)\s*=.*$", re.IGNORECASE | re.DOTALL)
+_OMITIR = re.compile(r"^\s*(CREATE\s+DATABASE|USE|SET)\b", re.IGNORECASE)
+
+
+def sentencias_script(script):
+    """Divide un script SQL en sentencias (sin comentarios de línea)."""
+    lineas = [l for l in script.splitlines() if not l.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lineas).split(";") if s.strip()]
+
+
+def traducir_ddl(sentencia):
+    """
+    Traduce una sentencia del esquema de MySQL a SQLite.
+    Retorna una lista de sentencias (los índices declarados dentro de
+    CREATE TABLE pasan a CREATE INDEX aparte), vacía si no aplica.
+    """
+    if _OMITIR.match(sentencia):
+        return []
+
+    tabla = _CREAR_TABLA.match(sentencia)
+    if not tabla:
+        return [sentencia]
+
+    indices = [
+        f"CREATE {'UNIQUE ' if unico else ''}INDEX IF NOT EXISTS {nombre} ON {tabla.group(1)} ({columnas})"
+        for unico, nombre, columnas in _INDICE_EN_TABLA.findall(sentencia)
+    ]
+    sentencia = _INDICE_EN_TABLA.sub("", sentencia)
+    sentencia = _AUTO_INCREMENTO.sub("INTEGER PRIMARY KEY AUTOINCREMENT", sentencia)
+    sentencia = _ENUM.sub("TEXT", sentencia)
+    sentencia = _TIPO_YEAR.sub(r"\1INTEGER", sentencia)
+    sentencia = _OPCIONES_TABLA.sub(")", sentencia)
+    return [sentencia] + indices
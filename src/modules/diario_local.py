@@ -0,0 +1,232 @@
+# modules/diario_local.py
+# Diario local (SQLite) para seguir registrando cuando MySQL no responde.
+# Si la base de datos central está caída o tarda demasiado, los ingresos,
+# salidas, asistencias e incidentes se guardan aquí con la hora en que ocurrieron. Un hilo
+# reproductor los envía a MySQL en el mismo orden en que se registraron en
+# cuanto la conexión vuelve. Mientras haya entradas pendientes, los comandos
+# nuevos también van al diario para no alterar el orden (una salida nunca se
+# aplica antes que su ingreso).
+
+# Base de datos local embebida
+import sqlite3
+
+# Serialización de los datos de cada entrada
+import json
+
+# Hilo reproductor y lock
+import threading
+
+# Manejo de tiempos (espera entre reproducciones)
+import time
+
+# Marca de tiempo de cada entrada
+from datetime import datetime
+
+# Errores de conexión de MySQL (la entrada se reintenta más tarde)
+from pymysql import OperationalError, InterfaceError
+
+# Importa las funciones para conectar y cerrar la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion
+
+
+# Archivo del diario (se guarda en el mismo directorio que config.json)
+DIARIO_PATH = "diario_local.db"
+
+# Segundos entre intentos de reproducir el diario
+INTERVALO_REPRODUCCION = 15
+
+# Errores que indican que la BD no está disponible (no que la entrada sea inválida)
+ERRORES_CONEXION = (ConnectionError, OperationalError, InterfaceError)
+
+
+
+def momento_desde_texto(texto):
+    """Convierte la marca de tiempo guardada (ISO) en datetime, o None."""
+    return datetime.fromisoformat(texto) if texto else None
+
+
+
+def _operaciones():
+    """
+    Funciones que aplican cada tipo de entrada sobre una conexión de MySQL
+    (sin commit). Se importan aquí para evitar importaciones circulares.
+    """
+    from modules.ingreso_logic import asignar_equipo
+    from modules.salida_logic import registrar_salida, registrar_asistencia
+    from modules.incidentes_logic import registrar_incidente
+
+    def incidente(datos, conexion):
+        ok, mensaje = registrar_incidente(
+            datos["id_matricula"], datos["id_equipo"], datos["descripcion"], datos.get("nuevo_estado"),
+            conexion=conexion, cedula=datos.get("cedula"), momento=momento_desde_texto(datos.get("momento"))
+        )
+        if not ok:
+            raise ValueError(mensaje)
+        return mensaje
+
+    return {
+        "ingreso": lambda datos, conexion: asignar_equipo(
+            datos["clave"], conexion=conexion, cedula=datos.get("cedula"),
+            momento=momento_desde_texto(datos.get("momento"))
+        ),
+        "salida": lambda datos, conexion: registrar_salida(
+            datos["clave"], conexion=conexion, momento=momento_desde_texto(datos.get("momento"))
+        ),
+        # Va después de las salidas del grado en el diario: se calcula con ellas aplicadas
+        "asistencia": lambda datos, conexion: registrar_asistencia(
+            datos["clave"], conexion=conexion, momento=momento_desde_texto(datos.get("momento"))
+        ),
+        "incidente": incidente,
+    }
+
+
+
+# ============================================================
+# 🔹 CLASE: DiarioLocal
+# ------------------------------------------------------------
+# Métodos de clase sobre el archivo SQLite (igual que Sesion o
+# ServicioCamara, hay un solo diario por estación).
+# ============================================================
+class DiarioLocal:
+    # Lock que serializa el acceso al archivo y la reproducción
+    _lock = threading.RLock()
+
+    # Hilo reproductor (se inicia una sola vez)
+    _hilo = None
+
+
+    @classmethod
+    def _conectar(cls):
+        conexion = sqlite3.connect(DIARIO_PATH, timeout=5)
+        # WAL: las escrituras no bloquean a las lecturas y sobreviven a un corte
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("""
+            CREATE TABLE IF NOT EXISTS diario (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT NOT NULL,
+                datos TEXT NOT NULL,
+                creado_en TEXT NOT NULL,
+                estado TEXT NOT NULL DEFAULT 'pendiente',
+                intentos INTEGER NOT NULL DEFAULT 0,
+                ultimo_error TEXT
+            )
+        """)
+        return conexion
+
+
+    @classmethod
+    def registrar(cls, tipo, datos):
+        """
+        Guarda una entrada (tipo: 'ingreso', 'salida', 'asistencia' o 'incidente') con sus datos.
+        Si datos no trae 'momento', se usa la hora actual.
+        """
+        datos = dict(datos)
+        datos.setdefault("momento", datetime.now().isoformat(timespec="seconds"))
+
+        with cls._lock:
+            conexion = cls._conectar()
+            try:
+                conexion.execute(
+                    "INSERT INTO diario (tipo, datos, creado_en) VALUES (?, ?, ?)",
+                    (tipo, json.dumps(datos), datos["momento"])
+                )
+                conexion.commit()
+            finally:
+                conexion.close()
+
+        print(f"📝 {tipo} guardado en el diario local (sin conexión a la BD)")
+        cls.iniciar_reproductor()
+
+
+    @classmethod
+    def pendientes(cls):
+        """Cantidad de entradas que aún no se enviaron a MySQL."""
+        with cls._lock:
+            conexion = cls._conectar()
+            try:
+                return conexion.execute("SELECT COUNT(*) FROM diario WHERE estado = 'pendiente'").fetchone()[0]
+            finally:
+                conexion.close()
+
+
+    @classmethod
+    def hay_pendientes(cls):
+        return cls.pendientes() > 0
+
+
+    @classmethod
+    def reproducir(cls):
+        """
+        Envía a MySQL las entradas pendientes en orden, una transacción por entrada.
+        Se detiene ante un error de conexión (se reintenta después); una entrada que
+        la BD rechaza por sus datos se marca como 'error' para no bloquear al resto.
+        Retorna la cantidad de entradas enviadas.
+        """
+        enviadas = 0
+        with cls._lock:
+            local = cls._conectar()
+            try:
+                entradas = local.execute(
+                    "SELECT id, tipo, datos FROM diario WHERE estado = 'pendiente' ORDER BY id"
+                ).fetchall()
+                if not entradas:
+                    return 0
+
+                operaciones = _operaciones()
+                for id_entrada, tipo, datos in entradas:
+                    conexion = crear_conexion()
+                    if not conexion:
+                        break
+                    try:
+                        operaciones[tipo](json.loads(datos), conexion)
+                        conexion.commit()
+                        local.execute("DELETE FROM diario WHERE id = ?", (id_entrada,))
+                        local.commit()
+                        enviadas += 1
+
+                    except ERRORES_CONEXION as e:
+                        conexion.rollback()
+                        local.execute(
+                            "UPDATE diario SET intentos = intentos + 1, ultimo_error = ? WHERE id = ?",
+                            (str(e), id_entrada)
+                        )
+                        local.commit()
+                        break
+
+                    except Exception as e:
+                        conexion.rollback()
+                        print(f"❌ Entrada {id_entrada} del diario rechazada por la BD: {e}")
+                        local.execute(
+                            "UPDATE diario SET estado = 'error', intentos = intentos + 1, ultimo_error = ? WHERE id = ?",
+                            (str(e), id_entrada)
+                        )
+                        local.commit()
+
+                    finally:
+                        cerrar_conexion(conexion)
+            finally:
+                local.close()
+
+        if enviadas:
+            print(f"✅ Diario local: {enviadas} registros enviados a la BD")
+        return enviadas
+
+
+    @classmethod
+    def iniciar_reproductor(cls):
+        """Inicia (una sola vez) el hilo que vacía el diario periódicamente."""
+        with cls._lock:
+            if cls._hilo is not None and cls._hilo.is_alive():
+                return
+            cls._hilo = threading.Thread(target=cls._ciclo, name="ReproductorDiario", daemon=True)
+            cls._hilo.start()
+
+
+    @classmethod
+    def _ciclo(cls):
+        while True:
+            try:
+                cls.reproducir()
+            except Exception as e:
+                print(f"⚠ Error reproduciendo el diario local: {e}")
+            time.sleep(INTERVALO_REPRODUCCION)
@@ -10,6 +10,12 @@ import face_recognition
 # Importa las funciones de conexión y cierre de la base de datos
 from modules.conexion import crear_conexion, cerrar_conexion
 
+# Importa las utilidades del encoding precalculado y el cache local
+from modules.cache_embeddings import (
+    encodings_desde_fila, clave_docente, guardar_cache, guardar_encodings_en_bd,
+    cargar_fotos_faltantes
+)
+
 
 
 def centrar_rostro_en_imagen(foto_bytes, output_size=200, margen=0.5):
@@ -82,9 +88,10 @@ def cargar_docentes():
     Carga los docentes desde la base de datos y genera sus representaciones faciales (encodings).
 
     Proceso:
-    1. Conecta a la BD y obtiene los docentes con su información y la foto del rostro.
+    1. Conecta a la BD y obtiene los docentes con su información y el encoding guardado;
+       la foto solo se trae de quienes no tienen un encoding vigente.
     2. Convierte el campo BLOB de la foto en imagen.
-    3. Calcula el encoding facial (vector de 128 valores generado por face_recognition).
+    3. Calcula el encoding facial si falta (vector de 128 valores generado por face_recognition).
     4. Centra la imagen del rostro para una presentación uniforme.
     5. Devuelve una lista de diccionarios con toda la información del docente.
 
@@ -96,7 +103,7 @@ def cargar_docentes():
             'apellidos': str,
             'rol': 'admin' o 'docente',
             'encoding': numpy.ndarray,
-            'foto_rostro': bytes (imagen centrada)
+            'foto_rostro': bytes (imagen centrada) o None si no se trajo (ver foto_docente)
         },
         ...
     ]
@@ -117,35 +124,45 @@ def cargar_docentes():
 
     try:
         # Obtener los campos relevantes de la tabla docentes
-        cursor.execute("SELECT cedula, nombres, apellidos, es_admin, foto_rostro FROM docentes")
+        cursor.execute("""
+            SELECT cedula, nombres, apellidos, es_admin,
+                   encoding_rostro, version_encoding
+            FROM docentes
+        """)
         resultados = cursor.fetchall()
 
+        # La foto (LONGBLOB) solo se trae de quienes no tienen un encoding vigente
+        cargar_fotos_faltantes(conexion, "docentes", "cedula", resultados)
+
 
         # Lista donde se almacenarán los docentes procesados
         docentes = []
 
+        # Encodings recalculados que se guardarán de vuelta en la BD
+        pendientes = []
+
         for row in resultados:
-            # Si no tiene foto registrada, se omite
-            if row["foto_rostro"] is None:
+            # Usa el encoding guardado en el registro; solo codifica la foto
+            # (a través del cache) si la columna falta o es de otra versión
+            encodings, recalculado = encodings_desde_fila(
+                clave_docente(row["cedula"]),
+                row["foto_rostro"],
+                row["encoding_rostro"],
+                row["version_encoding"]
+            )
+            if encodings is None:
                 continue
 
-
-            # Convertir el campo BLOB a imagen
-            np_img = np.frombuffer(row["foto_rostro"], np.uint8)
-            img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
-
-
-            # Convertir a RGB para el procesamiento facial
-            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-
-            # Generar encoding facial (devuelve lista, normalmente con un solo elemento)
-            encodings = face_recognition.face_encodings(rgb)
+            if recalculado:
+                pendientes.append((row["cedula"], encodings))
 
 
             if len(encodings) > 0:
                 # Centrar y recortar la foto del rostro para mostrarla en la interfaz
-                foto_centrada = centrar_rostro_en_imagen(row["foto_rostro"])
+                # (si no se trajo, la del docente que inicia sesión se pide con foto_docente)
+                foto_centrada = None
+                if row["foto_rostro"] is not None:
+                    foto_centrada = centrar_rostro_en_imagen(row["foto_rostro"])
 
 
                 # Agregar docente al listado
@@ -169,6 +186,10 @@ def cargar_docentes():
                 })
 
 
+        # Persiste los encodings recalculados en la BD y en el cache local
+        guardar_encodings_en_bd(conexion, "docentes", "cedula", pendientes)
+        guardar_cache()
+
         # Retorna la lista final de docentes con sus encodings y fotos procesadas
         return docentes
 
@@ -183,3 +204,23 @@ def cargar_docentes():
         # Asegura el cierre correcto del cursor y la conexión
         cursor.close()
         cerrar_conexion(conexion)
+
+
+
+def foto_docente(cedula):
+    """Foto centrada de un docente, o None (cargar_docentes no trae las fotos que no necesita)."""
+    conexion = crear_conexion()
+    if conexion is None:
+        return None
+
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("SELECT foto_rostro FROM docentes WHERE cedula = %s", (cedula,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
+
+    if not row or row["foto_rostro"] is None:
+        return None
+    return centrar_rostro_en_imagen(row["foto_rostro"])
@@ -4,6 +4,12 @@ import pymysql
 # Importa funciones para crear y cerrar la conexión a base de datos
 from modules.conexion import crear_conexion, cerrar_conexion
 
+# Importa utilidades para calcular y guardar el encoding facial
+from modules.cache_embeddings import (
+    codificar_foto, serializar_encodings, registrar_encodings,
+    hash_foto, clave_docente, guardar_cache, VERSION_ENCODER
+)
+
 
 # ==========================================================
 #   FUNCIÓN: registrar_docente
@@ -34,6 +40,18 @@ def registrar_docente(cedula, nombre, apellido, celular, es_admin, foto_bytes):
     # Inicializa conexión y cursor en None para poder cerrarlos de forma segura
     conexion, cursor = None, None
     try:
+        # Calcular el encoding facial una sola vez, al momento del registro
+        encoding_blob, version = None, None
+        if foto_bytes is not None:
+            encodings = codificar_foto(foto_bytes)
+            if encodings is not None:
+                encoding_blob, version = serializar_encodings(encodings), VERSION_ENCODER
+
+                # Deja el resultado también en el cache local para esta estación
+                registrar_encodings(clave_docente(cedula), hash_foto(foto_bytes), encodings)
+                guardar_cache()
+
+
         # Crear conexión a la base de datos
         conexion = crear_conexion()
         cursor = conexion.cursor()
@@ -41,13 +59,15 @@ def registrar_docente(cedula, nombre, apellido, celular, es_admin, foto_bytes):
 
         # Sentencia SQL parametrizada para evitar inyección SQL
         sql = """
-            INSERT INTO docentes (cedula, nombres, apellidos, celular, es_admin, foto_rostro)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            INSERT INTO docentes (cedula, nombres, apellidos, celular, es_admin, foto_rostro,
+                                  encoding_rostro, version_encoding)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
 
 
         # Ejecutar la consulta pasando los valores en una tupla
-        cursor.execute(sql, (cedula, nombre, apellido, celular, es_admin, foto_bytes))
+        cursor.execute(sql, (cedula, nombre, apellido, celular, es_admin, foto_bytes,
+                             encoding_blob, version))
 
 
         # Guardar los cambios en la base de datos
@@ -58,13 +58,13 @@ def agregar_equipo(estado="disponible", marca="", modelo="", procesador="",
 def obtener_equipos():
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-
-    cursor.execute("""SELECT id_equipo, estado, marca, modelo, procesador, ram, disco, serial 
-                     FROM equipos ORDER BY id_equipo ASC""")
-    resultados = cursor.fetchall()
-
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("""SELECT id_equipo, estado, marca, modelo, procesador, ram, disco, serial 
+                         FROM equipos ORDER BY id_equipo ASC""")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
 
     return [(r['id_equipo'], r['estado'], r.get('marca',''), r.get('modelo',''),
              r.get('procesador',''), r.get('ram',''), r.get('disco',''), r.get('serial','')) for r in resultados]
@@ -77,12 +77,12 @@ def obtener_todos_equipos():
     """Obtiene todos los equipos con todas sus características."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-
-    cursor.execute("SELECT * FROM equipos ORDER BY id_equipo ASC")
-    resultados = cursor.fetchall()
-
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT * FROM equipos ORDER BY id_equipo ASC")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
 
     return resultados
 
@@ -174,19 +174,19 @@ def actualizar_equipo(codigo, marca, modelo, procesador, ram, disco, serial, ani
 def generar_proximo_codigo():
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT id_equipo FROM equipos ORDER BY id_equipo DESC LIMIT 1")
+        row = cursor.fetchone()
 
-    cursor.execute("SELECT id_equipo FROM equipos ORDER BY id_equipo DESC LIMIT 1")
-    row = cursor.fetchone()
-
-    if row:
-        ultimo_codigo = row['id_equipo']
-        num = int(ultimo_codigo.split("-")[1])
-        nuevo_codigo = f"E-{num+1:02d}"
-    else:
-        nuevo_codigo = "E-01"
-
-    cursor.close()
-    cerrar_conexion(conexion)
+        if row:
+            ultimo_codigo = row['id_equipo']
+            num = int(ultimo_codigo.split("-")[1])
+            nuevo_codigo = f"E-{num+1:02d}"
+        else:
+            nuevo_codigo = "E-01"
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
 
     return nuevo_codigo
 
@@ -198,12 +198,12 @@ def obtener_marcas():
     """Obtiene lista dinámica de marcas."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-    
-    cursor.execute("SELECT DISTINCT marca FROM equipos WHERE marca IS NOT NULL AND marca != '' ORDER BY marca")
-    resultados = cursor.fetchall()
-    
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT DISTINCT marca FROM equipos WHERE marca IS NOT NULL AND marca != '' ORDER BY marca")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
     
     return [r['marca'] for r in resultados] if resultados else ["Dell", "HP", "Lenovo", "Acer", "Asus", "Toshiba"]
 
@@ -215,12 +215,12 @@ def obtener_procesadores():
     """Obtiene lista dinámica de procesadores."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-    
-    cursor.execute("SELECT DISTINCT procesador FROM equipos WHERE procesador IS NOT NULL AND procesador != '' ORDER BY procesador")
-    resultados = cursor.fetchall()
-    
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT DISTINCT procesador FROM equipos WHERE procesador IS NOT NULL AND procesador != '' ORDER BY procesador")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
     
     return [r['procesador'] for r in resultados] if resultados else ["Intel Core i3", "Intel Core i5", "Intel Core i7", "AMD Ryzen 3", "AMD Ryzen 5", "AMD Ryzen 7"]
 
@@ -232,12 +232,12 @@ def obtener_estados():
     """Obtiene lista dinámica de estados."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-    
-    cursor.execute("SELECT DISTINCT estado_nuevo FROM historial_equipos WHERE estado_nuevo IS NOT NULL AND estado_nuevo != '' ORDER BY estado_nuevo")
-    resultados = cursor.fetchall()
-    
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT DISTINCT estado_nuevo FROM historial_equipos WHERE estado_nuevo IS NOT NULL AND estado_nuevo != '' ORDER BY estado_nuevo")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
     
     return [r['estado_nuevo'] for r in resultados] if resultados else ["disponible", "dañado", "otro"]
 
@@ -249,12 +249,12 @@ def obtener_rams():
     """Obtiene lista dinámica de opciones de RAM."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-    
-    cursor.execute("SELECT DISTINCT ram FROM equipos WHERE ram IS NOT NULL AND ram != '' ORDER BY ram")
-    resultados = cursor.fetchall()
-    
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT DISTINCT ram FROM equipos WHERE ram IS NOT NULL AND ram != '' ORDER BY ram")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
     
     return [r['ram'] for r in resultados] if resultados else ["4 GB", "8 GB", "16 GB", "32 GB"]
 
@@ -266,12 +266,12 @@ def obtener_discos():
     """Obtiene lista dinámica de opciones de disco."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-    
-    cursor.execute("SELECT DISTINCT disco FROM equipos WHERE disco IS NOT NULL AND disco != '' ORDER BY disco")
-    resultados = cursor.fetchall()
-    
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT DISTINCT disco FROM equipos WHERE disco IS NOT NULL AND disco != '' ORDER BY disco")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
     
     return [r['disco'] for r in resultados] if resultados else ["HDD 500 GB", "HDD 1 TB", "SSD 256 GB", "SSD 512 GB", "SSD 1 TB"]
 
@@ -283,11 +283,11 @@ def obtener_grados():
     """Obtiene lista dinámica de grados desde la tabla matrículas."""
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-    
-    cursor.execute("SELECT DISTINCT grado FROM matriculas WHERE grado IS NOT NULL AND grado != '' ORDER BY grado")
-    resultados = cursor.fetchall()
-    
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        cursor.execute("SELECT DISTINCT grado FROM matriculas WHERE grado IS NOT NULL AND grado != '' ORDER BY grado")
+        resultados = cursor.fetchall()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
     
     return [r['grado'] for r in resultados] if resultados else ["6-1", "6-2", "7-1", "7-2", "8-1", "8-2", "9-1", "9-2", "10-1", "10-2", "11-1", "11-2"]
\ No newline at end of file
@@ -0,0 +1,205 @@
+# modules/escritor_bd.py
+# Escritor de la base de datos en segundo plano (write-behind).
+# Las pantallas de ingreso y salida encolan aquí la asignación de equipo y el
+# registro de salida en lugar de ejecutarlos en el hilo de la interfaz; el
+# reconocimiento sigue corriendo mientras las escrituras se completan. Cuando
+# llegan varios estudiantes juntos, los comandos pendientes se ejecutan en una
+# sola transacción (un commit por lote). Los resultados vuelven por señales.
+# Si la BD no está disponible, los comandos se guardan en el diario local
+# (modules.diario_local) con la hora en que ocurrieron, en vez de perderse.
+
+# Condición para esperar comandos (y entre reintentos) sin consumir CPU
+import threading
+
+# Cola de comandos en orden de llegada
+from collections import deque
+
+# Hora en que se encola cada comando
+from datetime import datetime
+
+# Clases base de Qt para hilos y señales
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Importa las funciones para conectar y cerrar la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion
+
+# Docente de la sesión (se guarda con cada comando)
+from modules.sesion import Sesion
+
+# Diario local para los comandos que no se pudieron escribir por falta de conexión
+from modules.diario_local import DiarioLocal, ERRORES_CONEXION
+
+
+# Máximo de comandos por transacción
+MAX_LOTE = 20
+
+# Intentos antes de dar un comando por fallido
+REINTENTOS = 3
+
+# Espera (s) antes del primer reintento; se duplica en cada intento
+ESPERA_REINTENTO = 0.5
+
+
+
+# ============================================================
+# 🔹 CLASE: EscritorBD
+# ------------------------------------------------------------
+# operaciones: { tipo: funcion(clave, conexion=...) -> resultado }
+# La función recibe la conexión del lote y no hace commit; el
+# escritor confirma todo el lote junto.
+# ============================================================
+class EscritorBD(QThread):
+    # Señal con (tipo, clave, resultado) de cada comando confirmado en la BD
+    completado = pyqtSignal(str, object, object)
+
+    # Señal con (tipo, clave, mensaje) de un comando que falló tras los reintentos
+    fallido = pyqtSignal(str, object, str)
+
+    # Señal con (tipo, clave) de un comando guardado en el diario local (sin conexión)
+    en_diario = pyqtSignal(str, object)
+
+
+    def __init__(self, operaciones, parent=None):
+        # Inicializa la clase base QThread
+        super().__init__(parent)
+
+        # Funciones disponibles por tipo de comando
+        self.operaciones = operaciones
+
+        # Comandos pendientes: (tipo, clave, datos para el diario local)
+        self._cola = deque()
+
+        # Bandera para terminar el ciclo del hilo
+        self._detener = False
+
+        # Condición que protege la cola y despierta al hilo
+        self._cond = threading.Condition()
+
+
+    def encolar(self, tipo, clave):
+        """Agrega un comando a la cola. Nunca bloquea el hilo de la interfaz."""
+        if tipo not in self.operaciones:
+            raise ValueError(f"Operación desconocida: {tipo}")
+        # Hora y docente del momento en que ocurrió (si termina en el diario,
+        # se registra con estos datos y no con los de la reproducción)
+        datos = {
+            "clave": clave,
+            "momento": datetime.now().isoformat(timespec="seconds"),
+            "cedula": Sesion.obtener_cedula() or None
+        }
+        with self._cond:
+            self._cola.append((tipo, clave, datos))
+            self._cond.notify()
+
+
+    def pendientes(self):
+        """Cantidad de comandos que aún no se ejecutaron."""
+        with self._cond:
+            return len(self._cola)
+
+
+    def detener(self):
+        """
+        Termina el hilo después de escribir todo lo pendiente. Sin conexión no
+        se reintenta: lo pendiente pasa al diario local y la ventana cierra sin esperar.
+        """
+        with self._cond:
+            self._detener = True
+            self._cond.notify()
+        self.wait()
+
+
+    def run(self):
+        while True:
+            # Espera hasta que haya comandos o se pida detener
+            with self._cond:
+                while not self._cola and not self._detener:
+                    self._cond.wait()
+                if not self._cola:
+                    # Solo se termina con la cola vacía (no se pierden escrituras)
+                    return
+
+                # Toma todos los comandos acumulados (hasta MAX_LOTE)
+                lote = []
+                while self._cola and len(lote) < MAX_LOTE:
+                    lote.append(self._cola.popleft())
+
+            # Con registros pendientes en el diario, los nuevos también van al
+            # diario para que la BD los reciba en el orden en que ocurrieron
+            if DiarioLocal.hay_pendientes():
+                self._guardar_en_diario(lote)
+            else:
+                self._procesar(lote)
+
+
+    # ---------------------------
+    # Ejecución con reintentos
+    # ---------------------------
+    def _ejecutar(self, lote):
+        """Ejecuta el lote en una transacción. Retorna la lista de resultados o lanza la excepción."""
+        conexion = crear_conexion()
+        if not conexion:
+            raise ConnectionError("sin conexión a la base de datos")
+        try:
+            resultados = [self.operaciones[tipo](clave, conexion=conexion) for tipo, clave, _ in lote]
+            conexion.commit()
+            return resultados
+        except Exception:
+            conexion.rollback()
+            raise
+        finally:
+            cerrar_conexion(conexion)
+
+
+    def _procesar(self, lote):
+        espera = ESPERA_REINTENTO
+        for intento in range(REINTENTOS):
+            try:
+                resultados = self._ejecutar(lote)
+            except Exception as e:
+                error = e
+
+                # Con varios comandos, uno solo puede hacer fallar al resto:
+                # se reparte el lote y cada comando se reintenta por separado
+                # (si el problema es la conexión, se reintenta el lote completo)
+                if len(lote) > 1 and not isinstance(e, ERRORES_CONEXION):
+                    for comando in lote:
+                        self._procesar([comando])
+                    return
+
+                print(f"⚠ Error escribiendo en la BD (intento {intento + 1}/{REINTENTOS}): {e}")
+                if intento + 1 < REINTENTOS and not self._detener:
+                    # Espera antes de reintentar; detener() la interrumpe
+                    with self._cond:
+                        self._cond.wait_for(lambda: self._detener, espera)
+                    espera *= 2
+
+                # Cerrando sin conexión: no se reintenta (cada intento puede tardar
+                # connect_timeout y detener() bloquea la interfaz), va al diario
+                if self._detener and isinstance(e, ERRORES_CONEXION):
+                    break
+                continue
+
+            # Confirmado: se informa el resultado de cada comando
+            for (tipo, clave, _), resultado in zip(lote, resultados):
+                self.completado.emit(tipo, clave, resultado)
+            return
+
+        # Sin conexión: se guarda en el diario local para enviarlo al reconectar
+        if isinstance(error, ERRORES_CONEXION):
+            self._guardar_en_diario(lote)
+            return
+
+        tipo, clave, _ = lote[0]
+        self.fallido.emit(tipo, clave, str(error))
+
+
+    def _guardar_en_diario(self, lote):
+        for tipo, clave, datos in lote:
+            try:
+                DiarioLocal.registrar(tipo, datos)
+            except Exception as e:
+                # Ni la BD ni el diario: no queda dónde guardarlo
+                self.fallido.emit(tipo, clave, f"no se pudo guardar en el diario local: {e}")
+                continue
+            self.en_diario.emit(tipo, clave)
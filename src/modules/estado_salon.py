@@ -0,0 +1,96 @@
+# modules/estado_salon.py
+# Estado del salón (equipos ocupados y quién los usa) guardado en memoria.
+# La pantalla de salida lo consulta en cada reconocimiento y al habilitar
+# botones; en lugar de ir a la base de datos cada vez, se carga una vez,
+# se actualiza localmente después de cada registrar_salida() y solo se
+# vuelve a sincronizar con la BD de forma periódica o a pedido.
+
+# Importa las funciones para abrir y cerrar conexión con la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion
+
+# Importa cursores tipo diccionario de PyMySQL
+import pymysql
+
+# Diario local: mientras tenga registros pendientes, la BD no está al día
+from modules.diario_local import DiarioLocal
+
+
+
+# ============================================================
+# 🔹 CLASE: EstadoSalon
+# ------------------------------------------------------------
+# ocupados: { id_equipo: (id_estudiante, nombre) o (None, None) }
+# Se identifica al estudiante por su id: dos estudiantes pueden
+# llamarse igual.
+# Se usa desde el hilo de la interfaz.
+# ============================================================
+class EstadoSalon:
+    def __init__(self):
+        # Equipos ocupados y el estudiante que tiene cada uno
+        self.ocupados = {}
+
+        # Indica si ya se cargó al menos una vez desde la BD
+        self.sincronizado = False
+
+
+    def sincronizar(self):
+        """Recarga desde la BD los equipos ocupados. Retorna True si pudo leerlos."""
+        # Las salidas guardadas en el diario local aún no llegaron a la BD:
+        # se conserva el estado local para no volver a marcarlos como ocupados
+        if self.sincronizado and DiarioLocal.hay_pendientes():
+            return False
+
+        conexion = crear_conexion()
+        if not conexion:
+            return False
+
+        cursor = conexion.cursor(pymysql.cursors.DictCursor)
+        try:
+            # Una sola consulta: equipos ocupados con el estudiante de su registro abierto
+            cursor.execute("""
+                SELECT eq.id_equipo,
+                       MAX(e.id_estudiante) AS id_estudiante,
+                       MAX(CONCAT(e.nombres, ' ', e.apellidos)) AS nombre
+                FROM equipos eq
+                LEFT JOIN historial h ON h.id_equipo = eq.id_equipo AND h.hora_fin IS NULL
+                LEFT JOIN matriculas m ON m.id_matricula = h.id_matricula
+                LEFT JOIN estudiantes e ON e.id_estudiante = m.id_estudiante
+                WHERE eq.estado = 'ocupado'
+                GROUP BY eq.id_equipo
+            """)
+            self.ocupados = {
+                row["id_equipo"]: (row["id_estudiante"], row["nombre"]) for row in cursor.fetchall()
+            }
+            self.sincronizado = True
+            return True
+
+        except Exception as e:
+            # Si falla, conserva el último estado conocido
+            print(f"⚠ No se pudo sincronizar el estado del salón: {e}")
+            return False
+
+        finally:
+            cursor.close()
+            cerrar_conexion(conexion)
+
+
+    def marcar_salida(self, id_equipo):
+        """Libera localmente el equipo después de un registrar_salida() exitoso."""
+        self.ocupados.pop(id_equipo, None)
+
+
+    def marcar_salida_de(self, id_estudiante):
+        """Libera localmente el equipo del estudiante (salida guardada en el diario local)."""
+        for id_equipo, (ocupante, _) in list(self.ocupados.items()):
+            if ocupante == id_estudiante:
+                del self.ocupados[id_equipo]
+
+
+    def equipos_ocupados(self):
+        """Cantidad de equipos ocupados (equivale a contar_equipos_ocupados())."""
+        return len(self.ocupados)
+
+
+    def pendientes(self):
+        """Nombres de los estudiantes que aún no registraron su salida (uno por estudiante)."""
+        return sorted(nombre for _, nombre in self.ocupados.values() if nombre)
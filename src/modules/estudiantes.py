@@ -7,6 +7,52 @@ from datetime import datetime
 # Importa cursores tipo diccionario de PyMySQL
 import pymysql.cursors
 
+# Importa utilidades para calcular y guardar el encoding facial
+from modules.cache_embeddings import (
+    codificar_foto, serializar_encodings, registrar_encodings,
+    hash_foto, clave_estudiante, guardar_cache, VERSION_ENCODER
+)
+
+# Índice en memoria para la búsqueda mientras se escribe
+from modules.indice_estudiantes import IndiceEstudiantes
+
+
+
+# ----------------------------------------------------------
+#  Utilidad: Calcular el encoding de la foto al inscribir
+# ----------------------------------------------------------
+def _calcular_encoding(clave, foto_bytes):
+    """
+    Codifica la foto una sola vez y retorna (encoding_blob, version)
+    para guardarlos junto a la foto. Si no hay foto o no se pudo
+    decodificar, retorna (None, None) y el encoding se calculará después.
+    """
+    if foto_bytes is None:
+        return None, None
+
+    encodings = codificar_foto(foto_bytes)
+    if encodings is None:
+        return None, None
+
+    # Deja el resultado también en el cache local para esta estación
+    registrar_encodings(clave, hash_foto(foto_bytes), encodings)
+    guardar_cache()
+    return serializar_encodings(encodings), VERSION_ENCODER
+
+
+
+# ----------------------------------------------------------
+#  Utilidad: Refrescar el índice de búsqueda
+# ----------------------------------------------------------
+def _refrescar_indice(id_estudiante):
+    """Actualiza solo este estudiante en el índice en memoria (si está cargado)."""
+    try:
+        IndiceEstudiantes.actualizar(id_estudiante)
+    except Exception as e:
+        # El cambio ya quedó guardado; el índice se recarga en la próxima búsqueda
+        print(f"⚠ No se pudo refrescar el índice de estudiantes: {e}")
+        IndiceEstudiantes.invalidar()
+
 
 
 # ----------------------------------------------------------
@@ -80,10 +126,15 @@ def registrar_estudiante(nombre, apellido, grado, foto_bytes=None, anio=None):
         cursor = conexion.cursor(pymysql.cursors.DictCursor)
 
 
+        # Calcula el encoding facial una sola vez, al momento de la inscripción
+        encoding_blob, version = _calcular_encoding(clave_estudiante(id_estudiante), foto_bytes)
+
+
         # Inserta los datos personales del estudiante en la tabla estudiantes
-        sql = """INSERT INTO estudiantes (id_estudiante, nombres, apellidos, foto_rostro)
-                 VALUES (%s, %s, %s, %s)"""
-        cursor.execute(sql, (id_estudiante, nombre, apellido, foto_bytes))
+        sql = """INSERT INTO estudiantes (id_estudiante, nombres, apellidos, foto_rostro,
+                                          encoding_rostro, version_encoding)
+                 VALUES (%s, %s, %s, %s, %s, %s)"""
+        cursor.execute(sql, (id_estudiante, nombre, apellido, foto_bytes, encoding_blob, version))
         conexion.commit()
 
 
@@ -93,6 +144,7 @@ def registrar_estudiante(nombre, apellido, grado, foto_bytes=None, anio=None):
 
         # Muestra mensaje de éxito en consola
         print(f"✅ Estudiante {nombre} {apellido} registrado con ID {id_estudiante}")
+        _refrescar_indice(id_estudiante)
         return True
 
 
@@ -115,58 +167,47 @@ def buscar_estudiantes(nombre="", grado="", estado="", anio=None):
     # Crea conexión y cursor para consultar estudiantes
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
+    try:
+        # Consulta base que obtiene datos del estudiante y su matrícula vigente
+        # (estudiantes.id_matricula_actual apunta a la última matrícula registrada)
+        sql = """
+            SELECT e.id_estudiante, e.nombres, e.apellidos,
+                   m.id_matricula, m.grado, m.anio, m.estado
+            FROM estudiantes e
+            LEFT JOIN matriculas m ON m.id_matricula = e.id_matricula_actual
+            WHERE 1=1
+        """
+        params = []
 
 
-    # Consulta base que obtiene datos del estudiante y su última matrícula registrada
-    sql = """
-        SELECT e.id_estudiante, e.nombres, e.apellidos,
-               (SELECT m.id_matricula FROM matriculas m WHERE m.id_estudiante = e.id_estudiante
-                    ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC
-                    LIMIT 1) AS id_matricula,
-               (SELECT m.grado FROM matriculas m WHERE m.id_estudiante = e.id_estudiante
-                    ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC
-                    LIMIT 1) AS grado,
-               (SELECT m.anio FROM matriculas m WHERE m.id_estudiante = e.id_estudiante
-                    ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC
-                    LIMIT 1) AS anio,
-               (SELECT m.estado FROM matriculas m WHERE m.id_estudiante = e.id_estudiante
-                    ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC
-                    LIMIT 1) AS estado
-        FROM estudiantes e
-        WHERE 1=1
-    """
-    params = []
-
-
-    # Agrega filtro por nombre o apellido si se proporcionó
-    if nombre:
-        sql += " AND (e.nombres LIKE %s OR e.apellidos LIKE %s)"
-        params.extend([f"%{nombre}%", f"%{nombre}%"])
-
-    # Agrega filtro por grado usando la última matrícula del estudiante
-    if grado:
-        sql += " AND (SELECT m.grado FROM matriculas m WHERE m.id_estudiante = e.id_estudiante ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC LIMIT 1) = %s"
-        params.append(grado)
-
-    # Agrega filtro por estado usando la última matrícula del estudiante
-    if estado:
-        sql += " AND (SELECT m.estado FROM matriculas m WHERE m.id_estudiante = e.id_estudiante ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC LIMIT 1) = %s"
-        params.append(estado)
+        # Agrega filtro por nombre o apellido si se proporcionó
+        if nombre:
+            sql += " AND (e.nombres LIKE %s OR e.apellidos LIKE %s)"
+            params.extend([f"%{nombre}%", f"%{nombre}%"])
 
-    # Agrega filtro por año usando la última matrícula del estudiante
-    if anio:
-        sql += " AND (SELECT m.anio FROM matriculas m WHERE m.id_estudiante = e.id_estudiante ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC LIMIT 1) = %s"
-        params.append(anio)
+        # Agrega filtro por grado usando la matrícula vigente del estudiante
+        if grado:
+            sql += " AND m.grado = %s"
+            params.append(grado)
 
+        # Agrega filtro por estado usando la matrícula vigente del estudiante
+        if estado:
+            sql += " AND m.estado = %s"
+            params.append(estado)
 
-    # Ejecuta la consulta con los filtros dinámicos
-    cursor.execute(sql, tuple(params))
-    resultados = cursor.fetchall()
+        # Agrega filtro por año usando la matrícula vigente del estudiante
+        if anio:
+            sql += " AND m.anio = %s"
+            params.append(anio)
 
 
-    # Cierra recursos y retorna resultados
-    cursor.close()
-    cerrar_conexion(conexion)
+        # Ejecuta la consulta con los filtros dinámicos
+        cursor.execute(sql, tuple(params))
+        resultados = cursor.fetchall()
+    finally:
+        # Cierra recursos (también si la consulta falla)
+        cursor.close()
+        cerrar_conexion(conexion)
     return resultados
 
 
@@ -188,13 +229,12 @@ def actualizar_datos(id_estudiante, nombre, apellido, grado=None, estado=None):
         conexion.commit()
 
 
-        # Consulta la última matrícula registrada del estudiante
+        # Consulta la matrícula vigente del estudiante
         cursor.execute("""
-            SELECT id_matricula, grado, anio, estado
-            FROM matriculas
-            WHERE id_estudiante = %s
-            ORDER BY CAST(SUBSTRING_INDEX(id_matricula, '-', -1) AS UNSIGNED) DESC
-            LIMIT 1
+            SELECT m.id_matricula, m.grado, m.anio, m.estado
+            FROM estudiantes e
+            INNER JOIN matriculas m ON m.id_matricula = e.id_matricula_actual
+            WHERE e.id_estudiante = %s
         """, (id_estudiante,))
         last = cursor.fetchone()
 
@@ -217,6 +257,8 @@ def actualizar_datos(id_estudiante, nombre, apellido, grado=None, estado=None):
             print("⚠ No se detectaron cambios → no se creó matrícula nueva")
 
 
+        # Nombre, grado y estado nuevos en el índice de búsqueda
+        _refrescar_indice(id_estudiante)
         return True
 
 
@@ -248,16 +290,23 @@ def actualizar_rostro(id_estudiante, foto_bytes=None):
         return False
 
 
+    # Recalcula el encoding facial con la nueva foto
+    encoding_blob, version = _calcular_encoding(clave_estudiante(id_estudiante), foto_bytes)
+
+
     # Crea conexión y cursor para actualizar la foto del estudiante
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-
-    # Actualiza el campo foto_rostro del estudiante
-    sql = "UPDATE estudiantes SET foto_rostro = %s WHERE id_estudiante = %s"
-    cursor.execute(sql, (foto_bytes, id_estudiante))
-    conexion.commit()
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        # Actualiza la foto y su encoding en la misma sentencia
+        sql = """UPDATE estudiantes
+                 SET foto_rostro = %s, encoding_rostro = %s, version_encoding = %s
+                 WHERE id_estudiante = %s"""
+        cursor.execute(sql, (foto_bytes, encoding_blob, version, id_estudiante))
+        conexion.commit()
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
 
     # Muestra confirmación en consola
     print(f"✅ Rostro actualizado para {id_estudiante}")
@@ -298,6 +347,12 @@ def registrar_matricula(id_estudiante, grado, anio=None, estado="Estudiante"):
             VALUES (%s, %s, %s, %s, %s)
         """
         cursor.execute(sql_insert, (id_matricula, id_estudiante, grado, anio, estado))
+
+        # La nueva matrícula pasa a ser la vigente (en la misma transacción)
+        cursor.execute(
+            "UPDATE estudiantes SET id_matricula_actual = %s WHERE id_estudiante = %s",
+            (id_matricula, id_estudiante)
+        )
         conexion.commit()
 
 
@@ -371,15 +426,15 @@ def obtener_matriculas_por_estudiante(id_estudiante):
     # Crea conexión y cursor para consultar matrículas del estudiante
     conexion = crear_conexion()
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
-
-    # Consulta todas las matrículas del estudiante ordenadas de la más reciente a la más antigua
-    sql = """SELECT id_matricula, grado, anio, estado
-             FROM matriculas WHERE id_estudiante = %s
-             ORDER BY CAST(SUBSTRING_INDEX(id_matricula, '-', -1) AS UNSIGNED) DESC"""
-    cursor.execute(sql, (id_estudiante,))
-    resultados = cursor.fetchall()
-
-    # Cierra recursos y retorna los resultados
-    cursor.close()
-    cerrar_conexion(conexion)
+    try:
+        # Consulta todas las matrículas del estudiante ordenadas de la más reciente a la más antigua
+        sql = """SELECT id_matricula, grado, anio, estado
+                 FROM matriculas WHERE id_estudiante = %s
+                 ORDER BY CAST(SUBSTRING_INDEX(id_matricula, '-', -1) AS UNSIGNED) DESC"""
+        cursor.execute(sql, (id_estudiante,))
+        resultados = cursor.fetchall()
+    finally:
+        # Cierra recursos (también si la consulta falla)
+        cursor.close()
+        cerrar_conexion(conexion)
     return resultados
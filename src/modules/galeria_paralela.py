@@ -0,0 +1,127 @@
+# modules/galeria_paralela.py
+# Construcción de la galería de encodings usando varios procesos.
+# En un arranque en frío (sin encodings guardados ni cache local) cada foto
+# debe decodificarse y codificarse; este módulo reparte ese trabajo en un
+# pool de procesos para usar todos los núcleos del equipo.
+
+# Utilidades del sistema operativo (cantidad de núcleos)
+import os
+
+# Pool de procesos y espera de resultados a medida que terminan
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Utilidades del cache y del encoding precalculado
+from modules.cache_embeddings import (
+    codificar_foto, deserializar_encodings, hash_foto,
+    buscar_encodings, registrar_encodings, VERSION_ENCODER
+)
+
+
+# Con pocas fotos no vale la pena pagar el arranque de los procesos
+MIN_FOTOS_PARALELO = 4
+
+
+
+def _cantidad_procesos(max_procesos=None):
+    """Deja un núcleo libre para la interfaz gráfica."""
+    if max_procesos:
+        return max(1, max_procesos)
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+
+# ----------------------------------------------------
+# Codificar fotos en paralelo
+# ----------------------------------------------------
+def codificar_en_paralelo(trabajos, max_procesos=None):
+    """
+    Recibe una lista de (etiqueta, foto_bytes) y genera (etiqueta, encodings)
+    a medida que cada foto termina de procesarse (no en el orden de entrada).
+    encodings es None si la foto no se pudo decodificar.
+    """
+    if not trabajos:
+        return
+
+    procesos = min(_cantidad_procesos(max_procesos), len(trabajos))
+
+    # Pocas fotos o un solo núcleo: se procesa en el mismo proceso
+    if procesos == 1 or len(trabajos) < MIN_FOTOS_PARALELO:
+        for etiqueta, foto in trabajos:
+            yield etiqueta, codificar_foto(foto)
+        return
+
+    pendientes = dict(trabajos)
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = {pool.submit(codificar_foto, foto): etiqueta for etiqueta, foto in trabajos}
+
+            for futuro in as_completed(futuros):
+                etiqueta = futuros[futuro]
+                try:
+                    encodings = futuro.result()
+                except Exception as e:
+                    print(f"⚠ Error codificando la foto de {etiqueta}: {e}")
+                    encodings = None
+
+                pendientes.pop(etiqueta, None)
+                yield etiqueta, encodings
+
+    except Exception as e:
+        # Si el pool no pudo crearse o se rompió, termina en el proceso actual
+        print(f"⚠ Pool de procesos no disponible ({e}); se continúa sin paralelismo")
+        for etiqueta, foto in list(pendientes.items()):
+            yield etiqueta, codificar_foto(foto)
+
+
+
+# ----------------------------------------------------
+# Resolver los encodings de las filas de la BD
+# ----------------------------------------------------
+def encodings_para_filas(filas, campo_id, clave_fn, max_procesos=None):
+    """
+    Obtiene los encodings de cada fila (con foto_rostro, encoding_rostro y
+    version_encoding) en este orden: columna de la BD, cache local y, para
+    las fotos restantes, codificación en paralelo.
+
+    Retorna (encodings_por_id, pendientes):
+    - encodings_por_id: { id: lista de encodings o None si no hay foto válida }
+    - pendientes: lista de (id, encodings) que conviene guardar en la BD
+    """
+    encodings_por_id = {}
+    pendientes = []
+    trabajos = []
+    hashes = {}
+
+    for row in filas:
+        id_ = row[campo_id]
+
+        # 1) Encoding guardado al momento de la inscripción
+        if row.get("encoding_rostro") is not None and row.get("version_encoding") == VERSION_ENCODER:
+            encodings_por_id[id_] = deserializar_encodings(row["encoding_rostro"])
+            continue
+
+        foto = row.get("foto_rostro")
+        if foto is None:
+            encodings_por_id[id_] = None
+            continue
+
+        # 2) Cache local de la estación
+        foto_hash = hash_foto(foto)
+        encodings = buscar_encodings(clave_fn(id_), foto_hash)
+        if encodings is not None:
+            encodings_por_id[id_] = encodings
+            pendientes.append((id_, encodings))
+            continue
+
+        # 3) Se codificará en paralelo
+        hashes[id_] = foto_hash
+        trabajos.append((id_, foto))
+
+
+    for id_, encodings in codificar_en_paralelo(trabajos, max_procesos):
+        encodings_por_id[id_] = encodings
+        if encodings is not None:
+            registrar_encodings(clave_fn(id_), hashes[id_], encodings)
+            pendientes.append((id_, encodings))
+
+    return encodings_por_id, pendientes
@@ -7,11 +7,17 @@ import json
 # Importa información del sistema operativo y procesador
 import platform
 
+# Permite calcular la huella del hardware
+import hashlib
+
+# Hilo para ejecutar el chequeo sin bloquear las ventanas
+import threading
+
 # Librería para consultar recursos de hardware como RAM y CPU
 import psutil
 
-# OpenCV para consultar la cámara y su resolución
-import cv2
+# Cámara compartida por todo el programa (abre y prueba la resolución una sola vez)
+from modules.camara import ServicioCamara, API_POR_DEFECTO
 
 # Componentes gráficos de PyQt6
 from PyQt6.QtWidgets import QDialog, QLabel, QVBoxLayout, QCheckBox, QPushButton
@@ -23,60 +29,25 @@ from PyQt6.QtCore import Qt
 # Ruta del archivo de configuración (se guarda en el mismo directorio)
 CONFIG_PATH = "config.json"
 
+# Lock para que el chequeo en segundo plano no pise otras escrituras de config.json
+_config_lock = threading.RLock()
+
+# Chequeo en segundo plano en curso (uno solo a la vez) y funciones que esperan su resultado
+_hilo_chequeo = None
+_al_terminar_chequeo = []
+
 
 
 # ============================================================
 # 🔹 FUNCIÓN: obtener_resolucion_real
 # ------------------------------------------------------------
 # Detecta automáticamente la resolución real soportada por la cámara.
-# Prueba varias resoluciones comunes y devuelve la más alta estable.
+# La prueba de resoluciones la hace el servicio de cámara compartido
+# solo cuando se pide (chequeo sin resultado guardado).
 # ============================================================
 def obtener_resolucion_real(cam_index=0):
-    # Abre la cámara indicada; en Windows usa el backend DirectShow
-    cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW)  # Abre la cámara (en Windows usa DirectShow)
-
-    # Si la cámara no se puede abrir, devuelve una resolución base por defecto
-    if not cap.isOpened():
-        # Si no se logra abrir, se devuelve una resolución por defecto
-        return (640, 480)
-
-
-    # Lista de resoluciones típicas (de mayor a menor calidad)
-    resoluciones_comunes = [
-        (3840, 2160),  # 4K
-        (2560, 1440),  # 2K
-        (1920, 1080),  # Full HD
-        (1280, 720),   # HD
-        (1024, 576),
-        (800, 600),
-        (640, 480)
-    ]
-
-
-    # Resolución mínima garantizada en caso de no encontrar una mejor
-    max_res = (640, 480)  # Resolución mínima garantizada
-
-    for w, h in resoluciones_comunes:
-        # Intenta configurar la cámara con esa resolución
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
-
-
-        # Obtiene la resolución real establecida por la cámara
-        real_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        real_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-
-        # Guarda la mayor resolución alcanzada correctamente
-        if real_w >= max_res[0] and real_h >= max_res[1]:
-            max_res = (real_w, real_h)
-
-
-    # Libera la cámara antes de terminar la función
-    cap.release()  # Libera la cámara
-
-    # Devuelve la mejor resolución detectada
-    return max_res
+    # Usa la cámara compartida (si ya está abierta no se vuelve a abrir)
+    return ServicioCamara.resolucion_maxima(cam_index)
 
 
 
@@ -101,6 +72,15 @@ def obtener_info_hardware():
         width, height = (640, 480)
 
 
+    # Estima la capacidad con la resolución detectada
+    return estimar_info_hardware(width, height)
+
+
+
+def estimar_info_hardware(width=640, height=480):
+    """Estima la capacidad de detección facial para una resolución dada (sin abrir la cámara)."""
+
+
     # --- Información de hardware del sistema ---
     # Calcula la memoria RAM total en GB
     ram_gb = psutil.virtual_memory().total / (1024 ** 3)  # Convierte bytes a GB
@@ -181,6 +161,133 @@ def obtener_info_hardware():
 
 
 
+# ============================================================
+# 🔹 FUNCIONES: huella_hardware / obtener_info_hardware_cacheada
+# ------------------------------------------------------------
+# El chequeo completo abre la cámara y prueba varias resoluciones.
+# Su resultado se guarda en config.json junto con una huella del
+# equipo (CPU, núcleos, RAM y el dispositivo de cámara) y solo
+# se repite si la huella cambia. La huella se calcula sin abrir
+# la cámara, pero consulta al sistema (WMI en Windows): se hace
+# en el hilo del chequeo, no al abrir las ventanas.
+# ============================================================
+def huella_hardware(cam_index=0):
+    """
+    Retorna un texto que identifica el equipo. La cámara se identifica por el
+    dispositivo (no solo por el índice), así cambiar la webcam repite el chequeo.
+    """
+    datos = {
+        "cpu": platform.processor() or "No detectado",
+        "cores": psutil.cpu_count(logical=True),
+        "ram": round(psutil.virtual_memory().total / (1024 ** 3), 1),
+        "camara": f"{cam_index}:{API_POR_DEFECTO}",
+        "dispositivo": ServicioCamara.identidad(cam_index)
+    }
+    return hashlib.sha1(json.dumps(datos, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def info_hardware_guardada(cam_index=0, huella=None):
+    """Retorna el chequeo guardado en config.json si la huella coincide, o None."""
+    with _config_lock:
+        guardado = cargar_config().get("chequeo_hardware")
+    if guardado and guardado.get("huella") == (huella or huella_hardware(cam_index)):
+        return guardado.get("info")
+    return None
+
+
+def obtener_info_hardware_cacheada(cam_index=0):
+    """
+    Retorna la información del hardware usando el chequeo guardado.
+    Solo abre la cámara y vuelve a probar si el equipo cambió.
+    """
+    huella = huella_hardware(cam_index)
+    info = info_hardware_guardada(cam_index, huella)
+    if info is not None:
+        return info
+
+    # Primera vez o hardware distinto: chequeo completo
+    info = obtener_info_hardware()
+    with _config_lock:
+        config = cargar_config()
+        config["chequeo_hardware"] = {"huella": huella, "info": info}
+        guardar_config(config)
+    return info
+
+
+def iniciar_chequeo_en_segundo_plano(al_terminar=None, cam_index=0):
+    """
+    Ejecuta obtener_info_hardware_cacheada() en un hilo de fondo y guarda
+    el resultado en la sesión. al_terminar(info) se llama desde ese hilo.
+    Si ya hay un chequeo en curso, no se inicia otro: al_terminar espera ese.
+    """
+    global _hilo_chequeo
+
+    def tarea():
+        global _hilo_chequeo
+        try:
+            info = obtener_info_hardware_cacheada(cam_index)
+        except Exception as e:
+            print(f"⚠ Error en el chequeo de hardware: {e}")
+            info = None
+
+        from modules.sesion import Sesion
+        if info is not None:
+            Sesion.set_hardware_info(info)
+
+        # Se toma la lista y se termina bajo el lock: quien llegue después inicia otro chequeo
+        with _config_lock:
+            avisar = list(_al_terminar_chequeo)
+            _al_terminar_chequeo.clear()
+            _hilo_chequeo = None
+
+        if info is not None:
+            for funcion in avisar:
+                funcion(info)
+
+    with _config_lock:
+        if al_terminar:
+            _al_terminar_chequeo.append(al_terminar)
+        if _hilo_chequeo is None:
+            _hilo_chequeo = threading.Thread(target=tarea, name="ChequeoHardware", daemon=True)
+            _hilo_chequeo.start()
+        return _hilo_chequeo
+
+
+def esperar_chequeo_hardware(cam_index=0):
+    """Retorna el resultado del chequeo; si hay uno en segundo plano, lo espera en vez de repetirlo."""
+    from modules.sesion import Sesion
+
+    with _config_lock:
+        hilo = _hilo_chequeo
+    if hilo is not None:
+        hilo.join()
+    return Sesion.get_hardware_info() or obtener_info_hardware_cacheada(cam_index)
+
+
+def obtener_info_hardware_rapida(al_terminar=None, cam_index=0):
+    """
+    Retorna de inmediato la información de hardware para abrir una ventana:
+    la de la sesión o, si no hay, el último chequeo guardado en config.json
+    (o una estimación sin cámara) mientras en segundo plano se verifica la
+    huella y, solo si el equipo cambió, se repite el chequeo. al_terminar
+    recibe el resultado verificado.
+    """
+    from modules.sesion import Sesion
+
+    info = Sesion.get_hardware_info()
+    if info:
+        return info
+
+    iniciar_chequeo_en_segundo_plano(al_terminar, cam_index)
+
+    # Provisional: el último chequeo guardado, sin calcular la huella aquí
+    with _config_lock:
+        guardado = cargar_config().get("chequeo_hardware") or {}
+    return guardado.get("info") or estimar_info_hardware()
+
+
+
+
 # ============================================================
 # 🔹 FUNCIONES: guardar_config / cargar_config
 # ------------------------------------------------------------
@@ -329,7 +436,7 @@ def mostrar_chequeo_hardware():
     usuario = Sesion.obtener_usuario()
     if not usuario:
         # No hay sesión, no mostraremos el chequeo aún
-        return obtener_info_hardware()
+        return esperar_chequeo_hardware()
 
 
     # Obtiene el ID único del docente
@@ -337,7 +444,7 @@ def mostrar_chequeo_hardware():
 
 
     # Detecta el hardware actual del sistema
-    actual = obtener_info_hardware()  # Detectar hardware actual
+    actual = esperar_chequeo_hardware()  # Detectar hardware actual (usa el chequeo de fondo o el guardado)
 
 
     # Carga la configuración previamente guardada
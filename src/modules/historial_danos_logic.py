@@ -3,13 +3,94 @@
 
 import pymysql
 from modules.conexion import crear_conexion, cerrar_conexion
+from modules.paginacion import (
+    TAMANO_PAGINA, orden_sql, condicion_despues_de, siguiente_pagina, recorrer_consulta
+)
+
+
+# Orden: daños más recientes primero; id_incidente desempata
+ORDEN_DANOS = [
+    ("i.fecha", "fecha_orden", "DESC"),
+    ("i.id_incidente", "id_incidente", "DESC"),
+]
+
+
+def _consulta_danos(nombre_estudiante, grado, equipo, fecha, despues_de=None, limite=None):
+    """Arma la consulta con filtros dinámicos y, si se indica, paginación. Retorna (query, valores)."""
+    # La matrícula se une por id_matricula_actual (una sola por estudiante),
+    # así cada incidente aparece una vez y la paginación no salta filas
+    query = """
+        SELECT 
+            i.id_equipo AS equipo,
+            CONCAT(e.nombres, ' ', e.apellidos) AS estudiante,
+            m.grado,
+            DATE_FORMAT(i.fecha, '%%d/%%m/%%Y') AS fecha,
+            i.descripcion,
+            CASE 
+                WHEN e.id_estudiante IS NOT NULL THEN 'Reportado'
+                ELSE 'Sin estudiante asignado'
+            END AS estado,
+            i.fecha AS fecha_orden,
+            i.id_incidente
+        FROM incidentes i
+        LEFT JOIN estudiantes e ON i.id_estudiante = e.id_estudiante
+        LEFT JOIN matriculas m ON m.id_matricula = e.id_matricula_actual AND m.estado = 'Estudiante'
+        WHERE i.descripcion LIKE %s
+    """
 
+    filtros = []
+    valores = ["%daño%"]
 
-def buscar_danos(nombre_estudiante="", grado="", equipo="", fecha=""):
+    if nombre_estudiante.strip():
+        filtros.append("(e.nombres LIKE %s OR e.apellidos LIKE %s)")
+        valores.extend([f"%{nombre_estudiante}%", f"%{nombre_estudiante}%"])
+
+    if grado.strip():
+        filtros.append("m.grado = %s")
+        valores.append(grado)
+
+    if equipo.strip():
+        filtros.append("i.id_equipo = %s")
+        valores.append(equipo)
+
+    if fecha.strip():
+        filtros.append("i.fecha = STR_TO_DATE(%s, '%%d/%%m/%%Y')")
+        valores.append(fecha)
+
+    # Solo las filas posteriores a la última de la página anterior
+    if despues_de is not None:
+        condicion, valores_clave = condicion_despues_de(ORDEN_DANOS, despues_de)
+        filtros.append(condicion)
+        valores.extend(valores_clave)
+
+    if filtros:
+        query += " AND " + " AND ".join(filtros)
+
+    query += f" ORDER BY {orden_sql(ORDEN_DANOS)}"
+
+    if limite is not None:
+        query += " LIMIT %s"
+        valores.append(limite)
+
+    return query, valores
+
+
+def _fila_dano(row):
+    return [
+        row["equipo"],
+        row["estudiante"],
+        row["grado"] if row["grado"] else "—",
+        row["fecha"],
+        row["descripcion"],
+        row["estado"]
+    ]
+
+
+def buscar_danos_pagina(nombre_estudiante="", grado="", equipo="", fecha="", despues_de=None, limite=TAMANO_PAGINA):
     """
-    Retorna una lista de filas con los campos:
+    Retorna (filas, siguiente): una página con los campos
     [Equipo, Estudiante, Grado, Fecha, Descripción, Estado]
-    aplicando filtros dinámicos según los valores de los filtros.
+    y la clave de la página siguiente (None si no quedan más).
     """
     conexion = None
     cursor = None
@@ -18,71 +99,40 @@ def buscar_danos(nombre_estudiante="", grado="", equipo="", fecha=""):
         conexion = crear_conexion()
         if not conexion:
             print("❌ No se pudo establecer la conexión con la base de datos.")
-            return []
+            return [], None
 
         cursor = conexion.cursor(pymysql.cursors.DictCursor)
 
-        query = """
-            SELECT 
-                i.id_equipo AS equipo,
-                CONCAT(e.nombres, ' ', e.apellidos) AS estudiante,
-                m.grado,
-                DATE_FORMAT(i.fecha, '%%d/%%m/%%Y') AS fecha,
-                i.descripcion,
-                CASE 
-                    WHEN e.id_estudiante IS NOT NULL THEN 'Reportado'
-                    ELSE 'Sin estudiante asignado'
-                END AS estado
-            FROM incidentes i
-            LEFT JOIN estudiantes e ON i.id_estudiante = e.id_estudiante
-            LEFT JOIN matriculas m ON m.id_estudiante = e.id_estudiante AND m.estado = 'Estudiante'
-            WHERE i.descripcion LIKE %s
-        """
-
-        filtros = []
-        valores = ["%daño%"]
-
-        if nombre_estudiante.strip():
-            filtros.append("(e.nombres LIKE %s OR e.apellidos LIKE %s)")
-            valores.extend([f"%{nombre_estudiante}%", f"%{nombre_estudiante}%"])
-
-        if grado.strip():
-            filtros.append("m.grado = %s")
-            valores.append(grado)
-
-        if equipo.strip():
-            filtros.append("i.id_equipo = %s")
-            valores.append(equipo)
-
-        if fecha.strip():
-            filtros.append("i.fecha = STR_TO_DATE(%s, '%%d/%%m/%%Y')")
-            valores.append(fecha)
-
-        if filtros:
-            query += " AND " + " AND ".join(filtros)
-
-        query += " ORDER BY i.fecha DESC, i.id_incidente DESC;"
-
+        query, valores = _consulta_danos(nombre_estudiante, grado, equipo, fecha, despues_de, limite)
         cursor.execute(query, valores)
         resultados = cursor.fetchall()
 
-        return [
-            [
-                row["equipo"],
-                row["estudiante"],
-                row["grado"] if row["grado"] else "—",
-                row["fecha"],
-                row["descripcion"],
-                row["estado"]
-            ]
-            for row in resultados
-        ]
+        siguiente = siguiente_pagina(ORDEN_DANOS, resultados, limite)
+        return [_fila_dano(row) for row in resultados], siguiente
 
     except pymysql.Error as e:
         print(f"⚠ Error al consultar daños: {e}")
-        return []
+        return [], None
 
     finally:
         if cursor:
             cursor.close()
-        cerrar_conexion(conexion)
\ No newline at end of file
+        cerrar_conexion(conexion)
+
+
+def recorrer_danos(nombre_estudiante="", grado="", equipo="", fecha=""):
+    """Generador con todos los daños que cumplen los filtros, leídos del servidor por lotes."""
+    query, valores = _consulta_danos(nombre_estudiante, grado, equipo, fecha)
+    try:
+        for row in recorrer_consulta(query, valores):
+            yield _fila_dano(row)
+    except pymysql.Error as e:
+        print(f"⚠ Error al consultar daños: {e}")
+
+
+def buscar_danos(nombre_estudiante="", grado="", equipo="", fecha=""):
+    """
+    Retorna una lista con todos los daños que cumplen los filtros.
+    Las pantallas usan buscar_danos_pagina().
+    """
+    return list(recorrer_danos(nombre_estudiante, grado, equipo, fecha))
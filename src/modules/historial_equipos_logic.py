@@ -3,13 +3,90 @@
 
 import pymysql
 from modules.conexion import crear_conexion, cerrar_conexion
+from modules.paginacion import (
+    TAMANO_PAGINA, orden_sql, condicion_despues_de, siguiente_pagina, recorrer_consulta
+)
+
+
+# Orden: acciones más recientes primero; id_historial_equipo desempata
+ORDEN_HISTORIAL_EQUIPOS = [
+    ("he.fecha", "fecha_orden", "DESC"),
+    ("he.hora", "hora_orden", "DESC"),
+    ("he.id_historial_equipo", "id_historial_equipo", "DESC"),
+]
+
+
+def _consulta_historial_equipos(codigo, tipo_accion, fecha, despues_de=None, limite=None):
+    """Arma la consulta con filtros dinámicos y, si se indica, paginación. Retorna (query, valores)."""
+    query = """
+        SELECT 
+            he.id_equipo AS equipo,
+            he.tipo_accion,
+            COALESCE(he.estado_anterior, '—') AS estado_anterior,
+            COALESCE(he.estado_nuevo, '—') AS estado_nuevo,
+            COALESCE(he.descripcion, '—') AS descripcion,
+            DATE_FORMAT(he.fecha, '%%d/%%m/%%Y') AS fecha,
+            TIME_FORMAT(he.hora, '%%H:%%i') AS hora,
+            CONCAT(d.nombres, ' ', d.apellidos) AS docente,
+            he.fecha AS fecha_orden,
+            he.hora AS hora_orden,
+            he.id_historial_equipo
+        FROM historial_equipos he
+        JOIN docentes d ON he.cedula = d.cedula
+        WHERE 1=1
+    """
 
+    filtros = []
+    valores = []
 
-def buscar_historial_equipos(codigo="", tipo_accion="", fecha=""):
+    if codigo.strip():
+        filtros.append("he.id_equipo = %s")
+        valores.append(codigo)
+
+    if tipo_accion.strip():
+        filtros.append("he.tipo_accion = %s")
+        valores.append(tipo_accion)
+
+    if fecha.strip():
+        filtros.append("he.fecha = STR_TO_DATE(%s, '%%d/%%m/%%Y')")
+        valores.append(fecha)
+
+    # Solo las filas posteriores a la última de la página anterior
+    if despues_de is not None:
+        condicion, valores_clave = condicion_despues_de(ORDEN_HISTORIAL_EQUIPOS, despues_de)
+        filtros.append(condicion)
+        valores.extend(valores_clave)
+
+    if filtros:
+        query += " AND " + " AND ".join(filtros)
+
+    query += f" ORDER BY {orden_sql(ORDEN_HISTORIAL_EQUIPOS)}"
+
+    if limite is not None:
+        query += " LIMIT %s"
+        valores.append(limite)
+
+    return query, valores
+
+
+def _fila_historial_equipo(row):
+    return [
+        row["equipo"],
+        row["tipo_accion"],
+        row["estado_anterior"],
+        row["estado_nuevo"],
+        row["descripcion"],
+        row["fecha"],
+        row["hora"],
+        row["docente"]
+    ]
+
+
+def buscar_historial_equipos_pagina(codigo="", tipo_accion="", fecha="", despues_de=None, limite=TAMANO_PAGINA):
     """
-    Retorna una lista de filas con los campos:
+    Retorna (filas, siguiente): una página con los campos
     [Equipo, Tipo Acción, Estado Anterior, Estado Nuevo, Descripción, Fecha, Hora, Docente]
-    aplicando filtros dinámicos.
+    y la clave de la página siguiente (None si no quedan más).
     """
     conexion = None
     cursor = None
@@ -18,65 +95,20 @@ def buscar_historial_equipos(codigo="", tipo_accion="", fecha=""):
         conexion = crear_conexion()
         if not conexion:
             print("❌ No se pudo establecer la conexión con la base de datos.")
-            return []
+            return [], None
 
         cursor = conexion.cursor(pymysql.cursors.DictCursor)
 
-        query = """
-            SELECT 
-                he.id_equipo AS equipo,
-                he.tipo_accion,
-                COALESCE(he.estado_anterior, '—') AS estado_anterior,
-                COALESCE(he.estado_nuevo, '—') AS estado_nuevo,
-                COALESCE(he.descripcion, '—') AS descripcion,
-                DATE_FORMAT(he.fecha, '%%d/%%m/%%Y') AS fecha,
-                TIME_FORMAT(he.hora, '%%H:%%i') AS hora,
-                CONCAT(d.nombres, ' ', d.apellidos) AS docente
-            FROM historial_equipos he
-            JOIN docentes d ON he.cedula = d.cedula
-            WHERE 1=1
-        """
-
-        filtros = []
-        valores = []
-
-        if codigo.strip():
-            filtros.append("he.id_equipo = %s")
-            valores.append(codigo)
-
-        if tipo_accion.strip():
-            filtros.append("he.tipo_accion = %s")
-            valores.append(tipo_accion)
-
-        if fecha.strip():
-            filtros.append("he.fecha = STR_TO_DATE(%s, '%%d/%%m/%%Y')")
-            valores.append(fecha)
-
-        if filtros:
-            query += " AND " + " AND ".join(filtros)
-
-        query += " ORDER BY he.fecha DESC, he.hora DESC;"
-
+        query, valores = _consulta_historial_equipos(codigo, tipo_accion, fecha, despues_de, limite)
         cursor.execute(query, valores)
         resultados = cursor.fetchall()
 
-        return [
-            [
-                row["equipo"],
-                row["tipo_accion"],
-                row["estado_anterior"],
-                row["estado_nuevo"],
-                row["descripcion"],
-                row["fecha"],
-                row["hora"],
-                row["docente"]
-            ]
-            for row in resultados
-        ]
+        siguiente = siguiente_pagina(ORDEN_HISTORIAL_EQUIPOS, resultados, limite)
+        return [_fila_historial_equipo(row) for row in resultados], siguiente
 
     except pymysql.Error as e:
         print(f"⚠ Error al consultar historial de equipos: {e}")
-        return []
+        return [], None
 
     finally:
         if cursor:
@@ -84,6 +116,24 @@ def buscar_historial_equipos(codigo="", tipo_accion="", fecha=""):
         cerrar_conexion(conexion)
 
 
+def recorrer_historial_equipos(codigo="", tipo_accion="", fecha=""):
+    """Generador con todas las filas que cumplen los filtros, leídas del servidor por lotes."""
+    query, valores = _consulta_historial_equipos(codigo, tipo_accion, fecha)
+    try:
+        for row in recorrer_consulta(query, valores):
+            yield _fila_historial_equipo(row)
+    except pymysql.Error as e:
+        print(f"⚠ Error al consultar historial de equipos: {e}")
+
+
+def buscar_historial_equipos(codigo="", tipo_accion="", fecha=""):
+    """
+    Retorna una lista con todas las filas que cumplen los filtros.
+    Las pantallas usan buscar_historial_equipos_pagina().
+    """
+    return list(recorrer_historial_equipos(codigo, tipo_accion, fecha))
+
+
 def registrar_historial_equipo(id_equipo, tipo_accion, estado_anterior, estado_nuevo, descripcion, cedula):
     """
     Registra una acción en el historial de equipos.
@@ -4,106 +4,123 @@ import pymysql
 # Importa funciones de conexión y cierre de conexión a la base de datos
 from modules.conexion import crear_conexion, cerrar_conexion
 
-
-def buscar_historial(nombre_estudiante="", grado="", fecha="", equipo="", estado=""):
-    """
-    Retorna una lista de filas con los campos:
-    [Estudiante, Grado, Equipo, Fecha, Hora-Inicio, Hora-Fin, Incidente]
-    aplicando filtros dinámicos según los valores de los filtros.
-    """
-
-
-    # Inicializa conexión y cursor en None para poder cerrarlos en finally
-    conexion = None
-    cursor = None
-
-
-    try:
-        # Intenta crear la conexión con la base de datos
-        conexion = crear_conexion()
-        if not conexion:
-            print("❌ No se pudo establecer la conexión con la base de datos.")
-            return []
-
-
-        # Usar DictCursor para acceder a los campos por nombre
-        cursor = conexion.cursor(pymysql.cursors.DictCursor)
-
-
-        # Consulta base
-        query = """
-            SELECT 
-                CONCAT(e.nombres, ' ', e.apellidos) AS estudiante,
-                m.grado,
-                h.id_equipo,
-                DATE_FORMAT(h.fecha, '%%d/%%m/%%Y') AS fecha,
-                TIME_FORMAT(h.hora_inicio, '%%H:%%i') AS hora_inicio,
-                TIME_FORMAT(h.hora_fin, '%%H:%%i') AS hora_fin,
-                COALESCE(i.descripcion, 'Sin novedad') AS incidente
-            FROM historial h
-            JOIN matriculas m ON h.id_matricula = m.id_matricula
-            JOIN estudiantes e ON m.id_estudiante = e.id_estudiante
-            LEFT JOIN incidentes i 
-                ON i.id_matricula = h.id_matricula 
-                AND i.id_equipo = h.id_equipo 
-                AND i.fecha = h.fecha
-            WHERE 1=1
-        """
+# Paginación por clave y recorrido sin buffer
+from modules.paginacion import (
+    TAMANO_PAGINA, orden_sql, condicion_despues_de, siguiente_pagina, recorrer_consulta
+)
+
+
+# Orden del historial: fecha más reciente primero y, dentro del día, por hora de inicio.
+# (expresión, alias en el resultado, sentido); id_historial desempata
+ORDEN_HISTORIAL = [
+    ("h.fecha", "fecha_orden", "DESC"),
+    ("h.hora_inicio", "hora_orden", "ASC"),
+    ("h.id_historial", "id_historial", "ASC"),
+]
 
 
-        # Lista para almacenar filtros SQL dinámicos y sus valores
-        filtros = []
-        valores = []
 
+def _filtros_historial(nombre_estudiante, grado, fecha, equipo, estado):
+    """Construye los filtros dinámicos. Retorna (lista de condiciones SQL, valores)."""
+    # Lista para almacenar filtros SQL dinámicos y sus valores
+    filtros = []
+    valores = []
 
-        # Filtros dinámicos
-        if nombre_estudiante.strip():
-            # Filtra por coincidencia parcial en nombres o apellidos
-            filtros.append("(e.nombres LIKE %s OR e.apellidos LIKE %s)")
-            valores.extend([f"%{nombre_estudiante}%", f"%{nombre_estudiante}%"])
 
+    # Filtros dinámicos
+    if nombre_estudiante.strip():
+        # Filtra por coincidencia parcial en nombres o apellidos
+        filtros.append("(e.nombres LIKE %s OR e.apellidos LIKE %s)")
+        valores.extend([f"%{nombre_estudiante}%", f"%{nombre_estudiante}%"])
 
-        if grado.strip():
-            # Filtra por grado exacto
-            filtros.append("m.grado = %s")
-            valores.append(grado)
 
+    if grado.strip():
+        # Filtra por grado exacto
+        filtros.append("m.grado = %s")
+        valores.append(grado)
 
-        if fecha.strip():
-            # Convierte la fecha recibida en formato texto dd/mm/YYYY a tipo fecha SQL
-            filtros.append("h.fecha = STR_TO_DATE(%s, '%%d/%%m/%%Y')")
-            valores.append(fecha)
 
+    if fecha.strip():
+        # Convierte la fecha recibida en formato texto dd/mm/YYYY a tipo fecha SQL
+        filtros.append("h.fecha = STR_TO_DATE(%s, '%%d/%%m/%%Y')")
+        valores.append(fecha)
 
-        if equipo.strip():
-            # Filtra por identificador de equipo
-            filtros.append("h.id_equipo = %s")
-            valores.append(equipo)
 
+    if equipo.strip():
+        # Filtra por identificador de equipo
+        filtros.append("h.id_equipo = %s")
+        valores.append(equipo)
 
-        if estado.strip():
-            # Filtra por estado de la matrícula
-            filtros.append("m.estado = %s")
-            valores.append(estado)
 
+    if estado.strip():
+        # Filtra por estado de la matrícula
+        filtros.append("m.estado = %s")
+        valores.append(estado)
 
-        # Unir filtros al query
-        if filtros:
-            query += " AND " + " AND ".join(filtros)
+    return filtros, valores
 
 
-        # Agrega orden descendente por fecha y ascendente por hora de inicio
-        query += " ORDER BY h.fecha DESC, h.hora_inicio ASC;"
 
+def _consulta_historial(filtros, valores, despues_de=None, limite=None):
+    """
+    Arma la consulta del historial. Los filtros, la paginación y el LIMIT se
+    aplican sobre historial en una subconsulta; los incidentes se unen después,
+    así una página siempre tiene 'limite' registros de historial completos.
+    Retorna (query, valores).
+    """
+    filtros = list(filtros)
+    valores = list(valores)
+
+    # Solo las filas posteriores a la última de la página anterior
+    if despues_de is not None:
+        condicion, valores_clave = condicion_despues_de(ORDEN_HISTORIAL, despues_de)
+        filtros.append(condicion)
+        valores.extend(valores_clave)
+
+    where = (" AND " + " AND ".join(filtros)) if filtros else ""
+
+    limit = ""
+    if limite is not None:
+        limit = "LIMIT %s"
+        valores.append(limite)
+
+    query = f"""
+        SELECT
+            hp.estudiante,
+            hp.grado,
+            hp.id_equipo,
+            DATE_FORMAT(hp.fecha, '%%d/%%m/%%Y') AS fecha,
+            TIME_FORMAT(hp.hora_inicio, '%%H:%%i') AS hora_inicio,
+            TIME_FORMAT(hp.hora_fin, '%%H:%%i') AS hora_fin,
+            COALESCE(i.descripcion, 'Sin novedad') AS incidente,
+            hp.fecha AS fecha_orden,
+            hp.hora_inicio AS hora_orden,
+            hp.id_historial
+        FROM (
+            SELECT h.id_historial, h.id_matricula, h.id_equipo,
+                   h.fecha, h.hora_inicio, h.hora_fin,
+                   CONCAT(e.nombres, ' ', e.apellidos) AS estudiante,
+                   m.grado
+            FROM historial h
+            JOIN matriculas m ON h.id_matricula = m.id_matricula
+            JOIN estudiantes e ON m.id_estudiante = e.id_estudiante
+            WHERE 1=1{where}
+            ORDER BY {orden_sql(ORDEN_HISTORIAL)}
+            {limit}
+        ) hp
+        LEFT JOIN incidentes i
+            ON i.id_matricula = hp.id_matricula
+            AND i.id_equipo = hp.id_equipo
+            AND i.fecha = hp.fecha
+        ORDER BY hp.fecha DESC, hp.hora_inicio ASC, hp.id_historial ASC, i.id_incidente ASC
+    """
+    return query, valores
 
-        # Ejecutar consulta
-        cursor.execute(query, valores)
-        resultados = cursor.fetchall()  # Devuelve lista de diccionarios
 
 
-        # Convierte cada diccionario en una lista ordenada con las columnas requeridas
-        return [
-    [
+def _fila_historial(row):
+    # Convierte el diccionario en una lista ordenada con las columnas de la tabla
+    return [
         row["estudiante"],
         row["grado"],
         row["id_equipo"],
@@ -112,15 +129,43 @@ def buscar_historial(nombre_estudiante="", grado="", fecha="", equipo="", estado
         row["hora_fin"],
         row["incidente"]
     ]
-    for row in resultados
-]
 
 
+
+def buscar_historial_pagina(nombre_estudiante="", grado="", fecha="", equipo="", estado="",
+                            despues_de=None, limite=TAMANO_PAGINA):
+    """
+    Retorna (filas, siguiente): una página del historial con los campos
+    [Estudiante, Grado, Equipo, Fecha, Hora-Inicio, Hora-Fin, Incidente]
+    y la clave para pedir la página siguiente (despues_de=siguiente),
+    o None si no quedan más registros.
+    """
+    conexion = None
+    cursor = None
+
+    try:
+        conexion = crear_conexion()
+        if not conexion:
+            print("❌ No se pudo establecer la conexión con la base de datos.")
+            return [], None
+
+        cursor = conexion.cursor(pymysql.cursors.DictCursor)
+
+        filtros, valores = _filtros_historial(nombre_estudiante, grado, fecha, equipo, estado)
+        query, valores = _consulta_historial(filtros, valores, despues_de, limite)
+        cursor.execute(query, valores)
+        resultados = cursor.fetchall()
+
+        # Un registro con varios incidentes ocupa varias filas: se cuentan registros
+        registros = len({row["id_historial"] for row in resultados})
+        siguiente = siguiente_pagina(ORDEN_HISTORIAL, resultados, limite, registros)
+
+        return [_fila_historial(row) for row in resultados], siguiente
+
     except pymysql.Error as e:
-        # Captura errores específicos de PyMySQL y retorna una lista vacía
+        # Captura errores específicos de PyMySQL y retorna una página vacía
         print(f"⚠ Error al consultar el historial: {e}")
-        return []
-
+        return [], None
 
     finally:
         # Cierra el cursor si fue creado
@@ -129,3 +174,28 @@ def buscar_historial(nombre_estudiante="", grado="", fecha="", equipo="", estado
 
         # Cierra la conexión a la base de datos
         cerrar_conexion(conexion)
+
+
+
+def recorrer_historial(nombre_estudiante="", grado="", fecha="", equipo="", estado=""):
+    """
+    Generador con todas las filas del historial que cumplen los filtros,
+    leídas del servidor por lotes (para exportar o generar reportes).
+    """
+    filtros, valores = _filtros_historial(nombre_estudiante, grado, fecha, equipo, estado)
+    query, valores = _consulta_historial(filtros, valores)
+    try:
+        for row in recorrer_consulta(query, valores):
+            yield _fila_historial(row)
+    except pymysql.Error as e:
+        print(f"⚠ Error al consultar el historial: {e}")
+
+
+
+def buscar_historial(nombre_estudiante="", grado="", fecha="", equipo="", estado=""):
+    """
+    Retorna una lista con todas las filas del historial que cumplen los filtros.
+    Las pantallas usan buscar_historial_pagina(); esta función es para quien
+    realmente necesita el resultado completo.
+    """
+    return list(recorrer_historial(nombre_estudiante, grado, fecha, equipo, estado))
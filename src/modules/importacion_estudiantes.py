@@ -0,0 +1,264 @@
+# modules/importacion_estudiantes.py
+# Importación masiva de estudiantes desde un CSV y una carpeta de fotos.
+# Al inicio del año se inscriben cientos de estudiantes; registrarlos uno por
+# uno cuesta varias consultas y una conexión por estudiante. Aquí los ids se
+# asignan en memoria con una sola lectura de la BD, los encodings se calculan
+# en un pool de procesos y los INSERT se envían con executemany por lotes.
+#
+# Formato del CSV (con encabezado, separado por comas, UTF-8):
+#   nombres,apellidos,grado,foto
+#   Ana María,Pérez Gómez,6-1,ana_perez.jpg
+# La columna foto es el nombre del archivo dentro de la carpeta de fotos
+# (puede quedar vacía).
+
+# Utilidades para manejo de archivos y rutas
+import os
+
+# Lectura del archivo CSV
+import csv
+
+# Importa datetime para obtener el año actual del sistema
+from datetime import datetime
+
+# Importa las funciones para abrir y cerrar conexión con la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion
+
+# Importa cursores tipo diccionario de PyMySQL
+import pymysql
+
+# Codificación de fotos en paralelo
+from modules.galeria_paralela import codificar_en_paralelo
+
+# Utilidades para guardar el encoding facial
+from modules.cache_embeddings import (
+    serializar_encodings, registrar_encodings, hash_foto,
+    clave_estudiante, guardar_cache, VERSION_ENCODER
+)
+
+
+# Filas por cada executemany / commit
+TAMANO_LOTE = 200
+
+# Columnas obligatorias del CSV
+COLUMNAS_CSV = ("nombres", "apellidos", "grado")
+
+
+
+# ----------------------------------------------------
+# Lectura y validación del CSV
+# ----------------------------------------------------
+def leer_csv(ruta_csv, carpeta_fotos, reporte):
+    """
+    Lee el CSV y la foto de cada fila. Retorna la lista de filas válidas
+    (dicts con linea, nombres, apellidos, grado, foto_bytes); las filas
+    inválidas se agregan a reporte["fallidas"] como (linea, motivo).
+    """
+    filas = []
+    with open(ruta_csv, newline="", encoding="utf-8-sig") as f:
+        lector = csv.DictReader(f)
+
+        faltantes = [c for c in COLUMNAS_CSV if c not in (lector.fieldnames or [])]
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+
+        # La línea 1 es el encabezado
+        for linea, row in enumerate(lector, start=2):
+            nombres = (row.get("nombres") or "").strip()
+            apellidos = (row.get("apellidos") or "").strip()
+            grado = (row.get("grado") or "").strip()
+            archivo = (row.get("foto") or "").strip()
+
+            if not nombres or not apellidos:
+                reporte["fallidas"].append((linea, "nombres y apellidos son obligatorios"))
+                continue
+
+            # El grado debe tener la forma número-grupo, ej. "6-1"
+            partes = grado.split("-")
+            if len(partes) != 2 or not partes[0].isdigit() or not partes[1]:
+                reporte["fallidas"].append((linea, f"grado inválido: '{grado}'"))
+                continue
+
+            foto_bytes = None
+            if archivo:
+                ruta_foto = os.path.join(carpeta_fotos, archivo)
+                try:
+                    with open(ruta_foto, "rb") as fp:
+                        foto_bytes = fp.read()
+                except OSError as e:
+                    reporte["fallidas"].append((linea, f"no se pudo leer la foto {archivo}: {e.strerror}"))
+                    continue
+
+            filas.append({
+                "linea": linea,
+                "nombres": nombres,
+                "apellidos": apellidos,
+                "grado": grado,
+                "foto_bytes": foto_bytes
+            })
+    return filas
+
+
+
+# ----------------------------------------------------
+# Asignación de ids en bloque
+# ----------------------------------------------------
+def asignar_ids(cursor, filas, anio):
+    """
+    Asigna id_estudiante a cada fila con la misma regla que
+    estudiantes.generar_id_estudiante (año + grado + consecutivo), pero
+    leyendo la BD solo dos veces para todo el lote.
+    """
+    # Matrículas existentes por grado en ese año (punto de partida del consecutivo)
+    cursor.execute(
+        "SELECT grado, COUNT(*) AS total FROM matriculas WHERE anio = %s GROUP BY grado",
+        (anio,)
+    )
+    totales = {row["grado"]: row["total"] for row in cursor.fetchall()}
+
+    # ids ya usados que empiezan con el año
+    cursor.execute(
+        "SELECT id_estudiante FROM estudiantes WHERE CAST(id_estudiante AS CHAR) LIKE %s",
+        (f"{anio}%",)
+    )
+    usados = {str(row["id_estudiante"]) for row in cursor.fetchall()}
+
+    siguiente = {}
+    for fila in filas:
+        grado = fila["grado"]
+        num, grupo = grado.split("-")
+        prefijo_grado = f"{int(num):02d}{grupo}"
+
+        consecutivo = siguiente.get(grado, (totales.get(grado) or 0) + 1)
+        while True:
+            id_est = f"{anio}{prefijo_grado}{consecutivo:02d}"
+            if id_est not in usados:
+                break
+            consecutivo += 1
+
+        usados.add(id_est)
+        siguiente[grado] = consecutivo + 1
+        fila["id_estudiante"] = id_est
+        fila["id_matricula"] = f"{id_est}-01"
+
+
+
+# ----------------------------------------------------
+# Encodings en paralelo
+# ----------------------------------------------------
+def calcular_encodings(filas, reporte, max_procesos=None):
+    """Agrega a cada fila encoding_blob y version (None si no hay foto válida)."""
+    por_linea = {fila["linea"]: fila for fila in filas}
+    trabajos = [(fila["linea"], fila["foto_bytes"]) for fila in filas if fila["foto_bytes"] is not None]
+
+    for fila in filas:
+        fila["encoding_blob"], fila["version"] = None, None
+
+    for linea, encodings in codificar_en_paralelo(trabajos, max_procesos):
+        fila = por_linea[linea]
+        if encodings is None:
+            # La foto no es una imagen válida: se inscribe igual, sin foto
+            reporte["advertencias"].append((linea, "la foto no se pudo decodificar; se inscribe sin foto"))
+            fila["foto_bytes"] = None
+            continue
+
+        if not encodings:
+            reporte["advertencias"].append((linea, "no se detectó un rostro en la foto"))
+
+        fila["encoding_blob"] = serializar_encodings(encodings)
+        fila["version"] = VERSION_ENCODER
+        fila["encodings"] = encodings
+
+
+
+# ----------------------------------------------------
+# Inserción por lotes
+# ----------------------------------------------------
+def _insertar(cursor, filas, anio):
+    cursor.executemany(
+        """INSERT INTO estudiantes (id_estudiante, nombres, apellidos, foto_rostro,
+                                    encoding_rostro, version_encoding, id_matricula_actual)
+           VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+        [(f["id_estudiante"], f["nombres"], f["apellidos"], f["foto_bytes"],
+          f["encoding_blob"], f["version"], f["id_matricula"]) for f in filas]
+    )
+    cursor.executemany(
+        """INSERT INTO matriculas (id_matricula, id_estudiante, grado, anio, estado)
+           VALUES (%s, %s, %s, %s, 'Estudiante')""",
+        [(f["id_matricula"], f["id_estudiante"], f["grado"], anio) for f in filas]
+    )
+
+
+def insertar_lotes(conexion, filas, anio, reporte, tamano_lote=TAMANO_LOTE):
+    """
+    Inserta las filas con executemany en lotes de tamano_lote, un commit por lote.
+    Si un lote falla, se reintenta fila por fila para identificar las que fallan.
+    """
+    cursor = conexion.cursor()
+    try:
+        for inicio in range(0, len(filas), tamano_lote):
+            lote = filas[inicio:inicio + tamano_lote]
+            try:
+                _insertar(cursor, lote, anio)
+                conexion.commit()
+                reporte["insertadas"].extend(f["id_estudiante"] for f in lote)
+                continue
+            except pymysql.MySQLError:
+                conexion.rollback()
+
+            # El lote falló: fila por fila para no perder las válidas
+            for fila in lote:
+                try:
+                    _insertar(cursor, [fila], anio)
+                    conexion.commit()
+                    reporte["insertadas"].append(fila["id_estudiante"])
+                except pymysql.MySQLError as e:
+                    conexion.rollback()
+                    reporte["fallidas"].append((fila["linea"], f"error al insertar: {e}"))
+    finally:
+        cursor.close()
+
+
+
+# ----------------------------------------------------
+# Importación completa
+# ----------------------------------------------------
+def importar_estudiantes(ruta_csv, carpeta_fotos, anio=None, tamano_lote=TAMANO_LOTE, max_procesos=None):
+    """
+    Importa los estudiantes del CSV. Retorna un reporte:
+    { "insertadas": [ids], "fallidas": [(linea, motivo)], "advertencias": [(linea, motivo)] }
+    Una fila con error no detiene al resto.
+    """
+    if anio is None:
+        anio = datetime.now().year
+
+    reporte = {"insertadas": [], "fallidas": [], "advertencias": []}
+
+    filas = leer_csv(ruta_csv, carpeta_fotos, reporte)
+    if not filas:
+        return reporte
+
+    # Encodings en el pool de procesos (lo más costoso de la importación)
+    calcular_encodings(filas, reporte, max_procesos)
+
+    conexion = crear_conexion()
+    if not conexion:
+        reporte["fallidas"].extend((f["linea"], "sin conexión a la base de datos") for f in filas)
+        return reporte
+
+    cursor = conexion.cursor(pymysql.cursors.DictCursor)
+    try:
+        asignar_ids(cursor, filas, anio)
+        insertar_lotes(conexion, filas, anio, reporte, tamano_lote)
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
+
+    # Deja los encodings de los insertados en el cache local de esta estación
+    insertados = set(reporte["insertadas"])
+    for fila in filas:
+        if fila["id_estudiante"] in insertados and fila.get("encodings"):
+            registrar_encodings(clave_estudiante(fila["id_estudiante"]),
+                                hash_foto(fila["foto_bytes"]), fila["encodings"])
+    guardar_cache()
+
+    return reporte
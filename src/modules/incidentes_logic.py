@@ -1,7 +1,7 @@
 # modules/incidentes_logic.py
 
-# Importa date y datetime para manejar fecha actual y hora actual
-from datetime import date, datetime
+# Importa datetime para manejar la fecha y hora del incidente
+from datetime import datetime
 
 # Importa funciones de conexión a base de datos
 from modules.conexion import crear_conexion, cerrar_conexion
@@ -12,6 +12,9 @@ from modules.sesion import Sesion
 # Importa PyMySQL para cursores y operaciones con MySQL
 import pymysql
 
+# Diario local para registrar el incidente si la BD no responde
+from modules.diario_local import DiarioLocal
+
 
 def _obtener_cedula_sesion():
     """
@@ -118,27 +121,42 @@ def obtener_estudiante_por_equipo(id_equipo):
 
 
 
-def registrar_incidente(id_matricula, id_equipo, descripcion, nuevo_estado=None):
+def registrar_incidente(id_matricula, id_equipo, descripcion, nuevo_estado=None,
+                        conexion=None, cedula=None, momento=None):
     """
     Inserta un incidente usando:
       - cedula: tomada desde la sesión
       - id_equipo
       - id_matricula
       - descripcion
-      - fecha: date.today()
+      - fecha: la del incidente (hoy)
     Además actualiza el estado del equipo si se indica nuevo_estado.
     Si el nuevo estado es "dañado", cierra el historial (asigna hora_fin actual).
+
+    Si no hay conexión con la BD (o el diario local tiene registros pendientes),
+    el incidente se guarda en el diario local y se envía cuando la BD vuelva.
+    conexion, cedula y momento (datetime) los usa la reproducción del diario:
+    con conexion recibida, el commit queda a cargo de quien llama.
     """
     # Obtiene la cédula del docente autenticado desde la sesión
-    cedula = _obtener_cedula_sesion()
+    cedula = cedula or _obtener_cedula_sesion()
     if not cedula:
         return False, "No hay una sesión de docente activa (no se encontró cédula)."
 
 
-    # Crea conexión con la base de datos
-    conexion = crear_conexion()
-    if not conexion:
-        return False, "No se pudo conectar con la base de datos."
+    propia = conexion is None
+    if propia:
+        # Con registros pendientes en el diario, este también va al diario (se conserva el orden)
+        conexion = None if DiarioLocal.hay_pendientes() else crear_conexion()
+        if not conexion:
+            DiarioLocal.registrar("incidente", {
+                "id_matricula": id_matricula, "id_equipo": id_equipo, "descripcion": descripcion,
+                "nuevo_estado": nuevo_estado, "cedula": cedula
+            })
+            return True, "Sin conexión con la base de datos: el incidente se guardó y se enviará al reconectar."
+
+    # Fecha y hora del incidente
+    momento = momento or datetime.now()
 
 
     # Crea cursor estándar para ejecutar consultas
@@ -159,7 +177,7 @@ def registrar_incidente(id_matricula, id_equipo, descripcion, nuevo_estado=None)
             INSERT INTO incidentes (cedula, id_equipo, id_matricula, descripcion, fecha)
             VALUES (%s, %s, %s, %s, %s)
         """
-        cursor.execute(insert_sql, (cedula, id_equipo, id_matricula, descripcion, date.today()))
+        cursor.execute(insert_sql, (cedula, id_equipo, id_matricula, descripcion, momento.date()))
 
 
         # Actualizar el estado del equipo si se proporcionó
@@ -171,7 +189,7 @@ def registrar_incidente(id_matricula, id_equipo, descripcion, nuevo_estado=None)
 
             # si el estado es "dañado", cerrar el historial activo
             if nuevo_estado.lower() == "dañado":
-                hora_fin = datetime.now().strftime("%H:%M:%S")
+                hora_fin = momento.strftime("%H:%M:%S")
                 cursor.execute("""
                     UPDATE historial
                     SET hora_fin = %s
@@ -180,13 +198,18 @@ def registrar_incidente(id_matricula, id_equipo, descripcion, nuevo_estado=None)
 
 
         # Confirma la transacción
-        conexion.commit()
+        if propia:
+            conexion.commit()
         return True, "Incidente registrado correctamente. Estado del equipo actualizado."
     except Exception as e:
+        # Con conexión recibida, el error lo maneja quien llama (reintento o rollback del lote)
+        if not propia:
+            raise
         # Revierte la transacción si ocurre cualquier error
         conexion.rollback()
         return False, f"Error al registrar incidente: {e}"
     finally:
         # Cierra recursos de base de datos
         cursor.close()
-        cerrar_conexion(conexion)
+        if propia:
+            cerrar_conexion(conexion)
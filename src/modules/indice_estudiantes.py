@@ -0,0 +1,211 @@
+# modules/indice_estudiantes.py
+# Índice en memoria de estudiantes para buscar mientras se escribe.
+# Se arma una sola vez con una consulta de todo el listado (estudiante +
+# matrícula vigente) y las búsquedas por nombre se resuelven sin ir a la base
+# de datos: sin tildes ni mayúsculas ("jose" encuentra "José"), con trigramas
+# para palabras de 3 letras o más y recorriendo los textos para las más cortas
+# (igual que el LIKE '%x%' de la consulta, en cualquier parte). Después de
+# actualizar_datos / registrar_estudiante se refresca solo el estudiante
+# afectado en lugar de volver a consultar todo.
+
+# Quitar tildes (NFKD separa la letra del acento)
+import unicodedata
+
+# Lock: el índice se arma en un hilo de consultas y se lee desde la interfaz
+import threading
+
+# Cursores tipo diccionario de PyMySQL
+import pymysql.cursors
+
+# Importa las funciones para conectar y cerrar la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion
+
+
+# Mismas columnas que buscar_estudiantes() (matrícula vigente del estudiante)
+SQL_LISTADO = """
+    SELECT e.id_estudiante, e.nombres, e.apellidos,
+           m.id_matricula, m.grado, m.anio, m.estado
+    FROM estudiantes e
+    LEFT JOIN matriculas m ON m.id_matricula = e.id_matricula_actual
+"""
+
+# Palabras más cortas que esto se buscan recorriendo los textos en lugar de trigramas
+LARGO_TRIGRAMA = 3
+
+
+
+def normalizar(texto):
+    """Texto sin tildes y en minúsculas ("José Peña" -> "jose pena")."""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def _trigramas(texto):
+    """Trigramas de cada palabra del texto normalizado."""
+    trigramas = set()
+    for palabra in texto.split():
+        trigramas.update(palabra[i:i + LARGO_TRIGRAMA] for i in range(len(palabra) - LARGO_TRIGRAMA + 1))
+    return trigramas
+
+
+
+# ============================================================
+# 🔹 CLASE: IndiceEstudiantes
+# ------------------------------------------------------------
+# Uno por proceso (métodos de clase, como Sesion o DiarioLocal).
+# ============================================================
+class IndiceEstudiantes:
+    # { id_estudiante: fila como la retorna buscar_estudiantes() } (None = sin cargar)
+    _registros = None
+
+    # { id_estudiante: "nombres apellidos" normalizado }
+    _textos = {}
+
+    # { trigrama: {ids} }
+    _trigramas = {}
+
+    # Protege las estructuras anteriores
+    _lock = threading.Lock()
+
+
+    @classmethod
+    def cargado(cls):
+        """True si el índice ya está en memoria (buscar() no consultará la BD)."""
+        return cls._registros is not None
+
+
+    @classmethod
+    def cargar(cls):
+        """Arma el índice con una sola consulta del listado completo."""
+        conexion = crear_conexion()
+        if not conexion:
+            # Sin conexión el índice queda sin cargar; quien busca recibe el error
+            raise ConnectionError("sin conexión a la base de datos para cargar el índice de estudiantes")
+        cursor = conexion.cursor(pymysql.cursors.DictCursor)
+        try:
+            cursor.execute(SQL_LISTADO)
+            filas = cursor.fetchall()
+        finally:
+            cursor.close()
+            cerrar_conexion(conexion)
+
+        with cls._lock:
+            cls._registros, cls._textos, cls._trigramas = {}, {}, {}
+            for fila in filas:
+                cls._agregar(fila)
+        print(f"ℹ Índice de estudiantes cargado ({len(filas)} estudiantes)")
+
+
+    @classmethod
+    def invalidar(cls):
+        """Descarta el índice; la próxima búsqueda lo vuelve a cargar."""
+        with cls._lock:
+            cls._registros = None
+            cls._textos, cls._trigramas = {}, {}
+
+
+    @classmethod
+    def actualizar(cls, id_estudiante):
+        """Vuelve a leer un estudiante de la BD y reemplaza su entrada en el índice."""
+        if not cls.cargado():
+            return
+
+        conexion = crear_conexion()
+        if not conexion:
+            raise ConnectionError("sin conexión a la base de datos para refrescar el índice de estudiantes")
+        cursor = conexion.cursor(pymysql.cursors.DictCursor)
+        try:
+            cursor.execute(SQL_LISTADO + " WHERE e.id_estudiante = %s", (id_estudiante,))
+            fila = cursor.fetchone()
+        finally:
+            cursor.close()
+            cerrar_conexion(conexion)
+
+        with cls._lock:
+            if cls._registros is None:
+                return
+            cls._quitar(id_estudiante)
+            if fila:
+                cls._agregar(fila)
+
+
+    @classmethod
+    def buscar(cls, nombre="", grado="", estado="", anio=None):
+        """
+        Mismo resultado que buscar_estudiantes() pero desde memoria. Cada palabra
+        de nombre debe aparecer en nombres o apellidos (sin tildes ni mayúsculas).
+        Lanza ConnectionError si el índice no está cargado y no hay conexión.
+        """
+        while True:
+            if not cls.cargado():
+                cls.cargar()
+
+            with cls._lock:
+                # invalidar() pudo descartarlo entre cargar() y tomar el lock: se vuelve a cargar
+                if cls._registros is None:
+                    continue
+
+                candidatos = None
+                for palabra in normalizar(nombre).split():
+                    ids = cls._ids_palabra(palabra)
+                    candidatos = ids if candidatos is None else candidatos & ids
+                    if not candidatos:
+                        return []
+
+                ids = cls._registros.keys() if candidatos is None else candidatos
+                filas = [cls._registros[i] for i in ids]
+                break
+
+        # Filtros exactos sobre la matrícula vigente
+        return [
+            dict(fila) for fila in filas
+            if (not grado or fila["grado"] == grado)
+            and (not estado or fila["estado"] == estado)
+            and (not anio or fila["anio"] == anio)
+        ]
+
+
+    # ---------------------------
+    # Uso interno (con _lock tomado)
+    # ---------------------------
+    @classmethod
+    def _ids_palabra(cls, palabra):
+        # Palabra corta (1-2 letras): aparece en cualquier parte del texto; los
+        # textos ya están en memoria, recorrerlos es barato
+        if len(palabra) < LARGO_TRIGRAMA:
+            return {i for i, texto in cls._textos.items() if palabra in texto}
+
+        # Palabra larga: los que tienen todos sus trigramas, verificando la subcadena
+        ids = None
+        for trigrama in _trigramas(palabra):
+            encontrados = cls._trigramas.get(trigrama, set())
+            ids = set(encontrados) if ids is None else ids & encontrados
+            if not ids:
+                return set()
+        return {i for i in ids if palabra in cls._textos[i]}
+
+
+    @classmethod
+    def _agregar(cls, fila):
+        id_est = fila["id_estudiante"]
+        texto = normalizar(f"{fila['nombres']} {fila['apellidos']}")
+        cls._registros[id_est] = dict(fila)
+        cls._textos[id_est] = texto
+
+        for trigrama in _trigramas(texto):
+            cls._trigramas.setdefault(trigrama, set()).add(id_est)
+
+
+    @classmethod
+    def _quitar(cls, id_est):
+        texto = cls._textos.pop(id_est, None)
+        cls._registros.pop(id_est, None)
+        if texto is None:
+            return
+
+        for trigrama in _trigramas(texto):
+            ids = cls._trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id_est)
+                if not ids:
+                    del cls._trigramas[trigrama]
@@ -1,11 +1,5 @@
 # modules/ingreso_logic.py
 
-# Permite codificar y decodificar datos en base64
-import base64
-
-# Librería para operaciones numéricas y manejo de arreglos
-import numpy as np
-
 # Librería OpenCV para procesamiento de imágenes
 import cv2
 
@@ -15,6 +9,17 @@ import face_recognition
 # Funciones para abrir y cerrar conexión con la base de datos
 from modules.conexion import crear_conexion, cerrar_conexion
 
+# Cache persistente de encodings faciales
+from modules.cache_embeddings import (
+    clave_estudiante, guardar_cache, guardar_encodings_en_bd, cargar_fotos_faltantes
+)
+
+# Construcción de la galería en paralelo para arranques en frío
+from modules.galeria_paralela import encodings_para_filas
+
+# Galería vectorizada para comparar rostros
+from modules.matcher import asegurar_galeria
+
 # Clase para obtener los datos del usuario en sesión
 from modules.sesion import Sesion
 
@@ -75,35 +80,21 @@ def cargar_estudiantes(grado=None):
         # Si se especifica un grado, filtra estudiantes por ese grado
         if grado:
             cursor.execute("""
-                SELECT e.id_estudiante, e.nombres, e.apellidos, e.foto_rostro
+                SELECT e.id_estudiante, e.nombres, e.apellidos,
+                       e.encoding_rostro, e.version_encoding
                 FROM estudiantes e
-                INNER JOIN matriculas m 
-                    ON e.id_estudiante = m.id_estudiante
-                INNER JOIN (
-                    SELECT id_estudiante, MAX(id_matricula) AS ultima_matricula
-                    FROM matriculas
-                    WHERE estado = 'Estudiante'
-                    GROUP BY id_estudiante
-                ) ult 
-                    ON m.id_estudiante = ult.id_estudiante 
-                    AND m.id_matricula = ult.ultima_matricula
+                INNER JOIN matriculas m
+                    ON m.id_matricula = e.id_matricula_actual
                 WHERE m.grado = %s AND m.estado = 'Estudiante'
             """, (grado,))
         else:
             # Si no se especifica grado, obtiene todos los estudiantes activos
             cursor.execute("""
-                SELECT e.id_estudiante, e.nombres, e.apellidos, e.foto_rostro
+                SELECT e.id_estudiante, e.nombres, e.apellidos,
+                       e.encoding_rostro, e.version_encoding
                 FROM estudiantes e
-                INNER JOIN matriculas m 
-                    ON e.id_estudiante = m.id_estudiante
-                INNER JOIN (
-                    SELECT id_estudiante, MAX(id_matricula) AS ultima_matricula
-                    FROM matriculas
-                    WHERE estado = 'Estudiante'
-                    GROUP BY id_estudiante
-                ) ult 
-                    ON m.id_estudiante = ult.id_estudiante 
-                    AND m.id_matricula = ult.ultima_matricula
+                INNER JOIN matriculas m
+                    ON m.id_matricula = e.id_matricula_actual
                 WHERE m.estado = 'Estudiante'
             """)
 
@@ -111,31 +102,24 @@ def cargar_estudiantes(grado=None):
         # Lista donde se almacenarán los estudiantes procesados
         estudiantes = []
 
-        for row in cursor.fetchall():
-            # Extrae la foto almacenada como BLOB
-            foto_blob = row["foto_rostro"]
+        filas = cursor.fetchall()
 
-            # Si no hay foto, se omite el registro
-            if foto_blob is None:
-                continue
+        # La foto solo se trae de quienes no tienen un encoding vigente
+        cargar_fotos_faltantes(conexion, "estudiantes", "id_estudiante", filas)
 
+        # Usa el encoding guardado en la inscripción o el cache local; las fotos
+        # que falten se codifican en paralelo en un pool de procesos
+        encodings_por_id, pendientes = encodings_para_filas(filas, "id_estudiante", clave_estudiante)
 
-            # Decodificar la imagen desde BLOB
-            np_arr = np.frombuffer(foto_blob, np.uint8)
-            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        for row in filas:
+            encodings = encodings_por_id.get(row["id_estudiante"])
 
-            # Si la imagen no pudo reconstruirse correctamente, se omite
-            if img is None:
-                print(f"No se pudo decodificar la imagen del estudiante {row['id_estudiante']}")
+            # Si no hay foto o la imagen no pudo reconstruirse correctamente, se omite
+            if encodings is None:
+                if row["foto_rostro"] is not None:
+                    print(f"No se pudo decodificar la imagen del estudiante {row['id_estudiante']}")
                 continue
 
-
-            # Convierte la imagen de BGR a RGB para face_recognition
-            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-            # Genera los encodings faciales del estudiante
-            encodings = face_recognition.face_encodings(rgb)
-
             # Si no se pudo generar ningún encoding, se omite
             if not encodings:
                 continue
@@ -150,6 +134,10 @@ def cargar_estudiantes(grado=None):
             })
 
 
+        # Persiste los encodings recalculados en la BD y en el cache local
+        guardar_encodings_en_bd(conexion, "estudiantes", "id_estudiante", pendientes)
+        guardar_cache()
+
         # Retorna la lista de estudiantes válidos
         return estudiantes
 
@@ -166,8 +154,11 @@ def cargar_estudiantes(grado=None):
 # Retorna lista de tuples (id_estudiante, nombre)
 # ----------------------------------------------------
 def buscar_estudiantes_en_frame(frame, estudiantes_conocidos, max_faces=2, tolerance=0.45):
+    # Acepta la lista de estudiantes o una GaleriaRostros ya construida
+    galeria = asegurar_galeria(estudiantes_conocidos)
+
     # Si no hay estudiantes cargados, no se puede hacer comparación
-    if not estudiantes_conocidos:
+    if not len(galeria):
         return []
 
 
@@ -193,28 +184,11 @@ def buscar_estudiantes_en_frame(frame, estudiantes_conocidos, max_faces=2, toler
     encodings_frame = face_recognition.face_encodings(rgb_small, locations)
 
 
-    # Lista de estudiantes reconocidos
-    encontrados = []
-
-    for enc in encodings_frame:
-        # Bandera para saber si ya se encontró coincidencia para este rostro
-        match_found = False
-
-        for est in estudiantes_conocidos:
-            for est_enc in est["encodings"]:  # ahora iteramos sobre todas las variantes
-                # Compara el rostro actual con cada encoding del estudiante
-                if face_recognition.compare_faces([est_enc], enc, tolerance=tolerance)[0]:
-                    encontrados.append((est["id"], est["nombre"]))
-                    match_found = True
-                    break
-
-            # Si ya se encontró coincidencia, no sigue buscando en más estudiantes
-            if match_found:
-                break
-
-        # Si ya se alcanzó el número máximo de rostros a reconocer, detiene el proceso
-        if len(encontrados) >= max_faces:
-            break
+    # Compara todos los rostros contra toda la galería en una sola operación
+    encontrados = [
+        (est["id"], est["nombre"])
+        for est, _ in galeria.identificar(encodings_frame, tolerancia=tolerance)
+    ][:max_faces]
 
 
     # Retorna la lista de estudiantes encontrados
@@ -232,13 +206,46 @@ def buscar_estudiante_por_rostro(frame, estudiantes_conocidos, tolerance=0.45):
     return encontrados[0] if encontrados else None
 
 
+# ----------------------------------------------------
+# Elegir el equipo entre los candidatos (reglas de asignación)
+# ----------------------------------------------------
+def _elegir_equipo(codigo_puesto, candidatos):
+    """
+    candidatos: filas (id_equipo, estado, en_uso) ordenadas por id_equipo, con el
+    equipo del puesto y todos los disponibles. Reglas:
+    - Si el equipo del puesto no existe: el primer disponible.
+    - Si existe y está disponible: ese mismo.
+    - Si está ocupado/dañado/otro: el primer disponible sin uso abierto en el
+      historial; si no hay, el primer disponible.
+    """
+    puesto = next((c for c in candidatos if c["id_equipo"] == codigo_puesto), None)
+    disponibles = [c for c in candidatos if c["estado"] == "disponible" and c["id_equipo"] != codigo_puesto]
+
+    if puesto is None:
+        return disponibles[0]["id_equipo"] if disponibles else None
+
+    if puesto["estado"] not in ("ocupado", "dañado", "otro"):
+        return codigo_puesto
+
+    for c in disponibles:
+        if not c["en_uso"]:
+            return c["id_equipo"]
+    return disponibles[0]["id_equipo"] if disponibles else None
+
+
+
 # ----------------------------------------------------
 # Asignar equipo a estudiante
-# (igual que tu código original)
+# Una transacción con un número fijo de consultas
 # ----------------------------------------------------
-def asignar_equipo(id_estudiante):
-    # Crea conexión con la base de datos
-    conexion = crear_conexion()
+def asignar_equipo(id_estudiante, conexion=None, cedula=None, momento=None):
+    # Si se recibe una conexión (escritor por lotes), el commit y el cierre
+    # quedan a cargo de quien llama; si no, se usa una conexión propia.
+    # cedula y momento (datetime) se usan al reproducir el diario local: el
+    # ingreso se registra con el docente y la hora en que ocurrió
+    propia = conexion is None
+    if propia:
+        conexion = crear_conexion()
 
     # Si no hay conexión, retorna None
     if not conexion:
@@ -252,156 +259,96 @@ def asignar_equipo(id_estudiante):
         usuario = Sesion.obtener_usuario()
 
         # Extrae la cédula del docente si existe en la sesión
-        cedula_docente = usuario["cedula"] if usuario and "cedula" in usuario else None
+        cedula_docente = cedula or (usuario["cedula"] if usuario and "cedula" in usuario else None)
 
 
-        # Obtener la matrícula más reciente del estudiante
+        # 1) Matrícula vigente, equipo abierto y puesto alfabético en una sola consulta.
+        #    El puesto es la cantidad de compañeros del grado que van antes por apellido
+        #    (a igual apellido, por id). La comparación es binaria (utf8mb4_bin) sobre
+        #    el apellido en minúsculas, igual que el sorted(apellidos.lower()) original:
+        #    con la colación de la columna (*_ai_ci) "Álvarez" o "Núñez" quedarían en
+        #    otro puesto. FOR UPDATE bloquea la fila del estudiante para que dos
+        #    reconocimientos simultáneos no le asignen dos equipos.
         cursor.execute(
-            "SELECT MAX(id_matricula) AS max_matricula FROM matriculas WHERE id_estudiante = %s AND estado = 'Estudiante'",
+            """
+            SELECT m.id_matricula, h.id_equipo AS equipo_abierto,
+                   (SELECT COUNT(*)
+                    FROM estudiantes e2
+                    INNER JOIN matriculas m2 ON m2.id_matricula = e2.id_matricula_actual
+                    WHERE m2.grado = m.grado AND m2.estado = 'Estudiante'
+                      AND (LOWER(COALESCE(e2.apellidos, '')) COLLATE utf8mb4_bin
+                             < LOWER(COALESCE(e.apellidos, '')) COLLATE utf8mb4_bin
+                           OR (LOWER(COALESCE(e2.apellidos, '')) COLLATE utf8mb4_bin
+                               = LOWER(COALESCE(e.apellidos, '')) COLLATE utf8mb4_bin
+                               AND e2.id_estudiante < e.id_estudiante))
+                   ) AS posicion
+            FROM estudiantes e
+            INNER JOIN matriculas m ON m.id_matricula = e.id_matricula_actual
+            LEFT JOIN historial h ON h.id_matricula = m.id_matricula AND h.hora_fin IS NULL
+            WHERE e.id_estudiante = %s AND m.estado = 'Estudiante'
+            LIMIT 1
+            FOR UPDATE
+            """,
             (id_estudiante,)
         )
         row = cursor.fetchone()
-        matricula = row["max_matricula"] if row else None
 
         # Si no existe matrícula activa, retorna None
-        if not matricula:
+        if not row:
             return None
-
-
-        # Verificar si ya tiene equipo asignado
-        cursor.execute(
-            "SELECT id_equipo FROM historial WHERE id_matricula = %s AND hora_fin IS NULL",
-            (matricula,)
-        )
-        row = cursor.fetchone()
+        matricula = row["id_matricula"]
 
         # Si ya tiene un equipo asignado actualmente, retorna ese equipo
-        if row:
-            return row["id_equipo"]
-
+        if row["equipo_abierto"]:
+            return row["equipo_abierto"]
 
-        # Obtener grado del estudiante
-        cursor.execute("SELECT grado FROM matriculas WHERE id_matricula = %s", (matricula,))
-        row = cursor.fetchone()
 
-        # Si no se encuentra el grado, retorna None
-        if not row:
-            return None
-        grado = row["grado"]
+        # Genera el código del equipo según la posición del estudiante
+        codigo_equipo = f"E-{str(row['posicion'] + 1).zfill(2)}"
 
 
-        # Obtener todos los estudiantes del mismo grado
+        # 2) Candidatos: el equipo del puesto y todos los disponibles, con su uso actual.
+        #    FOR UPDATE bloquea esas filas hasta el commit para que otro ingreso
+        #    simultáneo no tome el mismo equipo.
         cursor.execute(
             """
-            SELECT m.id_estudiante, e.apellidos
-            FROM matriculas m
-            INNER JOIN estudiantes e ON m.id_estudiante = e.id_estudiante
-            INNER JOIN (
-                SELECT id_estudiante, MAX(id_matricula) AS ultima_matricula
-                FROM matriculas
-                WHERE estado = 'Estudiante'
-                GROUP BY id_estudiante
-            ) ult ON m.id_estudiante = ult.id_estudiante AND m.id_matricula = ult.ultima_matricula
-            WHERE m.grado = %s AND m.estado = 'Estudiante'
+            SELECT eq.id_equipo, eq.estado,
+                   EXISTS(SELECT 1 FROM historial h
+                          WHERE h.id_equipo = eq.id_equipo AND h.hora_fin IS NULL) AS en_uso
+            FROM equipos eq
+            WHERE eq.id_equipo = %s OR eq.estado = 'disponible'
+            ORDER BY eq.id_equipo ASC
+            FOR UPDATE
             """,
-            (grado,)
+            (codigo_equipo,)
         )
-        filas = cursor.fetchall()
-
-        # Si no hay estudiantes en ese grado, retorna None
-        if not filas:
+        candidatos = cursor.fetchall()
+        codigo_equipo = _elegir_equipo(codigo_equipo, candidatos)
+        if not codigo_equipo:
             return None
 
 
-        # Ordenar por apellido
-        estudiantes_ordenados = sorted(filas, key=lambda x: (x["apellidos"].lower() if x["apellidos"] else ""))
-        ids_ordenados = [f["id_estudiante"] for f in estudiantes_ordenados]
-
-
-        try:
-            # Busca la posición del estudiante dentro de la lista ordenada
-            pos = ids_ordenados.index(id_estudiante)
-        except ValueError:
-            # Si no aparece en la lista, retorna None
-            return None
-
+        # 3) Marcar equipo como ocupado si no lo está
+        cursor.execute(
+            "UPDATE equipos SET estado = 'ocupado' WHERE id_equipo = %s AND estado <> 'ocupado'",
+            (codigo_equipo,)
+        )
 
-        # Genera el código del equipo según la posición del estudiante
-        codigo_equipo = f"E-{str(pos+1).zfill(2)}"
-
-
-        # Verificar estado del equipo
-        cursor.execute("SELECT estado FROM equipos WHERE id_equipo = %s", (codigo_equipo,))
-        equipo_row = cursor.fetchone()
-
-        # Función para obtener siguiente equipo disponible (no dañado, no ocupado)
-        def obtener_siguiente_disponible(posicion):
-            cursor.execute(
-                "SELECT id_equipo FROM equipos WHERE id_equipo != %s ORDER BY id_equipo ASC",
-                (codigo_equipo,)
-            )
-            for eq in cursor.fetchall():
-                eq_id = eq["id_equipo"]
-                # Verificar que no esté dañado ni ocupado por otro
-                cursor.execute(
-                    "SELECT estado FROM equipos WHERE id_equipo = %s",
-                    (eq_id,)
-                )
-                est = cursor.fetchone()
-                if est and est["estado"] == "disponible":
-                    # Verificar que no esté en uso
-                    cursor.execute(
-                        "SELECT id_matricula FROM historial WHERE id_equipo = %s AND hora_fin IS NULL",
-                        (eq_id,)
-                    )
-                    if not cursor.fetchone():
-                        return eq_id
-            return None
 
-        if not equipo_row:
-            # Tomar primer equipo disponible
-            cursor.execute("SELECT id_equipo FROM equipos WHERE estado = 'disponible' ORDER BY id_equipo ASC LIMIT 1")
-            r = cursor.fetchone()
-            if not r:
-                return None
-            codigo_equipo = r["id_equipo"]
-        else:
-            estado = equipo_row["estado"]
-            if estado in ("ocupado", "dañado", "otro"):
-                # Busca siguiente equipo disponible (no dañado, no ocupado)
-                nuevo = obtener_siguiente_disponible(pos)
-                if nuevo:
-                    codigo_equipo = nuevo
-                else:
-                    # Si está ocupado por otro estudiante, buscar disponible
-                    cursor.execute(
-                        "SELECT id_equipo FROM equipos WHERE estado = 'disponible' ORDER BY id_equipo ASC LIMIT 1"
-                    )
-                    r = cursor.fetchone()
-                    if not r:
-                        return None
-                    codigo_equipo = r["id_equipo"]
-
-
-        # Marcar equipo como ocupado si no lo está
-        cursor.execute("SELECT estado FROM equipos WHERE id_equipo = %s", (codigo_equipo,))
-        estado_row = cursor.fetchone()
-        if estado_row and estado_row["estado"] != "ocupado":
-            cursor.execute("UPDATE equipos SET estado = 'ocupado' WHERE id_equipo = %s", (codigo_equipo,))
-
-
-        # Insertar historial
+        # 4) Insertar historial
         cursor.execute(
             """
             INSERT INTO historial (id_matricula, cedula, id_equipo, fecha, hora_inicio, hora_fin)
-            VALUES (%s, %s, %s, CURDATE(), CURTIME(), NULL)
+            VALUES (%s, %s, %s, COALESCE(%s, CURDATE()), COALESCE(%s, CURTIME()), NULL)
             """,
-            (matricula, cedula_docente, codigo_equipo)
+            (matricula, cedula_docente, codigo_equipo,
+             momento.date() if momento else None, momento.time() if momento else None)
         )
 
 
         # Guarda definitivamente los cambios realizados en la base de datos
-        conexion.commit()
+        if propia:
+            conexion.commit()
 
         # Retorna el código del equipo asignado
         return codigo_equipo
@@ -410,7 +357,8 @@ def asignar_equipo(id_estudiante):
     finally:
         # Cierra el cursor y la conexión al finalizar
         cursor.close()
-        cerrar_conexion(conexion)
+        if propia:
+            cerrar_conexion(conexion)
 
 
 
@@ -0,0 +1,125 @@
+# modules/matcher.py
+# Comparación vectorizada de rostros contra una galería de personas conocidas.
+# Reemplaza los ciclos anidados con face_recognition.compare_faces: todos los
+# encodings de la galería se guardan en una sola matriz float32 y las distancias
+# de todos los rostros del frame se calculan en una única operación de NumPy.
+
+# Librería para operaciones numéricas y manejo de arreglos
+import numpy as np
+
+
+# Dimensión de los vectores generados por face_recognition
+DIMENSION_ENCODING = 128
+
+
+
+# ============================================================
+# 🔹 CLASE: GaleriaRostros
+# ------------------------------------------------------------
+# Recibe la lista de personas tal como la devuelven los loaders
+# (dicts con "encodings" = lista de variantes o "encoding" = un
+# solo vector) y la convierte en una matriz contigua.
+# ============================================================
+class GaleriaRostros:
+    def __init__(self, personas):
+        # Lista original de personas (se devuelve tal cual en los resultados)
+        self.personas = list(personas or [])
+
+        # Plantillas (una fila por encoding) y la persona a la que pertenece cada fila
+        plantillas = []
+        indices = []
+        for i, persona in enumerate(self.personas):
+            if "encodings" in persona:
+                encodings = persona["encodings"]
+            else:
+                encodings = [persona["encoding"]] if persona.get("encoding") is not None else []
+
+            for enc in encodings:
+                plantillas.append(enc)
+                indices.append(i)
+
+
+        # Matriz (M, 128) float32 contigua con todas las plantillas
+        if plantillas:
+            self.matriz = np.ascontiguousarray(np.asarray(plantillas, dtype=np.float32))
+        else:
+            self.matriz = np.empty((0, DIMENSION_ENCODING), dtype=np.float32)
+
+        # Índice de persona para cada fila de la matriz
+        self.indices = np.asarray(indices, dtype=np.int32)
+
+        # Norma al cuadrado de cada plantilla (se precalcula una sola vez)
+        self.normas2 = np.einsum("ij,ij->i", self.matriz, self.matriz)
+
+
+    def __len__(self):
+        # Cantidad de personas en la galería
+        return len(self.personas)
+
+
+    def distancias(self, encodings):
+        """
+        Retorna la matriz (F, M) de distancias euclidianas entre los F encodings
+        recibidos y las M plantillas de la galería.
+        """
+        consultas = np.asarray(encodings, dtype=np.float32).reshape(-1, DIMENSION_ENCODING)
+
+        # |a - b|² = |a|² + |b|² - 2·a·b  (todo en una sola multiplicación de matrices)
+        normas_q = np.einsum("ij,ij->i", consultas, consultas)
+        d2 = normas_q[:, None] + self.normas2[None, :] - 2.0 * (consultas @ self.matriz.T)
+
+        # Evita raíces de valores negativos por errores de redondeo
+        np.maximum(d2, 0.0, out=d2)
+        return np.sqrt(d2)
+
+
+    def buscar(self, encodings, tolerancia=0.45):
+        """
+        Para cada encoding retorna (persona, distancia) con la plantilla más cercana,
+        o None si ninguna está por debajo de la tolerancia.
+        """
+        if len(encodings) == 0:
+            return []
+        if self.matriz.shape[0] == 0:
+            return [None] * len(encodings)
+
+        dist = self.distancias(encodings)
+
+        # Plantilla más cercana para cada rostro del frame
+        mejores = np.argmin(dist, axis=1)
+
+        resultados = []
+        for fila, col in enumerate(mejores):
+            d = float(dist[fila, col])
+            if d <= tolerancia:
+                resultados.append((self.personas[self.indices[col]], d))
+            else:
+                resultados.append(None)
+        return resultados
+
+
+    def identificar(self, encodings, tolerancia=0.45):
+        """
+        Igual que buscar(), pero descarta los rostros sin coincidencia y
+        si una misma persona aparece en varios rostros conserva solo
+        el de menor distancia. Retorna lista de (persona, distancia).
+        """
+        mejores = {}
+        for resultado in self.buscar(encodings, tolerancia):
+            if resultado is None:
+                continue
+            persona, d = resultado
+            clave = id(persona)
+            if clave not in mejores or d < mejores[clave][1]:
+                mejores[clave] = (persona, d)
+
+        # Ordena de la coincidencia más segura a la menos segura
+        return sorted(mejores.values(), key=lambda r: r[1])
+
+
+
+def asegurar_galeria(personas):
+    """Retorna una GaleriaRostros; si ya lo es, la devuelve sin reconstruirla."""
+    if isinstance(personas, GaleriaRostros):
+        return personas
+    return GaleriaRostros(personas)
@@ -0,0 +1,210 @@
+# modules/migraciones.py
+# Migraciones versionadas del esquema de la base de datos.
+# Al iniciar el programa se aplican, en orden, las migraciones que aún no
+# figuran en la tabla schema_migraciones. Cada paso revisa
+# information_schema (sqlite_master con el motor SQLite) antes de modificar
+# algo, así que volver a ejecutarlo sobre una base que ya tiene el cambio no
+# hace nada (en MySQL los DDL confirman solos y no se pueden deshacer con
+# rollback).
+
+# Importa las funciones para conectar y cerrar la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion, motor_actual
+
+
+
+# ----------------------------------------------------
+# Utilidades idempotentes
+# ----------------------------------------------------
+def _existe_indice(cursor, tabla, indice):
+    if motor_actual() == "sqlite":
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = %s", (indice,))
+        return cursor.fetchone() is not None
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (tabla, indice))
+    return cursor.fetchone() is not None
+
+
+def _existe_columna(cursor, tabla, columna):
+    if motor_actual() == "sqlite":
+        cursor.execute("SELECT 1 FROM pragma_table_info(%s) WHERE name = %s", (tabla, columna))
+        return cursor.fetchone() is not None
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (tabla, columna))
+    return cursor.fetchone() is not None
+
+
+def crear_indice(cursor, tabla, indice, columnas, unico=False):
+    """Crea el índice solo si todavía no existe. tabla/indice/columnas son constantes del código."""
+    if not _existe_indice(cursor, tabla, indice):
+        tipo = "UNIQUE INDEX" if unico else "INDEX"
+        cursor.execute(f"CREATE {tipo} {indice} ON {tabla} ({', '.join(columnas)})")
+
+
+def agregar_columna(cursor, tabla, columna, definicion):
+    """Agrega la columna solo si todavía no existe."""
+    if not _existe_columna(cursor, tabla, columna):
+        cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+
+
+
+# ----------------------------------------------------
+# Migraciones (agregar siempre al final, nunca cambiar una ya publicada)
+# ----------------------------------------------------
+def _m001_indices_consultas_frecuentes(cursor):
+    # Equipo en uso por un estudiante: historial WHERE id_matricula = ? AND hora_fin IS NULL
+    crear_indice(cursor, "historial", "idx_historial_matricula_abierto", ["id_matricula", "hora_fin"])
+
+    # Equipo ocupado: historial WHERE id_equipo = ? AND hora_fin IS NULL
+    crear_indice(cursor, "historial", "idx_historial_equipo_abierto", ["id_equipo", "hora_fin"])
+
+    # Matrícula vigente: matriculas WHERE id_estudiante = ? AND estado = 'Estudiante'
+    crear_indice(cursor, "matriculas", "idx_matriculas_estudiante_estado", ["id_estudiante", "estado"])
+
+    # Asistencias de un grupo: asistencias WHERE id_matricula IN (...) AND fecha BETWEEN ...
+    crear_indice(cursor, "asistencias", "idx_asistencias_matricula_fecha", ["id_matricula", "fecha"])
+
+
+def _m002_columnas_encoding_rostro(cursor):
+    # Encoding precalculado del rostro (las bases nuevas ya lo traen en database.sql)
+    for tabla in ("estudiantes", "docentes"):
+        agregar_columna(cursor, tabla, "encoding_rostro", "BLOB")
+        agregar_columna(cursor, tabla, "version_encoding", "VARCHAR(20)")
+
+
+def _m003_matricula_actual(cursor):
+    # Puntero a la matrícula vigente; lo mantiene estudiantes.registrar_matricula()
+    agregar_columna(cursor, "estudiantes", "id_matricula_actual", "VARCHAR(50)")
+    crear_indice(cursor, "estudiantes", "idx_estudiantes_matricula_actual", ["id_matricula_actual"])
+
+    # Estudiantes activos de un grado: matriculas WHERE grado = ? AND estado = 'Estudiante'
+    crear_indice(cursor, "matriculas", "idx_matriculas_grado_estado", ["grado", "estado"])
+
+    # Una base SQLite se crea vacía desde database.sql: no hay datos que completar
+    if motor_actual() == "sqlite":
+        return
+
+    # Completa el puntero de los estudiantes existentes con su última matrícula
+    cursor.execute("""
+        UPDATE estudiantes e
+        SET e.id_matricula_actual = (
+            SELECT m.id_matricula FROM matriculas m
+            WHERE m.id_estudiante = e.id_estudiante
+            ORDER BY CAST(SUBSTRING_INDEX(m.id_matricula, '-', -1) AS UNSIGNED) DESC
+            LIMIT 1
+        )
+        WHERE e.id_matricula_actual IS NULL
+    """)
+
+
+def _m004_asistencia_unica_por_dia(cursor):
+    # Si hubo registros repetidos del mismo día, conserva uno (presente si alguno lo era).
+    # Una base SQLite se crea vacía desde database.sql: no hay repetidos que unir
+    if motor_actual() != "sqlite":
+        cursor.execute("""
+            UPDATE asistencias a1
+            INNER JOIN asistencias a2
+                ON a2.id_matricula = a1.id_matricula AND a2.fecha = a1.fecha
+                AND a2.id_asistencia > a1.id_asistencia AND a2.estado = 'presente'
+            SET a1.estado = 'presente'
+        """)
+        cursor.execute("""
+            DELETE a2 FROM asistencias a1
+            INNER JOIN asistencias a2
+                ON a2.id_matricula = a1.id_matricula AND a2.fecha = a1.fecha
+                AND a2.id_asistencia > a1.id_asistencia
+        """)
+
+    # Una asistencia por matrícula y día (permite INSERT ... ON DUPLICATE KEY UPDATE)
+    crear_indice(cursor, "asistencias", "uq_asistencias_matricula_fecha", ["id_matricula", "fecha"], unico=True)
+
+    # Uso de equipos por día: historial WHERE id_matricula = ? AND fecha = ?
+    crear_indice(cursor, "historial", "idx_historial_matricula_fecha", ["id_matricula", "fecha"])
+
+
+def _m005_indices_paginacion_historial(cursor):
+    # Paginación por clave de las pantallas de historial: cada página sigue el
+    # índice desde la última fila en lugar de ordenar toda la tabla.
+    # (DESC se respeta en MySQL 8 y SQLite; versiones anteriores lo ignoran)
+    crear_indice(cursor, "historial", "idx_historial_orden", ["fecha DESC", "hora_inicio", "id_historial"])
+    crear_indice(cursor, "historial_equipos", "idx_historial_equipos_orden", ["fecha", "hora", "id_historial_equipo"])
+    crear_indice(cursor, "incidentes", "idx_incidentes_orden", ["fecha", "id_incidente"])
+
+
+# Lista ordenada de (versión, descripción, función)
+MIGRACIONES = [
+    (1, "Índices compuestos para las consultas frecuentes", _m001_indices_consultas_frecuentes),
+    (2, "Columnas encoding_rostro y version_encoding", _m002_columnas_encoding_rostro),
+    (3, "Matrícula vigente materializada en estudiantes", _m003_matricula_actual),
+    (4, "Asistencia única por matrícula y día", _m004_asistencia_unica_por_dia),
+    (5, "Índices para paginar el historial", _m005_indices_paginacion_historial),
+]
+
+
+
+# ----------------------------------------------------
+# Ejecutor
+# ----------------------------------------------------
+def versiones_aplicadas(cursor):
+    """Retorna el conjunto de versiones ya registradas en schema_migraciones."""
+    cursor.execute("SELECT version FROM schema_migraciones")
+    return {row["version"] for row in cursor.fetchall()}
+
+
+def aplicar_migraciones():
+    """
+    Aplica las migraciones pendientes en orden y registra cada una.
+    Retorna la lista de versiones aplicadas en esta ejecución.
+    Si una falla, se detiene ahí (las siguientes pueden depender de ella).
+    """
+    conexion = crear_conexion()
+    if not conexion:
+        return []
+
+    aplicadas = []
+    cursor = conexion.cursor()
+    try:
+        # Tabla de control de versiones
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migraciones (
+                version INT PRIMARY KEY,
+                descripcion VARCHAR(200) NOT NULL,
+                aplicada_en DATETIME NOT NULL
+            )
+        """)
+        conexion.commit()
+
+        ya_aplicadas = versiones_aplicadas(cursor)
+
+        for version, descripcion, funcion in MIGRACIONES:
+            if version in ya_aplicadas:
+                continue
+
+            try:
+                funcion(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migraciones (version, descripcion, aplicada_en) VALUES (%s, %s, NOW())",
+                    (version, descripcion)
+                )
+                conexion.commit()
+                aplicadas.append(version)
+                print(f"🛠 Migración {version} aplicada: {descripcion}")
+
+            except Exception as e:
+                conexion.rollback()
+                print(f"❌ Error en la migración {version} ({descripcion}): {e}")
+                break
+
+    except Exception as e:
+        print(f"❌ Error al aplicar migraciones: {e}")
+
+    finally:
+        cursor.close()
+        cerrar_conexion(conexion)
+
+    return aplicadas
@@ -0,0 +1,286 @@
+# modules/motor_sqlite.py
+# Motor SQLite para modules.conexion.
+# Permite ejecutar los módulos de lógica (asignar_equipo, buscar_historial...)
+# sin un servidor MySQL: la conexión y el cursor imitan la interfaz de PyMySQL
+# que usa el código (DictCursor, %s, commit/rollback, ping, errores de
+# pymysql) y modules.dialecto traduce las funciones y la sintaxis de MySQL.
+# Pensado para pruebas de rendimiento reproducibles sobre una base en
+# memoria creada desde data/database.sql.
+
+# Base de datos embebida
+import sqlite3
+
+# Rutas del esquema
+import os
+
+# Conversión de fechas y horas entre Python y SQLite
+from datetime import date, time, datetime, timedelta
+
+# Errores de PyMySQL: el código de lógica captura estos (pymysql.MySQLError...)
+from pymysql import err as errores_mysql
+
+# Funciones de MySQL y traducción de sentencias
+from modules.dialecto import registrar_funciones_mysql, traducir_sql, traducir_ddl, sentencias_script
+
+
+# Esquema con el que se crea la base
+RUTA_ESQUEMA = os.path.join(os.path.dirname(__file__), "..", "..", "data", "database.sql")
+
+# URI de la base en memoria compartida por todas las conexiones del pool
+URI_MEMORIA = "file:control_acceso?mode=memory&cache=shared"
+
+
+
+# ----------------------------------------------------
+# Tipos: se guardan como texto ISO y se leen como los entrega PyMySQL
+# (DATE -> date, TIME -> timedelta, DATETIME -> datetime)
+# ----------------------------------------------------
+def _hora_como_texto(valor):
+    segundos = int(valor.total_seconds())
+    return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+
+
+def _leer_hora(valor):
+    horas, minutos, segundos = (int(float(p)) for p in valor.decode().split(":"))
+    return timedelta(hours=horas, minutes=minutos, seconds=segundos)
+
+
+sqlite3.register_adapter(date, lambda valor: valor.isoformat())
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(sep=" ", timespec="seconds"))
+sqlite3.register_adapter(time, lambda valor: valor.isoformat(timespec="seconds"))
+sqlite3.register_adapter(timedelta, _hora_como_texto)
+sqlite3.register_converter("DATE", lambda valor: date.fromisoformat(valor.decode()))
+sqlite3.register_converter("DATETIME", lambda valor: datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter("TIME", _leer_hora)
+
+
+
+def _error_mysql(e):
+    """Convierte un error de sqlite3 en el error equivalente de PyMySQL."""
+    mensaje = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        clase = errores_mysql.IntegrityError
+    elif isinstance(e, sqlite3.OperationalError) and ("syntax error" in mensaje or "no such" in mensaje):
+        clase = errores_mysql.ProgrammingError
+    elif isinstance(e, sqlite3.OperationalError):
+        clase = errores_mysql.OperationalError
+    elif isinstance(e, (sqlite3.ProgrammingError, sqlite3.InterfaceError)):
+        clase = errores_mysql.ProgrammingError
+    else:
+        clase = errores_mysql.DatabaseError
+    return clase(0, mensaje)
+
+
+def _fila_como_dict(cursor, fila):
+    # Igual que DictCursor: { nombre de columna: valor }
+    return {columna[0]: valor for columna, valor in zip(cursor.description, fila)}
+
+
+
+# ============================================================
+# 🔹 CLASE: CursorSQLite
+# ------------------------------------------------------------
+# Cursor con la interfaz de un DictCursor de PyMySQL.
+# ============================================================
+class CursorSQLite:
+    def __init__(self, conexion):
+        self._conexion = conexion
+        self._cursor = conexion._sqlite.cursor()
+        self._cursor.row_factory = _fila_como_dict
+
+
+    def execute(self, sql, args=None):
+        sql, bloquea = traducir_sql(sql, args is not None)
+        try:
+            # FOR UPDATE: se toma el bloqueo de escritura al inicio de la transacción
+            if bloquea and not self._conexion._sqlite.in_transaction:
+                self._cursor.execute("BEGIN IMMEDIATE")
+            self._cursor.execute(sql, tuple(args) if args is not None else ())
+        except sqlite3.Error as e:
+            raise _error_mysql(e) from e
+        return self._cursor.rowcount
+
+
+    def executemany(self, sql, args):
+        sql, _ = traducir_sql(sql, True)
+        try:
+            self._cursor.executemany(sql, [tuple(fila) for fila in args])
+        except sqlite3.Error as e:
+            raise _error_mysql(e) from e
+        return self._cursor.rowcount
+
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+
+    def close(self):
+        self._cursor.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+
+# ============================================================
+# 🔹 CLASE: ConexionSQLite
+# ------------------------------------------------------------
+# Conexión con la interfaz de PyMySQL que usan PoolConexiones
+# y los módulos de lógica.
+# ============================================================
+class ConexionSQLite:
+    def __init__(self, conexion_sqlite):
+        self._sqlite = conexion_sqlite
+
+
+    def cursor(self, clase=None):
+        # Todos los cursores devuelven diccionarios (CONFIG_BD usa DictCursor)
+        return CursorSQLite(self)
+
+
+    def commit(self):
+        try:
+            self._sqlite.commit()
+        except sqlite3.Error as e:
+            raise _error_mysql(e) from e
+
+
+    def rollback(self):
+        self._sqlite.rollback()
+
+
+    def ping(self, reconnect=False):
+        try:
+            self._sqlite.execute("SELECT 1")
+        except sqlite3.Error as e:
+            raise _error_mysql(e) from e
+
+
+    @property
+    def open(self):
+        try:
+            self._sqlite.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+
+    def close(self):
+        self._sqlite.close()
+
+
+
+# ============================================================
+# 🔹 CLASE: BaseSQLite
+# ------------------------------------------------------------
+# Abre conexiones a la base SQLite configurada. La base en
+# memoria vive mientras haya una conexión abierta, así que se
+# conserva una conexión "ancla" durante todo el proceso.
+# ============================================================
+class BaseSQLite:
+    # Conexión que mantiene viva la base en memoria
+    _ancla = None
+
+
+    @classmethod
+    def abrir(cls, ruta=":memory:"):
+        """Abre una conexión (ConexionSQLite). ruta=':memory:' usa la base compartida en memoria."""
+        en_memoria = ruta == ":memory:"
+        try:
+            conexion = sqlite3.connect(
+                URI_MEMORIA if en_memoria else ruta,
+                uri=en_memoria,
+                timeout=10,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                # El pool presta las conexiones a distintos hilos (una a la vez)
+                check_same_thread=False
+            )
+            conexion.execute("PRAGMA foreign_keys = ON")
+            if en_memoria:
+                if cls._ancla is None:
+                    cls._ancla = sqlite3.connect(URI_MEMORIA, uri=True, check_same_thread=False)
+            else:
+                conexion.execute("PRAGMA journal_mode = WAL")
+            registrar_funciones_mysql(conexion)
+        except sqlite3.Error as e:
+            raise errores_mysql.OperationalError(0, f"No se pudo abrir SQLite ({ruta}): {e}") from e
+        return ConexionSQLite(conexion)
+
+
+    @classmethod
+    def crear_esquema(cls, conexion, ruta_esquema=RUTA_ESQUEMA):
+        """Crea las tablas de data/database.sql (traducidas a SQLite) si no existen."""
+        with open(ruta_esquema, encoding="utf-8") as f:
+            script = f.read()
+
+        cursor = conexion.cursor()
+        try:
+            for sentencia in sentencias_script(script):
+                for traducida in traducir_ddl(sentencia):
+                    cursor.execute(traducida)
+            conexion.commit()
+        finally:
+            cursor.close()
+
+
+    @classmethod
+    def liberar(cls):
+        """Cierra la conexión ancla (la base en memoria se descarta)."""
+        if cls._ancla is not None:
+            cls._ancla.close()
+            cls._ancla = None
+
+
+
+# ----------------------------------------------------
+# Preparar una base SQLite lista para usar
+# ----------------------------------------------------
+def preparar_base_sqlite(ruta=":memory:", ruta_esquema=RUTA_ESQUEMA):
+    """
+    Cambia modules.conexion al motor SQLite, crea el esquema de
+    data/database.sql y aplica las migraciones (índices incluidos), para que
+    las pruebas midan las mismas consultas que en producción.
+    """
+    # Se importan aquí: conexion carga este módulo solo al usar SQLite
+    from modules.conexion import usar_motor, crear_conexion, cerrar_conexion
+    from modules.migraciones import aplicar_migraciones
+
+    usar_motor("sqlite", ruta)
+
+    conexion = crear_conexion()
+    if not conexion:
+        raise RuntimeError(f"No se pudo abrir la base SQLite: {ruta}")
+    try:
+        BaseSQLite.crear_esquema(conexion, ruta_esquema)
+    finally:
+        cerrar_conexion(conexion)
+
+    aplicar_migraciones()
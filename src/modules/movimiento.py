@@ -0,0 +1,115 @@
+# modules/movimiento.py
+# Detección de movimiento barata para no correr la detección de rostros
+# sobre una escena quieta. Cada frame se reduce a una miniatura en escala de
+# grises y se compara con un fondo que se actualiza lentamente; solo si
+# cambió una fracción suficiente de píxeles se deja pasar el frame al
+# reconocimiento (face_recognition.face_locations es lo más costoso).
+
+# Manejo de tiempos (chequeo forzado periódico)
+import time
+
+# Librería para operaciones numéricas y manejo de arreglos
+import numpy as np
+
+# OpenCV para reducir, desenfocar y comparar las miniaturas
+import cv2
+
+
+# Tamaño de la miniatura (ancho, alto) sobre la que se mide el movimiento
+TAMANO_MINIATURA = (64, 48)
+
+# Diferencia de intensidad (0-255) a partir de la cual un píxel "cambió"
+UMBRAL_PIXEL = 18
+
+# Fracción de píxeles cambiados que se considera movimiento
+UMBRAL_FRACCION = 0.01
+
+# Velocidad con la que el fondo absorbe los cambios (0-1)
+APRENDIZAJE_FONDO = 0.05
+
+# Aunque no haya movimiento, se deja pasar un frame cada estos segundos
+FORZAR_CADA = 2.0
+
+
+
+# ============================================================
+# 🔹 CLASE: DetectorMovimiento
+# ------------------------------------------------------------
+# hay_movimiento(frame) decide si el frame merece ser analizado.
+# Lleva la cuenta de frames evaluados y disparados para mostrar
+# la tasa de disparo (cuánto trabajo de detección se ahorra).
+# ============================================================
+class DetectorMovimiento:
+    def __init__(self, umbral_pixel=UMBRAL_PIXEL, umbral_fraccion=UMBRAL_FRACCION,
+                 aprendizaje=APRENDIZAJE_FONDO, forzar_cada=FORZAR_CADA):
+        self.umbral_pixel = umbral_pixel
+        self.umbral_fraccion = umbral_fraccion
+        self.aprendizaje = aprendizaje
+        self.forzar_cada = forzar_cada
+
+        # Fondo acumulado (float32) de la miniatura
+        self._fondo = None
+
+        # Instante del último frame que se dejó pasar
+        self._ultimo_disparo = 0.0
+
+        # Estadísticas
+        self.evaluados = 0
+        self.disparados = 0
+
+        # Fracción de píxeles cambiados en el último frame evaluado
+        self.ultima_fraccion = 0.0
+
+
+    def reiniciar(self):
+        """Olvida el fondo (el siguiente frame se considera movimiento)."""
+        self._fondo = None
+
+
+    def hay_movimiento(self, frame):
+        """True si el frame (BGR o RGB) cambió respecto del fondo o toca un chequeo forzado."""
+        self.evaluados += 1
+
+        # Miniatura en escala de grises, desenfocada para ignorar el ruido del sensor
+        gris = cv2.cvtColor(cv2.resize(frame, TAMANO_MINIATURA, interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+        gris = cv2.GaussianBlur(gris, (5, 5), 0).astype(np.float32)
+
+        if self._fondo is None:
+            # Primer frame: se toma como fondo y se analiza
+            self._fondo = gris
+            self.ultima_fraccion = 1.0
+            return self._disparar()
+
+        diferencia = cv2.absdiff(gris, self._fondo)
+        self.ultima_fraccion = float(np.count_nonzero(diferencia > self.umbral_pixel)) / diferencia.size
+
+        # El fondo se adapta de a poco a cambios de luz y objetos que se quedan quietos
+        cv2.accumulateWeighted(gris, self._fondo, self.aprendizaje)
+
+        if self.ultima_fraccion >= self.umbral_fraccion:
+            return self._disparar()
+
+        # Chequeo periódico para no perder a alguien que llegó muy despacio
+        if time.monotonic() - self._ultimo_disparo >= self.forzar_cada:
+            return self._disparar()
+
+        return False
+
+
+    def _disparar(self):
+        self.disparados += 1
+        self._ultimo_disparo = time.monotonic()
+        return True
+
+
+    def tasa_disparo(self):
+        """Fracción (0-1) de frames evaluados que pasaron a la detección de rostros."""
+        if self.evaluados == 0:
+            return 0.0
+        return self.disparados / self.evaluados
+
+
+    def texto_estadisticas(self):
+        """Resumen legible de la tasa de disparo (para etiquetas o la consola)."""
+        return f"Movimiento: {self.tasa_disparo() * 100:.0f}% de {self.evaluados} frames analizados"
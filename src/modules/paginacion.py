@@ -0,0 +1,89 @@
+# modules/paginacion.py
+# Utilidades para consultar tablas grandes (historial, incidentes...) sin
+# traer todo el resultado a memoria.
+# - Paginación por clave (keyset): cada página continúa después de la última
+#   fila de la anterior usando las columnas del ORDER BY, así que pedir la
+#   página 500 cuesta lo mismo que la primera (a diferencia de OFFSET).
+# - Recorrido con cursor sin buffer (SSDictCursor): las filas llegan del
+#   servidor por lotes mientras se procesan.
+#
+# columnas de orden: lista de (expresión SQL, alias en el SELECT, "ASC" | "DESC").
+# La última columna debe ser única (el id) para que el orden sea total.
+
+# Cursores de PyMySQL (SSDictCursor = sin buffer)
+import pymysql
+
+# Importa las funciones para conectar y cerrar la base de datos
+from modules.conexion import crear_conexion, cerrar_conexion
+
+
+# Filas por página en las pantallas de historial
+TAMANO_PAGINA = 200
+
+# Filas que se piden al servidor en cada lote del recorrido sin buffer
+TAMANO_LOTE = 500
+
+
+
+def orden_sql(columnas):
+    """Cláusula ORDER BY (sin la palabra ORDER BY) para las columnas de orden."""
+    return ", ".join(f"{expresion} {direccion}" for expresion, _, direccion in columnas)
+
+
+def condicion_despues_de(columnas, clave):
+    """
+    Condición que deja solo las filas posteriores a clave (valores de la última
+    fila de la página anterior) según el orden de columnas. Admite columnas
+    con distinto sentido. Retorna (sql, valores).
+    """
+    partes, valores = [], []
+    for i, (expresion, _, direccion) in enumerate(columnas):
+        comparacion = "<" if direccion.upper() == "DESC" else ">"
+        iguales = [f"{columnas[j][0]} = %s" for j in range(i)]
+        partes.append("(" + " AND ".join(iguales + [f"{expresion} {comparacion} %s"]) + ")")
+        valores.extend(clave[:i])
+        valores.append(clave[i])
+    return "(" + " OR ".join(partes) + ")", valores
+
+
+def clave_de_fila(columnas, fila):
+    """Valores de las columnas de orden de una fila (dict de DictCursor)."""
+    return tuple(fila[alias] for _, alias, _ in columnas)
+
+
+def siguiente_pagina(columnas, filas, limite, cantidad=None):
+    """
+    Clave para pedir la página siguiente, o None si esta fue la última.
+    Una página incompleta significa que no quedan más filas. cantidad es el
+    número de registros paginados cuando un JOIN repite filas (por defecto len(filas)).
+    """
+    if cantidad is None:
+        cantidad = len(filas)
+    if not filas or cantidad < limite:
+        return None
+    return clave_de_fila(columnas, filas[-1])
+
+
+
+def recorrer_consulta(query, valores=(), tamano_lote=TAMANO_LOTE):
+    """
+    Generador que entrega las filas (dicts) de la consulta con un cursor sin
+    buffer. La conexión queda ocupada hasta terminar (o descartar) el recorrido.
+    """
+    conexion = crear_conexion()
+    if not conexion:
+        print("❌ No se pudo establecer la conexión con la base de datos.")
+        return
+
+    cursor = conexion.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(query, valores)
+        while True:
+            filas = cursor.fetchmany(tamano_lote)
+            if not filas:
+                break
+            yield from filas
+    finally:
+        # Cerrar un SSCursor descarta lo que quede pendiente en el servidor
+        cursor.close()
+        cerrar_conexion(conexion)
@@ -0,0 +1,108 @@
+# modules/planificador.py
+# Planificador adaptativo de la detección de rostros.
+# Reemplaza las constantes fijas de "analizar cada N frames": mide cuánto
+# tarda realmente cada análisis en este equipo y cuántos rostros hay en
+# escena, y con eso decide cada cuánto conviene enviar un frame al hilo de
+# reconocimiento para respetar un presupuesto de CPU y una latencia máxima
+# de reconocimiento. Todas las ventanas de cámara comparten la misma
+# instancia (la latencia medida es propiedad del equipo, no de la ventana).
+
+# Manejo de tiempos
+import time
+
+# Lock para registrar mediciones desde cualquier hilo
+import threading
+
+
+# Fracción de un núcleo que puede ocupar el reconocimiento (0-1)
+PRESUPUESTO_CPU = 0.5
+
+# Tiempo máximo deseado (s) entre que alguien aparece y es reconocido
+LATENCIA_OBJETIVO = 1.0
+
+# Intervalo mínimo entre análisis (s); no tiene sentido ir más rápido que la cámara
+INTERVALO_MINIMO = 0.03
+
+# Peso de cada medición nueva en el promedio móvil exponencial
+SUAVIZADO = 0.2
+
+# Latencia supuesta antes de tener mediciones (s)
+LATENCIA_INICIAL = 0.15
+
+
+
+# ============================================================
+# 🔹 CLASE: PlanificadorDeteccion
+# ------------------------------------------------------------
+# Uso desde una ventana:
+#   if planificador.toca_detectar(): ... enviar_frame ...; planificador.marcar_envio()
+#   en el slot del resultado: planificador.registrar(duracion, rostros)
+# ============================================================
+class PlanificadorDeteccion:
+    # Instancia compartida por todas las ventanas
+    _compartido = None
+
+
+    def __init__(self, presupuesto_cpu=PRESUPUESTO_CPU, latencia_objetivo=LATENCIA_OBJETIVO,
+                 intervalo_minimo=INTERVALO_MINIMO):
+        self.presupuesto_cpu = presupuesto_cpu
+        self.latencia_objetivo = latencia_objetivo
+        self.intervalo_minimo = intervalo_minimo
+
+        # Promedios móviles de la duración del análisis y de los rostros por análisis
+        self.latencia = LATENCIA_INICIAL
+        self.rostros = 0.0
+
+        # Instante del último frame enviado a analizar
+        self._ultimo_envio = 0.0
+
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def compartido(cls):
+        """Retorna la instancia compartida (se crea la primera vez)."""
+        if cls._compartido is None:
+            cls._compartido = cls()
+        return cls._compartido
+
+
+    def registrar(self, duracion, rostros=0):
+        """Agrega la medición de un análisis terminado (segundos y rostros encontrados)."""
+        with self._lock:
+            self.latencia += SUAVIZADO * (duracion - self.latencia)
+            self.rostros += SUAVIZADO * (rostros - self.rostros)
+
+
+    def intervalo(self):
+        """Segundos que deben pasar entre dos análisis según las mediciones recientes."""
+        with self._lock:
+            latencia = self.latencia
+            rostros = self.rostros
+
+        # Presupuesto de CPU: analizar L segundos cada L / presupuesto segundos
+        intervalo = latencia / self.presupuesto_cpu
+
+        # Sin rostros en escena se puede esperar más, siempre dentro de la latencia objetivo
+        if rostros < 0.5:
+            intervalo *= 2
+
+        # Latencia objetivo: espera + análisis no debe superar el objetivo
+        maximo = max(self.intervalo_minimo, self.latencia_objetivo - latencia)
+        return min(max(intervalo, self.intervalo_minimo), maximo)
+
+
+    def toca_detectar(self):
+        """True si ya pasó el intervalo desde el último envío."""
+        return time.monotonic() - self._ultimo_envio >= self.intervalo()
+
+
+    def marcar_envio(self):
+        """Registra que se envió un frame a analizar."""
+        self._ultimo_envio = time.monotonic()
+
+
+    def texto_estadisticas(self):
+        """Resumen legible del estado del planificador (para la consola)."""
+        return (f"Análisis: {self.latencia * 1000:.0f} ms promedio, "
+                f"{self.rostros:.1f} rostros, cada {self.intervalo() * 1000:.0f} ms")
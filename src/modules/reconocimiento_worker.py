@@ -0,0 +1,111 @@
+# modules/reconocimiento_worker.py
+# Hilo de trabajo para el reconocimiento facial.
+# Las ventanas de cámara muestran el video en el hilo de la interfaz y le
+# entregan los frames a este hilo; la detección y los encodings corren aquí
+# y el resultado vuelve a la interfaz por una señal de Qt.
+# La cola tiene un solo lugar: si llega un frame nuevo mientras el anterior
+# espera, el anterior se descarta (siempre se procesa el más reciente).
+
+# Manejo de tiempos para medir la duración de cada análisis
+import time
+
+# Condición para esperar frames sin consumir CPU
+import threading
+
+# Clases base de Qt para hilos y señales
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+
+# ============================================================
+# 🔹 CLASE: TrabajadorReconocimiento
+# ------------------------------------------------------------
+# Recibe una función procesar(frame) -> resultado que se ejecuta
+# fuera del hilo de la interfaz. Emite resultado_listo(resultado,
+# segundos) cada vez que termina de analizar un frame.
+# ============================================================
+class TrabajadorReconocimiento(QThread):
+    # Señal con el resultado del análisis y la duración en segundos
+    resultado_listo = pyqtSignal(object, float)
+
+    # Señal emitida si la función de análisis lanza una excepción
+    error = pyqtSignal(str)
+
+
+    def __init__(self, procesar, parent=None):
+        # Inicializa la clase base QThread
+        super().__init__(parent)
+
+        # Función que analiza un frame (se ejecuta en este hilo)
+        self.procesar = procesar
+
+        # Frame pendiente (solo se guarda el más reciente)
+        self._frame = None
+
+        # Indica si el hilo está analizando un frame en este momento
+        self._ocupado = False
+
+        # Bandera para terminar el ciclo del hilo
+        self._detener = False
+
+        # Cantidad de frames descartados porque llegó uno más nuevo
+        self.descartados = 0
+
+        # Condición que protege el frame pendiente y despierta al hilo
+        self._cond = threading.Condition()
+
+
+    def enviar_frame(self, frame):
+        """
+        Deja el frame para analizar. Si había uno esperando, lo reemplaza.
+        Nunca bloquea el hilo de la interfaz.
+        """
+        with self._cond:
+            if self._frame is not None:
+                self.descartados += 1
+            self._frame = frame
+            self._cond.notify()
+
+
+    def ocupado(self):
+        """True si hay un análisis en curso o un frame esperando."""
+        with self._cond:
+            return self._ocupado or self._frame is not None
+
+
+    def detener(self):
+        """Termina el hilo y espera a que finalice el análisis en curso."""
+        with self._cond:
+            self._detener = True
+            self._frame = None
+            self._cond.notify()
+        self.wait()
+
+
+    def run(self):
+        while True:
+            # Espera hasta que haya un frame nuevo o se pida detener
+            with self._cond:
+                while self._frame is None and not self._detener:
+                    self._cond.wait()
+                if self._detener:
+                    return
+                frame = self._frame
+                self._frame = None
+                self._ocupado = True
+
+            inicio = time.perf_counter()
+            try:
+                resultado = self.procesar(frame)
+            except Exception as e:
+                self.error.emit(str(e))
+                resultado = None
+            duracion = time.perf_counter() - inicio
+
+            with self._cond:
+                self._ocupado = False
+                if self._detener:
+                    return
+
+            if resultado is not None:
+                self.resultado_listo.emit(resultado, duracion)
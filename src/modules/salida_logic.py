@@ -1,6 +1,3 @@
-# Importa NumPy para manipular bytes de imagen como arreglos
-import numpy as np
-
 # Importa OpenCV para decodificar y transformar imágenes
 import cv2
 
@@ -16,6 +13,20 @@ from modules.conexion import crear_conexion, cerrar_conexion
 # Importa PyMySQL para cursores tipo diccionario
 import pymysql
 
+# Importa la galería vectorizada para comparar rostros
+from modules.matcher import asegurar_galeria
+
+# Seguimiento de rostros entre análisis
+from modules.seguimiento import identificar_con_seguimiento
+
+# Importa el cache persistente de encodings faciales
+from modules.cache_embeddings import (
+    clave_estudiante, guardar_cache, guardar_encodings_en_bd, cargar_fotos_faltantes
+)
+
+# Importa la construcción de la galería en paralelo para arranques en frío
+from modules.galeria_paralela import encodings_para_filas
+
 
 # ----------------------------------------------------
 # Cargar estudiantes con equipos ocupados (última matrícula activa)
@@ -33,7 +44,8 @@ def cargar_estudiantes():
     # Consulta estudiantes con matrícula activa y equipo actualmente ocupado
     cursor.execute(
         """
-        SELECT e.id_estudiante, e.nombres, e.apellidos, e.foto_rostro
+        SELECT e.id_estudiante, e.nombres, e.apellidos,
+               e.encoding_rostro, e.version_encoding
         FROM estudiantes e
         INNER JOIN matriculas m ON e.id_estudiante = m.id_estudiante
         INNER JOIN historial h ON h.id_matricula = m.id_matricula
@@ -46,41 +58,38 @@ def cargar_estudiantes():
 
     # Lista donde se almacenarán los estudiantes listos para reconocimiento facial
     estudiantes = []
-    try:
-        for row in cursor.fetchall():
-            # Obtiene la foto del rostro almacenada como blob
-            foto_blob = row["foto_rostro"]
-            if foto_blob is None:
-                continue
-
 
-            # Convierte los bytes de imagen en un arreglo NumPy
-            np_arr = np.frombuffer(foto_blob, np.uint8)
-
-            # Decodifica la imagen desde el blob
-            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-            if img is None:
-                continue
+    try:
+        filas = cursor.fetchall()
 
+        # La foto solo se trae de quienes no tienen un encoding vigente
+        cargar_fotos_faltantes(conexion, "estudiantes", "id_estudiante", filas)
 
-            # Convierte la imagen a RGB para face_recognition
-            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # Usa el encoding guardado en la inscripción o el cache local; las fotos
+        # que falten se codifican en paralelo en un pool de procesos
+        encodings_por_id, pendientes = encodings_para_filas(filas, "id_estudiante", clave_estudiante)
 
-            # Extrae los encodings faciales de la imagen
-            encodings = face_recognition.face_encodings(rgb)
-            if len(encodings) > 0:
+        for row in filas:
+            encodings = encodings_por_id.get(row["id_estudiante"])
+            if encodings:
                 # Si se detectó al menos un rostro, guarda el primer encoding
                 estudiantes.append({
                     "id": row["id_estudiante"],
                     "nombre": f"{row['nombres']} {row['apellidos']}",
                     "encoding": encodings[0]
                 })
+
+        # Guarda en la BD los encodings que tuvieron que recalcularse
+        guardar_encodings_en_bd(conexion, "estudiantes", "id_estudiante", pendientes)
     finally:
         # Cierra cursor y conexión al finalizar
         cursor.close()
         cerrar_conexion(conexion)
 
 
+    # Persiste en disco los encodings nuevos o actualizados
+    guardar_cache()
+
     # Retorna la lista de estudiantes reconocibles
     return estudiantes
 
@@ -89,10 +98,17 @@ def cargar_estudiantes():
 # ----------------------------------------------------
 # Buscar estudiantes reconocidos en el frame
 # ----------------------------------------------------
-def buscar_estudiantes_en_frame(frame, estudiantes_conocidos, max_faces=2, tolerance=0.40):
+def analizar_frame(frame, estudiantes_conocidos, max_faces=2, tolerance=0.40, seguidor=None):
+    """
+    Detecta y reconoce los rostros del frame. Retorna (encontrados, rostros):
+    los estudiantes reconocidos y la cantidad de rostros detectados (reconocidos o no).
+    """
+    # Acepta la lista de estudiantes o una GaleriaRostros ya construida
+    galeria = asegurar_galeria(estudiantes_conocidos)
+
     # Si no hay estudiantes conocidos cargados, no procesa nada
-    if not estudiantes_conocidos:
-        return []
+    if not len(galeria):
+        return [], 0
 
 
     # Reduce el tamaño del frame para acelerar el reconocimiento facial
@@ -105,33 +121,33 @@ def buscar_estudiantes_en_frame(frame, estudiantes_conocidos, max_faces=2, toler
     # Detecta ubicaciones de rostros en el frame
     locations = face_recognition.face_locations(rgb_small, model="hog")
     if not locations:
-        return []
+        return [], 0
 
 
     # Limita la cantidad de rostros procesados al máximo permitido
     locations = locations[:max_faces]
 
-    # Genera encodings de los rostros detectados
-    encodings = face_recognition.face_encodings(rgb_small, locations)
+    # Con seguidor, solo se codifican los rostros que no se venían siguiendo
+    if seguidor is not None:
+        reconocidos = identificar_con_seguimiento(seguidor, galeria, rgb_small, locations, tolerance)
+    else:
+        # Genera encodings de los rostros detectados
+        encodings = face_recognition.face_encodings(rgb_small, locations)
 
-    # Lista de encodings conocidos de estudiantes
-    conocidos_enc = [e["encoding"] for e in estudiantes_conocidos]
+        # Compara todos los rostros contra toda la galería en una sola operación
+        reconocidos = galeria.identificar(encodings, tolerancia=tolerance)
 
+    encontrados = [est for est, _ in reconocidos][:max_faces]
 
-    # Lista de estudiantes encontrados en el frame actual
-    encontrados = []
-    for enc in encodings:
-        # Compara el encoding detectado con todos los conocidos
-        matches = face_recognition.compare_faces(conocidos_enc, enc, tolerance=tolerance)
-        if True in matches:
-            # Toma el primer estudiante que coincida
-            idx = matches.index(True)
-            encontrados.append(estudiantes_conocidos[idx])
-            if len(encontrados) >= max_faces:
-                break
 
+    # Retorna los estudiantes reconocidos y cuántos rostros había en el frame
+    return encontrados, len(locations)
 
-    # Retorna los estudiantes reconocidos en el frame
+
+
+def buscar_estudiantes_en_frame(frame, estudiantes_conocidos, max_faces=2, tolerance=0.40, seguidor=None):
+    # Solo los estudiantes reconocidos (ver analizar_frame)
+    encontrados, _ = analizar_frame(frame, estudiantes_conocidos, max_faces, tolerance, seguidor)
     return encontrados
 
 
@@ -139,9 +155,14 @@ def buscar_estudiantes_en_frame(frame, estudiantes_conocidos, max_faces=2, toler
 # ----------------------------------------------------
 # Registrar salida del estudiante (actualiza historial y libera equipo)
 # ----------------------------------------------------
-def registrar_salida(id_estudiante):
-    # Crea conexión con la base de datos
-    conexion = crear_conexion()
+def registrar_salida(id_estudiante, conexion=None, momento=None):
+    # Si se recibe una conexión (escritor por lotes), el commit y el cierre
+    # quedan a cargo de quien llama; si no, se usa una conexión propia.
+    # momento (datetime) se usa al reproducir el diario local: la salida se
+    # registra con la hora en que ocurrió
+    propia = conexion is None
+    if propia:
+        conexion = crear_conexion()
     if not conexion:
         return None
 
@@ -149,15 +170,20 @@ def registrar_salida(id_estudiante):
     # Crea cursor tipo diccionario
     cursor = conexion.cursor(pymysql.cursors.DictCursor)
     try:
-        # 1) Última matrícula activa
+        # 1) Matrícula vigente y activa
         cursor.execute(
-            "SELECT MAX(id_matricula) AS max_matricula FROM matriculas WHERE id_estudiante = %s AND estado = 'Estudiante'",
+            """
+            SELECT m.id_matricula
+            FROM estudiantes e
+            INNER JOIN matriculas m ON m.id_matricula = e.id_matricula_actual
+            WHERE e.id_estudiante = %s AND m.estado = 'Estudiante'
+            """,
             (id_estudiante,)
         )
         row = cursor.fetchone()
-        matricula = row["max_matricula"] if row else None
-        if not matricula:
+        if not row:
             return None
+        matricula = row["id_matricula"]
 
 
         # 2) Buscar equipo activo
@@ -176,8 +202,8 @@ def registrar_salida(id_estudiante):
 
         # 3) Registrar hora de salida
         cursor.execute(
-            "UPDATE historial SET hora_fin = CURTIME() WHERE id_matricula = %s AND id_equipo = %s AND hora_fin IS NULL",
-            (matricula, id_equipo)
+            "UPDATE historial SET hora_fin = COALESCE(%s, CURTIME()) WHERE id_matricula = %s AND id_equipo = %s AND hora_fin IS NULL",
+            (momento.time() if momento else None, matricula, id_equipo)
         )
 
 
@@ -189,7 +215,8 @@ def registrar_salida(id_estudiante):
 
 
         # Confirma los cambios en base de datos
-        conexion.commit()
+        if propia:
+            conexion.commit()
 
         # Retorna el identificador del equipo liberado
         return id_equipo
@@ -198,7 +225,8 @@ def registrar_salida(id_estudiante):
     finally:
         # Cierra cursor y conexión
         cursor.close()
-        cerrar_conexion(conexion)
+        if propia:
+            cerrar_conexion(conexion)
 
 
 
@@ -262,11 +290,17 @@ def estudiantes_pendientes():
 # ----------------------------------------------------
 # Registrar asistencias cuando todos hayan salido
 # ----------------------------------------------------
-def registrar_asistencia(grado=None):
-    # Crea conexión con la base de datos
-    conexion = crear_conexion()
+def registrar_asistencia(grado=None, conexion=None, momento=None):
+    # Si se recibe una conexión (escritor por lotes), el commit y el cierre
+    # quedan a cargo de quien llama; si no, se usa una conexión propia.
+    # momento (datetime) se usa al reproducir el diario local: la asistencia
+    # es la del día en que se tomó, no la del día en que se envía.
+    # Retorna la cantidad de filas afectadas, o None si no se registró.
+    propia = conexion is None
+    if propia:
+        conexion = crear_conexion()
     if not conexion:
-        return
+        return None
 
 
     # Crea cursor tipo diccionario
@@ -278,54 +312,43 @@ def registrar_asistencia(grado=None):
             cursor.execute("SELECT grado FROM matriculas WHERE estado = 'Estudiante' LIMIT 1")
             row = cursor.fetchone()
             if not row:
-                return
+                return None
             grado = row["grado"]
 
 
-        # 2️⃣ Obtener estudiantes de ese grado
+        # 2️⃣ Registrar en una sola sentencia la asistencia de todo el grado:
+        #    presente si la matrícula usó un equipo hoy, ausente si no.
+        #    Si ya había registro del día, solo se corrige de ausente a presente.
+        fecha_hoy = (momento or datetime.now()).date()
         cursor.execute("""
-            SELECT e.id_estudiante, m.id_matricula
+            INSERT INTO asistencias (id_matricula, fecha, estado)
+            SELECT m.id_matricula, %s,
+                   CASE WHEN EXISTS (
+                       SELECT 1 FROM historial h
+                       WHERE h.id_matricula = m.id_matricula AND h.fecha = %s
+                   ) THEN 'presente' ELSE 'ausente' END
             FROM estudiantes e
-            INNER JOIN matriculas m ON e.id_estudiante = m.id_estudiante
+            INNER JOIN matriculas m ON m.id_matricula = e.id_matricula_actual
             WHERE m.grado = %s AND m.estado = 'Estudiante'
-        """, (grado,))
-        estudiantes = cursor.fetchall()
-
-
-        if not estudiantes:
-            print(f"No hay estudiantes registrados en el grado {grado}")
-            return
-
-
-        # 3️⃣ Obtener matrículas que usaron equipo hoy
-        cursor.execute("""
-            SELECT DISTINCT m.id_matricula
-            FROM historial h
-            INNER JOIN matriculas m ON m.id_matricula = h.id_matricula
-            WHERE DATE(h.hora_inicio) = CURDATE()
-        """)
-        presentes = [row["id_matricula"] for row in cursor.fetchall()]
-
-
-        # 4️⃣ Registrar asistencias
-        fecha_hoy = datetime.now().date()
-        for est in estudiantes:
-            id_matricula = est["id_matricula"]
-
-            # Marca presente si usó equipo hoy; en caso contrario, ausente
-            estado = 'presente' if id_matricula in presentes else 'ausente'
-            cursor.execute("""
-                INSERT INTO asistencias (id_matricula, fecha, estado)
-                VALUES (%s, %s, %s)
-            """, (id_matricula, fecha_hoy, estado))
+            ON DUPLICATE KEY UPDATE
+                estado = IF(VALUES(estado) = 'presente', 'presente', asistencias.estado)
+        """, (fecha_hoy, fecha_hoy, grado))
 
 
         # Guarda todos los registros de asistencia
-        conexion.commit()
-        print(f"Asistencia registrada correctamente para el grado {grado}")
+        if propia:
+            conexion.commit()
+
+        # rowcount es 0 si no hay estudiantes o si la asistencia del día ya estaba completa
+        if cursor.rowcount == 0:
+            print(f"Sin cambios en la asistencia del grado {grado}")
+        else:
+            print(f"Asistencia registrada correctamente para el grado {grado}")
+        return cursor.rowcount
 
 
     finally:
         # Cierra recursos de base de datos
         cursor.close()
-        cerrar_conexion(conexion)
+        if propia:
+            cerrar_conexion(conexion)
@@ -0,0 +1,208 @@
+# modules/seguimiento.py
+# Seguimiento de rostros entre detecciones.
+# Cada rostro detectado se asocia con el del análisis anterior por la
+# superposición de sus cajas (IoU). Mientras la asociación se mantiene, el
+# rostro conserva la identidad ya reconocida y no se vuelve a calcular su
+# encoding ni a comparar contra la galería; solo los rostros nuevos (o los
+# que se perdieron y reaparecen) pasan por el reconocimiento completo.
+# Los rostros ya reconocidos se verifican de nuevo cada cierto número de
+# análisis, y también cuando la caja salta o la pista reaparece: así un
+# estudiante que ocupa el lugar que otro acaba de dejar no hereda su identidad.
+
+# Librería para operaciones numéricas y manejo de arreglos
+import numpy as np
+
+# Librería para reconocimiento facial
+import face_recognition
+
+
+# Superposición mínima para considerar que dos cajas son el mismo rostro
+UMBRAL_IOU = 0.3
+
+# Análisis seguidos sin ver un rostro antes de olvidar su pista
+MAX_PERDIDOS = 3
+
+# Cada cuántos análisis se reintenta reconocer un rostro desconocido
+REINTENTO_DESCONOCIDO = 5
+
+# Cada cuántos análisis se vuelve a verificar un rostro ya reconocido
+REVERIFICAR_IDENTIFICADO = 5
+
+# Superposición con la caja anterior por debajo de la cual se considera un salto
+UMBRAL_SALTO = 0.6
+
+
+
+def iou_cajas(cajas_a, cajas_b):
+    """
+    Matriz (A, B) de IoU entre dos listas de cajas con el formato de
+    face_recognition: (top, right, bottom, left).
+    """
+    a = np.asarray(cajas_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(cajas_b, dtype=np.float32).reshape(-1, 4)
+
+    # Intersección de cada par de cajas
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+    interseccion = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+
+    # Área de cada caja
+    area_a = (a[:, 1] - a[:, 3]) * (a[:, 2] - a[:, 0])
+    area_b = (b[:, 1] - b[:, 3]) * (b[:, 2] - b[:, 0])
+    union = area_a[:, None] + area_b[None, :] - interseccion
+
+    return np.where(union > 0, interseccion / np.maximum(union, 1e-6), 0.0)
+
+
+
+# ============================================================
+# 🔹 CLASE: PistaRostro
+# ------------------------------------------------------------
+# Un rostro seguido entre análisis. identidad es (persona,
+# distancia) cuando ya fue reconocido, o None.
+# ============================================================
+class PistaRostro:
+    def __init__(self, id_pista, caja):
+        self.id = id_pista
+        self.caja = caja
+        self.identidad = None
+
+        # Análisis seguidos en los que no se vio el rostro
+        self.perdidos = 0
+
+        # Análisis desde el último intento fallido de reconocimiento
+        self.desde_intento = 0
+
+        # Indica si ya se intentó reconocer al menos una vez
+        self.intentado = False
+
+        # La caja saltó o la pista reapareció: puede ser otra persona
+        self.verificar = False
+
+
+    def necesita_reconocimiento(self):
+        """
+        True si el rostro es nuevo, es un desconocido al que toca reintentar o
+        es un reconocido al que toca verificar (periódicamente o tras un salto).
+        """
+        if self.identidad is not None:
+            return self.verificar or self.desde_intento >= REVERIFICAR_IDENTIFICADO
+        return not self.intentado or self.desde_intento >= REINTENTO_DESCONOCIDO
+
+
+
+# ============================================================
+# 🔹 CLASE: SeguidorRostros
+# ------------------------------------------------------------
+# Mantiene las pistas activas. Se usa desde un solo hilo (el
+# hilo de reconocimiento de cada ventana).
+# ============================================================
+class SeguidorRostros:
+    def __init__(self, umbral_iou=UMBRAL_IOU, max_perdidos=MAX_PERDIDOS):
+        self.umbral_iou = umbral_iou
+        self.max_perdidos = max_perdidos
+
+        # Pistas activas y contador para asignar ids
+        self.pistas = []
+        self._siguiente_id = 1
+
+        # Estadísticas: rostros reconocidos por completo vs. reutilizados por seguimiento
+        self.reconocidos = 0
+        self.reutilizados = 0
+
+
+    def reiniciar(self):
+        """Olvida todas las pistas (ej. al cambiar la galería)."""
+        self.pistas = []
+
+
+    def actualizar(self, cajas):
+        """
+        Asocia las cajas detectadas con las pistas existentes.
+        Retorna una lista de PistaRostro en el mismo orden que cajas.
+        """
+        resultado = [None] * len(cajas)
+        libres = list(range(len(self.pistas)))
+
+        if cajas and self.pistas:
+            iou = iou_cajas([p.caja for p in self.pistas], cajas)
+
+            # Asociación voraz: primero los pares con mayor superposición
+            pares = np.dstack(np.unravel_index(np.argsort(-iou, axis=None), iou.shape))[0]
+            usadas_p, usadas_c = set(), set()
+            for ip, ic in pares:
+                if iou[ip, ic] < self.umbral_iou:
+                    break
+                if ip in usadas_p or ic in usadas_c:
+                    continue
+                usadas_p.add(ip)
+                usadas_c.add(ic)
+
+                pista = self.pistas[ip]
+                # Un salto de la caja o una pista que se había perdido puede ser otra persona
+                if iou[ip, ic] < UMBRAL_SALTO or pista.perdidos > 0:
+                    pista.verificar = True
+                pista.caja = cajas[ic]
+                pista.perdidos = 0
+                pista.desde_intento += 1
+                resultado[ic] = pista
+            libres = [i for i in libres if i not in usadas_p]
+
+
+        # Pistas no vistas en este análisis
+        for i in libres:
+            self.pistas[i].perdidos += 1
+        self.pistas = [p for p in self.pistas if p.perdidos <= self.max_perdidos]
+
+
+        # Rostros sin pista: se crean pistas nuevas
+        for ic, caja in enumerate(cajas):
+            if resultado[ic] is None:
+                pista = PistaRostro(self._siguiente_id, caja)
+                self._siguiente_id += 1
+                self.pistas.append(pista)
+                resultado[ic] = pista
+
+        return resultado
+
+
+
+def identificar_con_seguimiento(seguidor, galeria, rgb, locations, tolerancia=0.45):
+    """
+    Igual que galeria.identificar() sobre los rostros de locations, pero solo
+    calcula el encoding de los rostros que el seguidor no tiene reconocidos
+    (o que toca verificar). Retorna lista de (persona, distancia) sin personas repetidas.
+    """
+    pistas = seguidor.actualizar(list(locations))
+
+    # Solo los rostros nuevos, desconocidos a reintentar o reconocidos a verificar se codifican
+    por_reconocer = [i for i, p in enumerate(pistas) if p.necesita_reconocimiento()]
+    seguidor.reutilizados += len(pistas) - len(por_reconocer)
+
+    if por_reconocer:
+        encodings = face_recognition.face_encodings(rgb, [locations[i] for i in por_reconocer])
+        seguidor.reconocidos += len(encodings)
+
+        for i, resultado in zip(por_reconocer, galeria.buscar(encodings, tolerancia)):
+            # Si ya no coincide dentro de la tolerancia la identidad se borra;
+            # si coincide con otra persona, la pista pasa a ser de ella
+            pista = pistas[i]
+            pista.identidad = resultado
+            pista.intentado = True
+            pista.desde_intento = 0
+            pista.verificar = False
+
+
+    # Una persona por resultado, con la menor distancia (igual que identificar)
+    mejores = {}
+    for pista in pistas:
+        if pista.identidad is None:
+            continue
+        persona, d = pista.identidad
+        clave = id(persona)
+        if clave not in mejores or d < mejores[clave][1]:
+            mejores[clave] = (persona, d)
+
+    return sorted(mejores.values(), key=lambda r: r[1])
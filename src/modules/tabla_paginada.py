@@ -0,0 +1,109 @@
+# modules/tabla_paginada.py
+# Modelo de tabla con carga perezosa para las pantallas de historial.
+# Los datos se guardan por columnas (una lista de valores por columna) y el
+# texto de cada celda se arma recién cuando la vista la dibuja, así que no se
+# crea ningún objeto por celda. La vista (QTableView) pide la página siguiente
+# con canFetchMore()/fetchMore() al llegar al final con el scroll, usando la
+# clave que devolvió la página anterior (paginación por clave, ver
+# modules/paginacion.py).
+
+# Clases base de Qt para modelos
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+
+# ============================================================
+# 🔹 CLASE: ModeloPaginado
+# ------------------------------------------------------------
+# buscar_pagina(despues_de) -> (filas, siguiente)
+# siguiente es None cuando no quedan más páginas.
+# ============================================================
+class ModeloPaginado(QAbstractTableModel):
+    def __init__(self, encabezados, parent=None):
+        # Inicializa la clase base QAbstractTableModel
+        super().__init__(parent)
+
+        # Títulos de las columnas
+        self.encabezados = list(encabezados)
+
+        # Valores por columna: columnas[c][r] es la celda (r, c)
+        self.columnas = [[] for _ in self.encabezados]
+
+        # Cantidad de filas cargadas
+        self.filas = 0
+
+        # Función que trae una página con los filtros de la búsqueda actual
+        self.buscar_pagina = None
+
+        # Clave de la página siguiente (None = no hay más)
+        self.siguiente = None
+
+
+    def iniciar(self, buscar_pagina, primera_pagina=None):
+        """
+        Descarta los resultados anteriores y carga la primera página. Retorna las filas cargadas.
+        primera_pagina = (filas, siguiente) si ya se consultó en segundo plano.
+        """
+        self.beginResetModel()
+        self.buscar_pagina = buscar_pagina
+        self.siguiente = None
+        self.columnas = [[] for _ in self.encabezados]
+        self.filas = 0
+        self.endResetModel()
+        if primera_pagina is not None:
+            return self._agregar(*primera_pagina)
+        return self._cargar(None)
+
+
+    def _cargar(self, despues_de):
+        return self._agregar(*self.buscar_pagina(despues_de))
+
+
+    def _agregar(self, filas, siguiente):
+        self.siguiente = siguiente
+        if not filas:
+            return 0
+
+        # Avisa a la vista cuántas filas se agregan y las guarda por columnas
+        self.beginInsertRows(QModelIndex(), self.filas, self.filas + len(filas) - 1)
+        for c, columna in enumerate(self.columnas):
+            columna.extend(fila[c] for fila in filas)
+        self.filas += len(filas)
+        self.endInsertRows()
+        return len(filas)
+
+
+    # ---------------------------
+    # Carga perezosa
+    # ---------------------------
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.buscar_pagina is not None and self.siguiente is not None
+
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._cargar(self.siguiente)
+
+
+    # ---------------------------
+    # Interfaz del modelo
+    # ---------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.filas
+
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.encabezados)
+
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        # El texto se arma solo para las celdas visibles
+        return str(self.columnas[index.column()][index.row()])
+
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.encabezados[section]
+        return None
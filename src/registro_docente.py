@@ -25,6 +25,9 @@ from modules.docentes import registrar_docente
 # Importa el control de sesión
 from modules.sesion import Sesion
 
+# Importa la cámara compartida por todas las ventanas
+from modules.camara import ServicioCamara
+
 # Importa validación para comprobar si ya existe un docente administrador
 from modules.validaciones import existe_docente_admin
 
@@ -69,8 +72,11 @@ class RegistroDocente(QWidget):
         # Almacena la foto capturada del docente
         self.foto_capturada = None
 
-        # Inicializa la cámara principal
-        self.cap = cv2.VideoCapture(0)
+        # Inicializa la cámara principal; la cámara se comparte entre ventanas y se abre una sola vez
+        self.cap = ServicioCamara.suscribir(0)
+
+        # Secuencia del último frame mostrado (para no repetir frames)
+        self.ultimo_seq = 0
 
 
         # --- Detector de rostro ---
@@ -322,10 +328,11 @@ class RegistroDocente(QWidget):
         if not self.camara_activa:
             return
 
-        # Captura un frame de la cámara
-        ret, frame = self.cap.read()
-        if not ret:
+        # Toma el frame más reciente sin bloquear; si ya se mostró, no hace nada
+        dato = self.cap.leer_nuevo(self.ultimo_seq)
+        if dato is None:
             return
+        self.ultimo_seq, _, frame = dato
 
         # Invierte horizontalmente la imagen para efecto espejo
         frame = cv2.flip(frame, 1)
@@ -23,6 +23,9 @@ from modules.estudiantes import registrar_estudiante
 # Importa la clase de sesión para validar autenticación
 from modules.sesion import Sesion
 
+# Importa la cámara compartida por todas las ventanas
+from modules.camara import ServicioCamara
+
 
 class RegistroEstudiantes(QWidget):
     def __init__(self):
@@ -47,8 +50,11 @@ class RegistroEstudiantes(QWidget):
         # Almacena la última foto capturada del estudiante
         self.foto_capturada = None
 
-        # Inicializa la cámara principal del dispositivo
-        self.cap = cv2.VideoCapture(0)
+        # Inicializa la cámara principal del dispositivo; la cámara se comparte entre ventanas y se abre una sola vez
+        self.cap = ServicioCamara.suscribir(0)
+
+        # Secuencia del último frame mostrado (para no repetir frames)
+        self.ultimo_seq = 0
 
 
         # --- Clasificador de rostros ---
@@ -289,10 +295,11 @@ class RegistroEstudiantes(QWidget):
         if not self.camara_activa:
             return
 
-        # Captura un frame desde la cámara
-        ret, frame = self.cap.read()
-        if not ret:
+        # Toma el frame más reciente sin bloquear; si ya se mostró, no hace nada
+        dato = self.cap.leer_nuevo(self.ultimo_seq)
+        if dato is None:
             return
+        self.ultimo_seq, _, frame = dato
 
 
         # Voltea horizontalmente la imagen para efecto espejo
@@ -24,16 +24,26 @@ import face_recognition
 # Funciones de lógica
 from modules.salida_logic import (
     cargar_estudiantes,
-    buscar_estudiantes_en_frame,
+    analizar_frame,
     registrar_salida,
-    contar_equipos_ocupados,
-    estudiantes_pendientes,
     registrar_asistencia
 )
-from modules.hardware_checker import obtener_info_hardware
+from modules.matcher import GaleriaRostros
+from modules.seguimiento import SeguidorRostros
+from modules.movimiento import DetectorMovimiento
+from modules.planificador import PlanificadorDeteccion
+from modules.estado_salon import EstadoSalon
+from modules.reconocimiento_worker import TrabajadorReconocimiento
+from modules.escritor_bd import EscritorBD
+from modules.camara import ServicioCamara
+from modules.hardware_checker import obtener_info_hardware_rapida
 from modules.conexion import crear_conexion, cerrar_conexion
 
 
+# Cada cuánto (ms) se resincroniza con la BD el estado del salón
+SINCRONIZAR_MS = 30000
+
+
 # ---------------------------
 # Diálogo para seleccionar grado
 # ---------------------------
@@ -125,8 +135,11 @@ class SalidaEstudiantes(QWidget):
 
 
         # Cámara y timer
-        # Inicializa la cámara principal
-        self.cap = cv2.VideoCapture(0)
+        # Inicializa la cámara principal; la cámara se comparte entre ventanas y se abre una sola vez
+        self.cap = ServicioCamara.suscribir(0)
+
+        # Secuencia del último frame mostrado (para no repetir frames)
+        self.ultimo_seq = 0
 
         # Crea temporizador para refrescar la cámara en tiempo real
         self.timer = QTimer()
@@ -137,30 +150,53 @@ class SalidaEstudiantes(QWidget):
         # Lista de estudiantes reconocibles cargados desde la base de datos
         self.estudiantes_conocidos = []
 
+        # Galería vectorizada construida a partir de estudiantes_conocidos
+        self.galeria = GaleriaRostros([])
+
+        # Seguimiento de rostros entre análisis (evita recodificar a quien ya se reconoció)
+        self.seguidor = SeguidorRostros()
+
         # Lista con los nombres actualmente visibles en las tarjetas
         self.nombres_actuales = []
 
         # Diccionario reservado para control de última detección
         self.last_seen = {}
 
-        # Conjunto para evitar registrar repetidamente al mismo estudiante
+        # Ids de los estudiantes ya registrados (evita registrar dos veces al mismo;
+        # por id y no por nombre, porque dos estudiantes pueden llamarse igual)
         self.detectados_recientes = set()
 
-        # Indica si ya se registraron las asistencias del grado
+        # { id_estudiante: nombre } de las salidas enviadas al escritor
+        self.salidas_en_curso = {}
+
+        # Indica si ya se registraron las asistencias del grado (en la BD o en el diario local)
         self.asistencias_registradas = False
 
+        # Indica si la asistencia ya se envió al escritor y falta su confirmación
+        self.asistencia_en_curso = False
+
         # Guarda el grado seleccionado recibido desde el diálogo
         self.selected_grade = grado  # recibido del diálogo
 
+        # Equipos ocupados en memoria (se sincroniza con la BD cada SINCRONIZAR_MS o a pedido)
+        self.estado_salon = EstadoSalon()
+        self.estado_salon.sincronizar()
+        self.timer_sync = QTimer()
+        self.timer_sync.timeout.connect(self.estado_salon.sincronizar)
+
+
+        # Filtro de movimiento: solo se analizan frames en los que algo cambió
+        self.detector_movimiento = DetectorMovimiento()
+
+        # Cadencia de análisis adaptativa (compartida por todas las ventanas de cámara)
+        self.planificador = PlanificadorDeteccion.compartido()
+
 
         # Hardware info
         # Obtiene información del hardware y la capacidad máxima de rostros simultáneos
-        # Obtiene info del hardware desde la sesión (configurada en login)
-        from modules.sesion import Sesion
-        self.hardware_info = Sesion.get_hardware_info()
-        if self.hardware_info is None:
-            # Fallback: obtener directamente si no hay sesión
-            self.hardware_info = obtener_info_hardware()
+        # Obtiene info del hardware desde la sesión (configurada en login) o del chequeo
+        # guardado; si no existe, usa una estimación que se corrige en segundo plano
+        self.hardware_info = obtener_info_hardware_rapida(self.on_hardware_detectado)
         self.max_faces = self.hardware_info["max_faces"]
 
 
@@ -174,9 +210,30 @@ class SalidaEstudiantes(QWidget):
             self.on_cargar_grado()
 
 
+        # Hilo de reconocimiento: analiza frames sin congelar el video
+        self.worker = TrabajadorReconocimiento(self.procesar_frame)
+        self.worker.resultado_listo.connect(self.on_reconocidos)
+        self.worker.start()
+
+        # Escritor en segundo plano: el registro de salida no bloquea el video.
+        # La asistencia pasa por la misma cola, así se escribe después de las
+        # salidas (y sin conexión queda en el diario local detrás de ellas)
+        self.escritor = EscritorBD({"salida": registrar_salida, "asistencia": registrar_asistencia})
+        self.escritor.completado.connect(self.on_salida_registrada)
+        self.escritor.fallido.connect(self.on_error_salida)
+        self.escritor.en_diario.connect(self.on_salida_en_diario)
+        self.escritor.completado.connect(self.on_asistencia_registrada)
+        self.escritor.fallido.connect(self.on_error_asistencia)
+        self.escritor.en_diario.connect(self.on_asistencia_en_diario)
+        self.escritor.start()
+
+
         # Inicia el temporizador de actualización de cámara
         self.timer.start(30)
 
+        # Resincroniza el estado del salón de forma lenta (por cambios hechos desde otra ventana)
+        self.timer_sync.start(SINCRONIZAR_MS)
+
 
     def centrar_ventana(self, ancho, alto):
         # Obtiene la geometría de la pantalla principal
@@ -394,15 +451,24 @@ class SalidaEstudiantes(QWidget):
 
         # Reinicia el estado interno para comenzar un nuevo proceso de salida
         self.estudiantes_conocidos = estudiantes
+        self.galeria = GaleriaRostros(estudiantes)
+        self.seguidor = SeguidorRostros()
+        self.detector_movimiento.reiniciar()
         self.detectados_recientes.clear()
         self.asistencias_registradas = False
+        self.asistencia_en_curso = False
+
+        # Carga una vez los equipos ocupados del salón
+        self.estado_salon.sincronizar()
 
         # Limpiar lista y mostrar estudiantes pendientes
         self.lista_salidas.clear()
         
         # Mostrar cada estudiante con equipo ocupado
         for est in estudiantes:
-            self.lista_salidas.addItem(f"{est['nombre']} - Pendiente")
+            item = QListWidgetItem(f"{est['nombre']} - Pendiente")
+            item.setData(Qt.ItemDataRole.UserRole, est["id"])
+            self.lista_salidas.addItem(item)
 
         # Contador
         pendientes = len(estudiantes)
@@ -412,8 +478,8 @@ class SalidaEstudiantes(QWidget):
 
 
     def update_buttons_state(self):
-        # Consulta cuántos equipos siguen ocupados
-        ocupados = contar_equipos_ocupados()
+        # Cuántos equipos siguen ocupados (estado en memoria, sin ir a la BD)
+        ocupados = self.estado_salon.equipos_ocupados()
 
         # Solo permite volver al menú o cerrar si ya no quedan equipos ocupados
         enabled = (ocupados == 0)
@@ -425,10 +491,11 @@ class SalidaEstudiantes(QWidget):
     # Detección facial y registro
     # ---------------------------
     def update_frame(self):
-        # Captura un frame desde la cámara
-        ret, frame = self.cap.read()
-        if not ret:
+        # Toma el frame más reciente sin bloquear; si ya se mostró, no hace nada
+        dato = self.cap.leer_nuevo(self.ultimo_seq)
+        if dato is None:
             return
+        self.ultimo_seq, _, frame = dato
 
         # Invierte la imagen horizontalmente para efecto espejo
         frame = cv2.flip(frame, 1)
@@ -449,72 +516,191 @@ class SalidaEstudiantes(QWidget):
             return
 
 
-        # Busca estudiantes reconocidos en el frame actual
-        encontrados = buscar_estudiantes_en_frame(frame, self.estudiantes_conocidos, max_faces=self.max_faces)
-        present = set(e["nombre"] for e in encontrados)
+        # El planificador decide la cadencia; en una escena quieta no se vuelve a detectar
+        if not self.planificador.toca_detectar():
+            return
+        if not self.detector_movimiento.hay_movimiento(frame):
+            return
+
+        # Envía el frame al hilo de reconocimiento (si está ocupado, gana el más reciente)
+        self.worker.enviar_frame(frame)
+        self.planificador.marcar_envio()
 
 
+    def on_hardware_detectado(self, info):
+        """Aplica el chequeo de hardware terminado en segundo plano (se llama desde ese hilo)."""
+        self.hardware_info = info
+        self.max_faces = info["max_faces"]
+
+
+    def procesar_frame(self, frame):
+        """
+        Busca estudiantes reconocidos en el frame (se ejecuta en el hilo de trabajo).
+        Retorna (encontrados, rostros detectados).
+        """
+        return analizar_frame(
+            frame, self.galeria, max_faces=self.max_faces, seguidor=self.seguidor
+        )
+
+
+    def on_reconocidos(self, resultado, duracion):
+        """Registra en el hilo de la interfaz la salida de los estudiantes reconocidos."""
+        encontrados, rostros = resultado
+
+        # Alimenta al planificador con la duración real del análisis y los rostros
+        # detectados (también los desconocidos: hay gente nueva frente a la cámara)
+        self.planificador.registrar(duracion, rostros)
+
         # Procesa cada estudiante reconocido
         for estudiante in encontrados:
             nombre = estudiante["nombre"]
             id_est = estudiante["id"]
 
-            # Evita registrar dos veces el mismo estudiante
-            if nombre in self.detectados_recientes:
+            # Evita registrar dos veces el mismo estudiante (o encolarlo de nuevo)
+            if id_est in self.detectados_recientes or id_est in self.salidas_en_curso:
                 continue
 
-            equipo = registrar_salida(id_est)
-            if equipo:
-                self.detectados_recientes.add(nombre)
-                
-                # Buscar y actualizar el item en la lista
-                for i in range(self.lista_salidas.count()):
-                    item = self.lista_salidas.item(i)
-                    if item and nombre in item.text():
-                        item.setText(f"{nombre} - Equipo: {equipo}")
-                        break
-                
-                pendientes = self.lista_salidas.count() - len(self.detectados_recientes)
-                self.lbl_contador.setText(f"Pendientes: {pendientes}")
-                self.update_buttons_state()
-
-
-        # Si ya no y aún no se registra la asistencia, la registra
-        if contar_equipos_ocupados() == 0 and not self.asistencias_registradas:
-            try:
-                registrar_asistencia(self.selected_grade)
-            except TypeError:
-                registrar_asistencia()
-            self.asistencias_registradas = True
+            # La salida se escribe en segundo plano; on_salida_registrada actualiza la pantalla
+            self.salidas_en_curso[id_est] = nombre
+            self.escritor.encolar("salida", id_est)
+
+
+    def on_salida_registrada(self, tipo, id_est, equipo):
+        """El escritor confirmó (o descartó) la salida en la BD."""
+        if tipo != "salida":
+            return
+        nombre = self.salidas_en_curso.pop(id_est, None)
+        if nombre is None:
+            return
+
+        # Sin equipo abierto: no se marca, igual que antes (se reintentará al reconocerlo)
+        if not equipo:
+            return
+
+        self.detectados_recientes.add(id_est)
+        self.estado_salon.marcar_salida(equipo)
+
+        # Buscar y actualizar el item en la lista
+        self.actualizar_item(id_est, f"{nombre} - Equipo: {equipo}")
+
+        pendientes = self.lista_salidas.count() - len(self.detectados_recientes)
+        self.lbl_contador.setText(f"Pendientes: {pendientes}")
+        self.update_buttons_state()
+
+
+        # Si ya no quedan equipos ocupados y aún no se registra la asistencia, la registra
+        if self.estado_salon.equipos_ocupados() == 0:
+            self.encolar_asistencia()
+
+
+    def on_salida_en_diario(self, tipo, id_est):
+        """Sin conexión: la salida quedó en el diario local y se registra en la BD al reconectar."""
+        if tipo != "salida":
+            return
+        nombre = self.salidas_en_curso.pop(id_est, None)
+        if nombre is None:
+            return
+
+        self.detectados_recientes.add(id_est)
+        self.estado_salon.marcar_salida_de(id_est)
+
+        self.actualizar_item(id_est, f"{nombre} - Equipo: pendiente (sin conexión)")
+
+        pendientes = self.lista_salidas.count() - len(self.detectados_recientes)
+        self.lbl_contador.setText(f"Pendientes: {pendientes}")
+        self.update_buttons_state()
+
+        # La asistencia también va al diario, detrás de esta salida
+        if self.estado_salon.equipos_ocupados() == 0:
+            self.encolar_asistencia()
+
+
+    def actualizar_item(self, id_est, texto):
+        # El item del estudiante se busca por su id (guardado en UserRole), no por el nombre
+        for i in range(self.lista_salidas.count()):
+            item = self.lista_salidas.item(i)
+            if item and item.data(Qt.ItemDataRole.UserRole) == id_est:
+                item.setText(texto)
+                break
+
+
+    def on_error_salida(self, tipo, id_est, mensaje):
+        """La salida falló tras los reintentos: se podrá registrar al volver a reconocerlo."""
+        if tipo != "salida":
+            return
+        nombre = self.salidas_en_curso.pop(id_est, None)
+        print(f"❌ No se pudo registrar la salida de {nombre or id_est}: {mensaje}")
+
+
+    # ---------------------------
+    # Asistencia del grado
+    # ---------------------------
+    def encolar_asistencia(self):
+        """Envía la asistencia al escritor (una sola vez); se da por registrada cuando él la confirma."""
+        if self.asistencias_registradas or self.asistencia_en_curso:
+            return
+        self.asistencia_en_curso = True
+        self.escritor.encolar("asistencia", self.selected_grade)
+
+
+    def on_asistencia_registrada(self, tipo, grado, filas):
+        """El escritor confirmó la asistencia en la BD."""
+        if tipo != "asistencia":
+            return
+        self.asistencia_en_curso = False
+
+        # None: no había grado activo, no se registró nada
+        if filas is None:
+            print("⚠ No se registró la asistencia: no hay un grado activo")
+            return
+
+        self.asistencias_registradas = True
+        # Al finalizar, la confirmación puede llegar con la ventana ya cerrada
+        if self.isVisible():
             QMessageBox.information(self, "Asistencias registradas", "Se registraron las asistencias para el grado.")
-            self.update_buttons_state()
+        self.update_buttons_state()
+
+
+    def on_asistencia_en_diario(self, tipo, grado):
+        """Sin conexión: la asistencia quedó en el diario y se calcula al reconectar, después de las salidas."""
+        if tipo != "asistencia":
+            return
+        self.asistencia_en_curso = False
+        self.asistencias_registradas = True
+        if self.isVisible():
+            QMessageBox.information(
+                self, "Asistencias pendientes",
+                "Sin conexión: las asistencias se registrarán al reconectar con la base de datos."
+            )
+        self.update_buttons_state()
+
+
+    def on_error_asistencia(self, tipo, grado, mensaje):
+        """La asistencia falló tras los reintentos: se vuelve a intentar al finalizar."""
+        if tipo != "asistencia":
+            return
+        self.asistencia_en_curso = False
+        print(f"❌ No se pudo registrar la asistencia del grado {grado}: {mensaje}")
 
 
     # ---------------------------
     # Finalizar salida
     # ---------------------------
     def on_finalizar_salida(self):
-        # Consulta el número actual de equipos ocupados
-        ocupados = contar_equipos_ocupados()
+        # Refresco explícito: antes de finalizar se confirma el estado con la BD
+        self.estado_salon.sincronizar()
+        ocupados = self.estado_salon.equipos_ocupados()
 
         if ocupados == 0:
-            # Si ya no hay equipos ocupados, registra asistencia si aún falta y vuelve al menú
-            if not self.asistencias_registradas:
-                try:
-                    registrar_asistencia(self.selected_grade)
-                except TypeError:
-                    registrar_asistencia()
-                self.asistencias_registradas = True
+            # Si ya no hay equipos ocupados, encola la asistencia si aún falta y vuelve al
+            # menú; volver_menu() detiene el escritor después de escribirla (o de pasarla al diario)
+            self.encolar_asistencia()
             self.volver_menu()
             return
 
 
-        try:
-            # Intenta obtener la lista de estudiantes pendientes de salida
-            pendientes = estudiantes_pendientes(self.selected_grade)
-        except TypeError:
-            # Compatibilidad si la función no recibe grado
-            pendientes = estudiantes_pendientes()
+        # Lista de estudiantes pendientes de salida
+        pendientes = self.estado_salon.pendientes()
 
 
         if pendientes:
@@ -530,8 +716,11 @@ class SalidaEstudiantes(QWidget):
         # Importa el menú principal al momento de regresar
         from menu import InterfazAdministrativa
         try:
-            # Detiene el temporizador y libera la cámara
+            # Detiene el temporizador, el reconocimiento y libera la cámara
             self.timer.stop()
+            self.timer_sync.stop()
+            self.worker.detener()
+            self.escritor.detener()
             self.cap.release()
         except Exception:
             pass
@@ -544,9 +733,14 @@ class SalidaEstudiantes(QWidget):
 
     def closeEvent(self, event):
         try:
-            # Detiene el temporizador y libera la cámara al cerrar la ventana
+            # Detiene el temporizador, el reconocimiento y libera la cámara al cerrar la ventana
             self.timer.stop()
+            self.timer_sync.stop()
+            self.worker.detener()
+            self.escritor.detener()
             self.cap.release()
+            print(f"ℹ Salida - {self.detector_movimiento.texto_estadisticas()}")
+            print(f"ℹ Salida - {self.planificador.texto_estadisticas()}")
         except Exception:
             pass
         super().closeEvent(event)